@@ -0,0 +1,327 @@
+import importlib
+import math
+import sys
+from datetime import date
+
+#NumPy is optional. If it is not installed, the statistics are calculated with plain Python loops instead, which give exactly the same results
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+#The statistics are calculated from the parallel arrays of a TransactionStore (cents, date ordinals, type flags and category ids)
+#If the analytics were loaded from the main Finance Tracker file, the module which is already running (registered as "finance_tracker") is used.
+#Otherwise the main file is imported by its file name, which contains spaces, so it cannot be imported with a normal import statement
+if "finance_tracker" not in sys.modules:
+    importlib.import_module("Personal Finance Tracker")
+from finance_tracker import TransactionStore, cents_to_amount
+
+#Percentiles calculated for every purpose and type (the 50th percentile is the median)
+PERCENTILES = (10, 25, 50, 75, 90)
+
+#Number of days in each rolling average of the daily expenses
+ROLLING_WINDOWS = (30, 90)
+
+#Number of outliers listed, and how many interquartile ranges beyond the middle half of the amounts of its purpose an outlier has to be
+OUTLIER_COUNT = 10
+OUTLIER_RANGE = 1.5
+
+
+#Creating a function to interpolate between two amounts in the same way as NumPy's percentile (so both ways give exactly the same result)
+def interpolate(previous_value, next_value, gamma):
+    difference = next_value - previous_value
+    if gamma >= 0.5:
+        return next_value - difference * (1 - gamma)
+    return previous_value + difference * gamma
+
+
+#Creating a function to get a percentile (0 to 100) of a sorted list of amounts in cents, using linear interpolation between the closest amounts
+def get_percentile(values, percentile):
+    position = (len(values) - 1) * (percentile / 100)
+    previous = math.floor(position)
+    following = min(previous + 1, len(values) - 1)
+    return interpolate(float(values[previous]), float(values[following]), position - previous)
+
+
+#Creating a function to get the month number (year * 12 + month - 1) of a date stored as an integer day number
+def get_month_number(ordinal):
+    date_ = date.fromordinal(ordinal)
+    return date_.year * 12 + date_.month - 1
+
+
+#Creating a function to get the day number of the last day of a month number
+def get_month_end(month_number):
+    year, month = divmod(month_number + 1, 12)
+    if year > date.max.year:
+        return date.max.toordinal()
+    return date(year, month + 1, 1).toordinal() - 1
+
+
+#Creating a function to get the outlier score of an amount: how many interquartile ranges it is beyond the fences of its purpose and type
+#(an interquartile range of 0 is counted as 1 cent). Amounts with a score above 0 are outliers
+def get_outlier_score(cents, lower, upper, scale):
+    return max((cents - upper) / scale, (lower - cents) / scale)
+
+
+#Creating a function to get the fences of a purpose and type from its first and third quartiles, as [lower fence, upper fence, scale]
+def get_fences(first_quartile, third_quartile):
+    spread = third_quartile - first_quartile
+    return [first_quartile - OUTLIER_RANGE * spread, third_quartile + OUTLIER_RANGE * spread, max(spread, 1.0)]
+
+
+#Creating a function to build the rows of the month-over-month table from the total expenses and income of every month (in cents) and the
+#running total of the daily expenses (cumulative[day] is the total of the expenses from first_day up to and including first_day + day)
+def get_month_rows(first_month, expenses, income, cumulative, first_day, last_day):
+    rows = []
+    for position in range(len(expenses)):
+        month_number = first_month + position
+        row = {"month": f"{month_number // 12:04d}-{month_number % 12 + 1:02d}", "expenses": int(expenses[position]), "income": int(income[position])}
+        for name, totals in (("expenses", expenses), ("income", income)):
+            if position == 0:
+                row[f"{name}_change"] = None
+                row[f"{name}_change_percent"] = None
+            else:
+                previous = int(totals[position - 1])
+                row[f"{name}_change"] = row[name] - previous
+                row[f"{name}_change_percent"] = (row[name] - previous) / abs(previous) * 100 if previous != 0 else None
+
+        #Calculating the average daily expenses of the days up to the end of the month (or the last transaction), counting days without expenses as 0
+        end = min(get_month_end(month_number), last_day) - first_day
+        for window in ROLLING_WINDOWS:
+            start_total = int(cumulative[end - window]) if end - window >= 0 else 0
+            row[f"rolling_{window}"] = (int(cumulative[end]) - start_total) / min(window, end + 1)
+        rows.append(row)
+    return rows
+
+
+#Creating a function to calculate the statistics of a TransactionStore with NumPy, using vectorized group-by operations on its arrays
+def analyze_with_numpy(store):
+    #Using the arrays of the store without copying them, and leaving out the rows which have been removed or left out of the totals
+    types = numpy.frombuffer(store.types, dtype = numpy.uint8)
+    live = numpy.flatnonzero(types < TransactionStore.SKIPPED)
+    cents = numpy.frombuffer(store.amounts, dtype = numpy.int64)[live]
+    dates = numpy.frombuffer(store.dates, dtype = numpy.int32)[live].astype(numpy.int64)
+    category_ids = numpy.frombuffer(store.category_ids, dtype = numpy.int32)[live].astype(numpy.int64)
+    types = types[live].astype(numpy.int64)
+
+    #Sorting the rows by purpose and type (group) and then by amount, so every group is a run of sorted amounts
+    groups = category_ids * len(store.type_names) + types
+    order = numpy.lexsort((cents, groups))
+    sorted_groups = groups[order]
+    sorted_cents = cents[order]
+    starts = numpy.flatnonzero(numpy.concatenate(([True], sorted_groups[1:] != sorted_groups[:-1])))
+    counts = numpy.diff(numpy.append(starts, len(sorted_groups)))
+    totals = numpy.add.reduceat(sorted_cents, starts)
+
+    percentiles = {}
+    for percentile in PERCENTILES:
+        position = (counts - 1) * (percentile / 100)
+        previous = numpy.floor(position).astype(numpy.int64)
+        following = numpy.minimum(previous + 1, counts - 1)
+        gamma = position - previous
+        previous_values = sorted_cents[starts + previous].astype(numpy.float64)
+        next_values = sorted_cents[starts + following].astype(numpy.float64)
+        difference = next_values - previous_values
+        percentiles[percentile] = numpy.where(gamma >= 0.5, next_values - difference * (1 - gamma), previous_values + difference * gamma)
+
+    categories = []
+    for position, group in enumerate(sorted_groups[starts].tolist()):
+        category_id, type_flag = divmod(group, len(store.type_names))
+        categories.append({"purpose": store.categories[category_id], "type": store.type_names[type_flag], "count": int(counts[position]),
+                           "total": int(totals[position]), "mean": float(totals[position]) / int(counts[position]),
+                           "percentiles": {percentile: float(values[position]) for percentile, values in percentiles.items()}})
+
+    #Adding up the expenses and income of every month, and the expenses of every day for the rolling averages
+    #(leaving out the transactions whose date is not in the ISO format, which are only counted in the statistics per purpose)
+    dated = dates != TransactionStore.UNKNOWN_DATE
+    months = []
+    if dated.any():
+        month_dates = dates[dated]
+        month_cents = cents[dated]
+        epoch = date(1970, 1, 1).toordinal()
+        month_numbers = (month_dates - epoch).astype("datetime64[D]").astype("datetime64[M]").astype(numpy.int64) + 1970 * 12
+        first_month = int(month_numbers.min())
+        month_positions = month_numbers - first_month
+        expense_rows = types[dated] == store.type_lookup.get("Expense", -1)
+        expenses = numpy.zeros(int(month_numbers.max()) - first_month + 1, dtype = numpy.int64)
+        income = numpy.zeros(len(expenses), dtype = numpy.int64)
+        numpy.add.at(expenses, month_positions[expense_rows], month_cents[expense_rows])
+        numpy.add.at(income, month_positions[~expense_rows], month_cents[~expense_rows])
+
+        first_day = int(month_dates.min())
+        last_day = int(month_dates.max())
+        daily = numpy.zeros(last_day - first_day + 1, dtype = numpy.int64)
+        numpy.add.at(daily, month_dates[expense_rows] - first_day, month_cents[expense_rows])
+        months = get_month_rows(first_month, expenses, income, numpy.cumsum(daily), first_day, last_day)
+
+    #Scoring every amount against the fences of its group, and keeping the highest scores (the earliest row first when scores are equal)
+    group_positions = numpy.repeat(numpy.arange(len(starts)), counts)
+    first_quartiles = percentiles[25][group_positions]
+    third_quartiles = percentiles[75][group_positions]
+    spread = third_quartiles - first_quartiles
+    lower = first_quartiles - OUTLIER_RANGE * spread
+    upper = third_quartiles + OUTLIER_RANGE * spread
+    scale = numpy.maximum(spread, 1.0)
+    scores = numpy.maximum((sorted_cents - upper) / scale, (lower - sorted_cents) / scale)
+    rows = live[order]
+    candidates = numpy.flatnonzero(scores > 0)
+    candidates = candidates[numpy.lexsort((rows[candidates], -scores[candidates]))][:OUTLIER_COUNT]
+    outliers = [[float(scores[position]), int(rows[position])] for position in candidates]
+    return [categories, months, outliers]
+
+
+#Creating a function to calculate the statistics of a TransactionStore with plain Python loops (used when NumPy is not installed)
+def analyze_with_python(store):
+    #Collecting the amounts of every purpose and type (group), with the row of each amount so outliers can be found
+    groups = {}
+    month_numbers = {}
+    month_expenses = {}
+    month_income = {}
+    daily_expenses = {}
+    expense_flag = store.type_lookup.get("Expense", -1)
+    for row in store.rows():
+        cents = store.amounts[row]
+        ordinal = store.dates[row]
+        type_flag = store.types[row]
+        key = store.category_ids[row] * len(store.type_names) + type_flag
+        if key not in groups:
+            groups[key] = []
+        groups[key].append([cents, row])
+
+        #Transactions whose date is not in the ISO format are only counted in the statistics per purpose
+        if ordinal == TransactionStore.UNKNOWN_DATE:
+            continue
+        if ordinal not in month_numbers:
+            month_numbers[ordinal] = get_month_number(ordinal)
+        month_number = month_numbers[ordinal]
+        if type_flag == expense_flag:
+            month_expenses[month_number] = month_expenses.get(month_number, 0) + cents
+            daily_expenses[ordinal] = daily_expenses.get(ordinal, 0) + cents
+        else:
+            month_income[month_number] = month_income.get(month_number, 0) + cents
+
+    categories = []
+    outliers = []
+    for key in sorted(groups):
+        values = sorted(groups[key])
+        amounts = [cents for cents, row in values]
+        category_id, type_flag = divmod(key, len(store.type_names))
+        percentiles = {percentile: get_percentile(amounts, percentile) for percentile in PERCENTILES}
+        categories.append({"purpose": store.categories[category_id], "type": store.type_names[type_flag], "count": len(amounts),
+                           "total": sum(amounts), "mean": float(sum(amounts)) / len(amounts), "percentiles": percentiles})
+
+        lower, upper, scale = get_fences(percentiles[25], percentiles[75])
+        for cents, row in values:
+            score = get_outlier_score(cents, lower, upper, scale)
+            if score > 0:
+                outliers.append([score, row])
+    outliers.sort(key = lambda outlier: [-outlier[0], outlier[1]])
+
+    #Building the month-over-month table, including the months without any transactions between the first and last month
+    if not month_numbers:
+        return [categories, [], outliers[:OUTLIER_COUNT]]
+    first_month = min(month_numbers.values())
+    month_count = max(month_numbers.values()) - first_month + 1
+    expenses = [month_expenses.get(first_month + position, 0) for position in range(month_count)]
+    income = [month_income.get(first_month + position, 0) for position in range(month_count)]
+    first_day = min(month_numbers)
+    last_day = max(month_numbers)
+    cumulative = []
+    total = 0
+    for ordinal in range(first_day, last_day + 1):
+        total += daily_expenses.get(ordinal, 0)
+        cumulative.append(total)
+    months = get_month_rows(first_month, expenses, income, cumulative, first_day, last_day)
+    return [categories, months, outliers[:OUTLIER_COUNT]]
+
+
+#Creating a function to calculate the spending statistics of a TransactionStore: the count, total, mean and percentiles of every purpose and type,
+#the month-over-month change of the expenses and income with the rolling averages of the daily expenses, and the largest outliers
+#NumPy is used if it is installed (unless use_numpy is False). Transactions whose amount is not a number are left out (see TransactionStore.SKIPPED)
+def analyze(store, use_numpy = None):
+    if len(store) - store.skipped_count == 0:
+        return {"categories": [], "months": [], "outliers": []}
+    if use_numpy == None:
+        use_numpy = numpy != None
+    if use_numpy:
+        categories, months, outliers = analyze_with_numpy(store)
+    else:
+        categories, months, outliers = analyze_with_python(store)
+
+    #Getting the purpose, amount, type and date of each outlier from its row
+    outlier_rows = []
+    for score, row in outliers:
+        purpose, info = store.get_transaction(row)
+        outlier_rows.append({"purpose": purpose, "amount": info["amount"], "type": info["type"], "date": info["date"], "score": score})
+    return {"categories": categories, "months": months, "outliers": outlier_rows}
+
+
+#Creating a function to format an amount in cents which may not be a whole number of cents (eg: a mean or a percentile) with 2 decimal places
+def format_cents(cents):
+    return "{:.2f}".format(cents / 100)
+
+
+#Creating a function to format a percentage change (or "-" if there is no previous month or the previous total was 0)
+def format_change(cents, percent):
+    if cents == None:
+        return "-"
+    text = cents_to_amount(cents)
+    if percent != None:
+        text += f" ({percent:+.1f}%)"
+    return text
+
+
+#Creating a function to get the statistics in a form which can be written as JSON, with every amount in the same format as the JSON file
+def get_json_results(results):
+    categories = []
+    for category in results["categories"]:
+        entry = {"purpose": category["purpose"], "type": category["type"], "count": category["count"],
+                 "total": cents_to_amount(category["total"]), "mean": format_cents(category["mean"])}
+        for percentile, cents in category["percentiles"].items():
+            entry["median" if percentile == 50 else f"p{percentile}"] = format_cents(cents)
+        categories.append(entry)
+
+    months = []
+    for month in results["months"]:
+        entry = {}
+        for name, value in month.items():
+            if name.startswith("rolling_"):
+                entry[name] = format_cents(value)
+            elif name.endswith("_percent"):
+                entry[name] = None if value == None else round(value, 2)
+            elif name != "month" and value != None:
+                entry[name] = cents_to_amount(value)
+            else:
+                entry[name] = value
+        months.append(entry)
+
+    outliers = [dict(outlier, score = round(outlier["score"], 2)) for outlier in results["outliers"]]
+    return {"categories": categories, "months": months, "outliers": outliers}
+
+
+#Creating a function to get the text of the statistics, as displayed by the summary command with --stats
+def format_results(results):
+    if not results["categories"]:
+        return "There are no financial records.\n"
+
+    lines = ["Statistics per Purpose :\n"]
+    for category in results["categories"]:
+        percentiles = category["percentiles"]
+        lines.append(f"   {category['purpose']} ({category['type']}) : {category['count']} transaction{'s' if category['count'] != 1 else ''}, "
+                     f"total {cents_to_amount(category['total'])}, mean {format_cents(category['mean'])}, median {format_cents(percentiles[50])}")
+        lines.append("      Percentiles : " + ", ".join(f"{percentile}th {format_cents(cents)}" for percentile, cents in percentiles.items()))
+
+    lines.append("\n\nMonth-over-Month Change :\n")
+    for month in results["months"]:
+        rolling = ", ".join(f"{window}-day average {format_cents(month[f'rolling_{window}'])}" for window in ROLLING_WINDOWS)
+        lines.append(f"   {month['month']} : Expenses {cents_to_amount(month['expenses'])} (change {format_change(month['expenses_change'], month['expenses_change_percent'])})   "
+                     f"Income {cents_to_amount(month['income'])} (change {format_change(month['income_change'], month['income_change_percent'])})")
+        lines.append(f"      Daily expenses : {rolling}")
+
+    lines.append("\n\nLargest Outliers :\n")
+    if not results["outliers"]:
+        lines.append("   There are no outliers.")
+    for count, outlier in enumerate(results["outliers"], 1):
+        lines.append(f"   {count}. {outlier['purpose']} ({outlier['type']}) : {outlier['amount']} on {outlier['date']}, "
+                     f"{outlier['score']:.1f} interquartile ranges beyond the usual amounts")
+    return "\n".join(lines) + "\n"
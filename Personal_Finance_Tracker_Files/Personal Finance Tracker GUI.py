@@ -1,9 +1,77 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+import importlib
 import json
+import queue
+import sqlite3
+import sys
+import threading
+from array import array
+
+#The storage backends, search indexes and TransactionStore are shared with the main Finance Tracker file, which registers itself as the "finance_tracker" module
+#If the GUI was opened from the menu of the main Finance Tracker file, the module which is already running is used. Otherwise the main file
+#is imported from the folder of this file by its file name (which contains spaces, so it cannot be imported with a normal import statement)
+if "finance_tracker" not in sys.modules:
+    importlib.import_module("Personal Finance Tracker")
+from finance_tracker import COLUMNS, QueryMixin, SearchIndex, TransactionStore, count_transactions, get_rows, get_valid_cents, instrumentation, open_storage, parse_date_range
+
+
+#Creating a function to check if the amount of a row can be converted to cents, which the search indexes and the TransactionStore need
+#(eg: a JSON file edited by hand may have an amount of "ten"). The same check is used by the totals of the main Finance Tracker file
+def is_valid_row(row):
+    return get_valid_cents(row[1]) != None
+
+
+#Creating a class definition for a list of row ids read backwards, so a sorted order can be displayed in descending order without copying it
+class ReversedRowIds:
+
+    #Creating a function to act as the constructor of an object
+    def __init__(self, row_ids):
+        self.row_ids = row_ids
+
+
+    #Creating a function to get the number of row ids
+    def __len__(self):
+        return len(self.row_ids)
+
+
+    #Creating a function to get a row id (or a list of row ids for a slice) counting from the end of the original list
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self.row_ids[-1 - num] for num in range(*position.indices(len(self.row_ids)))]
+        if position < 0:
+            position += len(self.row_ids)
+        return self.row_ids[-1 - position]
+
 
 #Creating a class definition for the GUI the Finance Tracker to Search and Sort Transactions
+#The Treeview is virtualized: every row is kept in Python (as a (purpose, amount, type, date) tuple) and the current result set is a list of
+#row ids (positions in self.all_rows), but only the rows visible in the Treeview (plus a few extra rows) exist as Treeview items.
+#Scrolling changes which rows those items show.
 class FinanceTrackerGUI:
+
+    #Names of the columns of the Treeview, in the same order as the values in each row
+    COLUMNS = COLUMNS
+
+    #Number of extra rows kept in the Treeview below the visible rows
+    OVERSCAN = 5
+
+    #Height of a Treeview row in pixels, used if the theme does not specify one
+    DEFAULT_ROW_HEIGHT = 20
+
+    #Number of milliseconds to wait after the last keystroke before searching, how often search results are checked for,
+    #and the number of matching row ids sent back from the search thread at a time
+    SEARCH_DELAY_MS = 250
+    SEARCH_POLL_MS = 20
+    SEARCH_BATCH_SIZE = 5000
+
+    #Number of transactions sent from the loading thread at a time, and how often the loaded transactions are checked for
+    LOAD_CHUNK_SIZE = 2000
+    LOAD_POLL_MS = 20
+
+    #Number of milliseconds between checks of the modification time of the transaction records, so changes made by another program
+    #(eg: a transaction added from the menu or a command) are shown without reopening the window
+    WATCH_POLL_MS = 1000
     
     #Creating a function to act as the constructor of an object
     def __init__(self, root, filename):
@@ -11,24 +79,79 @@ class FinanceTrackerGUI:
         
         #Changing the title of the root window
         self.root.title("Personal Finance Tracker")
+
+        #Initializing the rows of all transactions, the ids of the rows currently displayed, the position of the first visible row and the number of visible rows
+        #Rows removed by a change on disk are set to None in self.all_rows, so the other rows keep their row ids
+        self.all_rows = []
+        self.view_ids = []
+        self.first_row = 0
+        self.visible_rows = 10
+        self.removed_count = 0
+        self.live_ids = None
+
+        #Number of loaded transactions which could not be displayed, as their amounts could not be converted. They are kept in self.all_rows as
+        #None (in the same way as removed rows), so the rows after them keep the same row ids as the rows of the storage backend
+        self.skipped_count = 0
+
+        #Initializing variables for searching as the user types
+        #Searches run on a separate thread, which puts batches of results in a queue that is checked from the Tk loop.
+        #Every search gets a new generation number, so results from older searches can be recognised and ignored.
+        self.search_after_id = None
+        self.search_generation = 0
+        self.search_results = queue.Queue()
+        self.search_polling = False
+        self.search_running = False
+        self.search_ids = []
+
+        #Lock used to stop the search indexes being changed while a search thread is reading them
+        self.index_lock = threading.Lock()
+
+        #Initializing variables for the sort function of the GUI
+        #The ids of the rows matching the current search (None if all rows are displayed) are kept separately from their sorted order.
+        #The sorted order (ascending) of each column is cached, for all rows and for the current search results,
+        #along with the sort key of every row for each column
+        self.sort_column = None
+        self.sort_descending = False
+        self.filter_ids = None
+
+        #The filter the rows matching the current search or date range were found with, as a list of the kind of filter and its values
+        #(None if all rows are displayed), so the filter can be applied to the rows changed on disk
+        self.view_filter = None
+        self.sort_cache_all = {}
+        self.sort_cache_filtered = {}
+        self.sort_keys = {}
+        
+        #Initializing the transactions, the search indexes and a compact TransactionStore (used for the typed sort keys)
+        #Each of them is filled in as the transactions are loaded. The rows of the TransactionStore are in the same order as self.all_rows, so they have the same row ids
+        self.storage = open_storage(filename)
+        self.transactions = {}
+        self.search_index = SearchIndex()
+        self.columns = TransactionStore()
+
+        #Initializing variables for loading the transactions on a separate thread, which puts chunks of transactions in a queue that is checked from the Tk loop
+        self.load_results = queue.Queue()
+        self.loading = False
+
+        #Initializing variables for watching the transaction records for changes. The stamp of the storage backend (eg: the modification time and size
+        #of the JSON file and its journal) is checked from the Tk loop, and the changed records are read again on a separate thread
+        self.stamp = None
+        self.watch_results = queue.Queue()
+        self.watching = False
+        self.reloading = False
         
         #Calling a function to create widgets for the GUI
         self.create_widgets()
-        
-        #Calling a function to load the transactions from the JSON File
-        self.transactions = self.load_transactions(filename)
-        
-        #Calling a function to display the transactions to be added to the treeview
-        self.display_transactions(self.transactions)
+
+        #Calling a function to display the rows of all transactions (which is empty until the first transactions have been loaded)
+        self.set_view(None)
         
         #Using the style module of the ttk module to modify the theme of the window and change the font style and background colour of the column headings
         self.style = ttk.Style()
         self.style.theme_use("default")
         self.style.configure("Treeview.Heading", font = ("Calibri", 12), background = "lightgrey")
-        
-        #Initializing variables for the sort function of the GUI
-        self.sort_column = None
-        self.sort_descending = False
+
+        #Calling a function to start loading the transactions from the JSON file, so the window is displayed straight away
+        self.start_loading()
 
     
     #Creating a function to create widgets for the GUI 
@@ -62,11 +185,19 @@ class FinanceTrackerGUI:
         
         #Scrollbar for the Treeview
         #Creating a vertical scrollbar in the y-axis (vertically) of the Treeview
-        scrollbar = ttk.Scrollbar(frame, orient="vertical", command = self.tree.yview)
-        self.tree.configure(yscrollcommand = scrollbar.set)
+        #The scrollbar moves through all rows of the result set rather than through the items in the Treeview, as only the visible rows are items
+        self.scrollbar = ttk.Scrollbar(frame, orient="vertical", command = self.on_scrollbar)
         
         #Adding the scrollbar on the right side of the Treeview
-        scrollbar.pack(side = "right", fill = "y")
+        self.scrollbar.pack(side = "right", fill = "y")
+
+        #Scrolling the rows with the mouse wheel (Button-4 and Button-5 are used for the mouse wheel on Linux)
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", self.on_mousewheel)
+        self.tree.bind("<Button-5>", self.on_mousewheel)
+
+        #Updating the number of visible rows when the size of the Treeview changes
+        self.tree.bind("<Configure>", self.on_resize)
         
         #Creating string variable for the search choice and setting the default value to "Transaction"
         self.search_choice = tk.StringVar()
@@ -91,11 +222,27 @@ class FinanceTrackerGUI:
         #textvariable is set to search_str to ensure the user input can be set as an accessible variable
         searchbar = ttk.Entry(self.root, textvariable = self.search_str)
         searchbar.pack(pady = 5)
+
+        #Searching as the user types in the searchbar or chooses a different search criteria
+        self.search_str.trace_add("write", self.on_search_changed)
+        self.search_choice.trace_add("write", self.on_search_changed)
         
         #Creating a search button which, when clicked, calls a search transaction function
         search_button = ttk.Button(self.root, text = "Search", command = self.search_transactions)
         search_button.pack()
 
+        #Creating a seperate frame with From and To fields to display the transactions in a range of dates (in date order)
+        #Dates can be entered as YYYY-MM-DD, YYYY-MM or YYYY, and either field can be left empty to leave that end of the range open
+        date_frame = ttk.Frame(self.root)
+        date_frame.pack(pady = 5)
+        self.date_from_str = tk.StringVar()
+        self.date_to_str = tk.StringVar()
+        ttk.Label(date_frame, text = "From").pack(side = "left")
+        ttk.Entry(date_frame, textvariable = self.date_from_str, width = 12).pack(side = "left", padx = 5)
+        ttk.Label(date_frame, text = "To").pack(side = "left")
+        ttk.Entry(date_frame, textvariable = self.date_to_str, width = 12).pack(side = "left", padx = 5)
+        ttk.Button(date_frame, text = "Filter by Date", command = self.filter_date_range).pack(side = "left")
+
         #Creating an empty label which can be used in cases on an invalid input being entered
         self.invalid_input_label = tk.Label(self.root, text = "", fg = "red")
         self.invalid_input_label.pack()
@@ -104,81 +251,714 @@ class FinanceTrackerGUI:
         reset_button = ttk.Button(self.root, text = "Reset", command = self.reset_transactions)
         reset_button.pack(pady = 5)
 
+        #Creating a progress bar and a label which are displayed while the transactions are being loaded
+        self.load_progress = ttk.Progressbar(self.root, mode = "indeterminate")
+        self.load_progress.pack(fill = "x", padx = 5)
+        self.load_label = tk.Label(self.root, text = "")
+        self.load_label.pack(pady = 5)
+
     
-    #Creating a function to load transactions from the JSON file to the self.transactions variable
-    def load_transactions(self, filename):
+    #Creating a function to start loading the transactions from the JSON file on a separate thread
+    def start_loading(self):
+        #The stamp is taken before reading, so a change made while the transactions are being loaded is found by the next check
+        self.stamp = self.storage.get_stamp()
+        self.loading = True
+        self.load_progress.start()
+        self.load_label.config(text = "Loading transactions...")
+        self.skipped_count = 0
+
+        load_thread = threading.Thread(target = self.run_loading, daemon = True)
+        load_thread.start()
+
+        #Checking for loaded transactions from the Tk loop, as Tk widgets can only be changed from the thread running the Tk loop
+        self.root.after(self.LOAD_POLL_MS, self.poll_loading)
+
+
+    #Creating a function to read the transactions on the loading thread, sending them back through the queue in chunks
+    #Each item in the queue is a list of the kind of item and its value
+    def run_loading(self):
+        with instrumentation.measure("gui load") as measurement:
+            loaded_data = {}
+            chunk = []
+            try:
+                for expense, info in self.storage.iter_transactions():
+                    if expense not in loaded_data:
+                        loaded_data[expense] = []
+                    loaded_data[expense].append(info)
+                    chunk.append([expense, info])
+                    if len(chunk) == self.LOAD_CHUNK_SIZE:
+                        self.load_results.put(["rows", chunk])
+                        chunk = []
+            except json.JSONDecodeError as error_msg:
+                self.load_results.put(["invalid", f"Error decoding JSON: {error_msg}"])
+                return
+            except sqlite3.Error as error_msg:
+                self.load_results.put(["invalid", f"Error reading the transactions database: {error_msg}"])
+                return
+            except FileNotFoundError:
+                self.load_results.put(["missing", None])
+                return
+            if chunk:
+                self.load_results.put(["rows", chunk])
+
+            #Applying any changes recorded in the journal since the JSON file was last compacted
+            #If there were any, the rows are created again from the changed transactions
+            if self.storage.replay_changes(loaded_data):
+                self.load_results.put(["replayed", loaded_data])
+            else:
+                self.load_results.put(["done", loaded_data])
+            measurement.records = count_transactions(loaded_data)
+
+
+    #Creating a function to add the chunks of transactions sent back from the loading thread to the Treeview
+    #One chunk is added at a time, so the window keeps responding while a large file is loaded
+    def poll_loading(self):
         try:
-            with open(filename, "r") as file:
-                loaded_data = json.load(file)
-            return loaded_data
-        except json.JSONDecodeError as error_msg:
-            print(f"Error decoding JSON: {error_msg}")
-        except FileNotFoundError:
+            kind, value = self.load_results.get_nowait()
+        except queue.Empty:
+            self.root.after(self.LOAD_POLL_MS, self.poll_loading)
+            return
+
+        if kind == "rows":
+            self.add_loaded_rows(value)
+            self.load_label.config(text = f"Loading transactions... ({len(self.all_rows)} loaded)")
+
+            #Checking for the next chunk straight away, as the loading thread is usually ahead of the Tk loop
+            self.root.after(1, self.poll_loading)
+            return
+
+        if kind == "invalid":
+            print(value)
+            self.set_loaded_transactions({})
+        elif kind == "missing":
             #Displaying a message box consisting of an error message for the user 
             messagebox.showerror("Error", "Transaction records cannot be found.\nPlease ensure all neccessary files are loacted in the same root folder")
-            return {}
+        elif kind == "replayed":
+            self.set_loaded_transactions(value)
+        else:
+            self.transactions = value
+        self.finish_loading()
+
+
+    #Creating a function to add a chunk of loaded transactions to the rows, the search indexes and the TransactionStore
+    def add_loaded_rows(self, chunk):
+        first_row_id = len(self.all_rows)
+        with self.index_lock:
+            for expense, info in chunk:
+                self.add_row((expense, info["amount"], info["type"], info["date"]))
+
+            #Letting the storage backend return the row ids of the rows added from searches and sorts it runs
+            self.storage.show_rows(len(self.all_rows))
+
+        #Adding the new rows to the cached sort orders, and showing them without scrolling back to the top
+        self.add_to_sort_cache(first_row_id)
+        self.refresh_view()
+
+
+    #Creating a function to add a row to the rows, the search indexes and the TransactionStore (while index_lock is held)
+    #A row whose amount cannot be converted is added as a removed row and counted in skipped_count. True is returned if the row was added
+    def add_row(self, row):
+        if not is_valid_row(row):
+            self.all_rows.append(None)
+            self.columns.add_removed()
+            self.removed_count += 1
+            self.skipped_count += 1
+            self.live_ids = None
+            return False
+
+        #The search indexes are not needed if the storage backend runs the searches itself
+        if not isinstance(self.storage, QueryMixin):
+            self.search_index.add(len(self.all_rows), row)
+        self.all_rows.append(row)
+        self.columns.add(row[0], {"amount": row[1], "type": row[2], "date": row[3]})
+        return True
+
+
+    #Creating a function to replace all loaded rows with the rows of a transactions dictionary
+    def set_loaded_transactions(self, transactions):
+        self.transactions = transactions
+        all_rows = [row if is_valid_row(row) else None for row in get_rows(transactions)]
+        columns = TransactionStore()
+        for row in all_rows:
+            if row == None:
+                columns.add_removed()
+            else:
+                columns.add(row[0], {"amount": row[1], "type": row[2], "date": row[3]})
+        with self.index_lock:
+            self.all_rows = all_rows
+            self.search_index = SearchIndex(all_rows)
+            self.columns = columns
+
+            #The storage backend only returns the row ids of the new rows from searches and sorts once they have replaced the rows displayed
+            self.storage.show_rows(len(all_rows))
+        self.removed_count = all_rows.count(None)
+        self.skipped_count = self.removed_count
+        self.live_ids = None
+        self.clear_sort_cache()
+
+        #The ids of the rows matching the current search may no longer be the same rows, so only all rows can be displayed until the search is run again
+        self.filter_ids = None
+        self.refresh_view()
+
+
+    #Creating a function to hide the progress indicator once all transactions have been loaded
+    def finish_loading(self):
+        self.loading = False
+        self.load_progress.stop()
+        self.load_progress.pack_forget()
+        self.load_label.config(text = self.get_skipped_message())
+
+        #Running the current search again, as it only searched the transactions which had been loaded when it was started
+        if self.search_str.get() != "":
+            self.start_search()
+
+        #Starting to watch the transaction records for changes made by another program
+        if not self.watching:
+            self.watching = True
+            self.root.after(self.WATCH_POLL_MS, self.poll_file_changes)
+
+
+    #Creating a function to get the message displayed in the status bar about the loaded transactions which could not be displayed
+    #or whose dates are not in the YYYY-MM-DD format (an empty string is returned if there are none)
+    def get_skipped_message(self):
+        messages = []
+        if self.skipped_count > 0:
+            messages.append(f"{self.skipped_count} transaction{'s' if self.skipped_count != 1 else ''} could not be displayed, as the amount is not a number")
+        if self.columns.date_texts:
+            count = len(self.columns.date_texts)
+            messages.append(f"{count} transaction{'s have dates' if count != 1 else ' has a date'} which {'are' if count != 1 else 'is'} not in the YYYY-MM-DD format")
+        return ". ".join(messages) + ("." if messages else "")
+
+
+    #Creating a function to check the transaction records for changes made by another program, from the Tk loop
+    #When the stamp of the storage backend changes, the transactions are read again on a separate thread, and only the rows which were added,
+    #changed or removed are applied to the rows, the search indexes and the Treeview (keeping the current search or date range and sort order)
+    def poll_file_changes(self):
+        try:
+            kind, stamp, value = self.watch_results.get_nowait()
+        except queue.Empty:
+            kind = None
+
+        if kind != None:
+            #The stamp is kept even if the records could not be read, so they are only read again once they have changed again
+            self.reloading = False
+            self.stamp = stamp
+            if kind == "delta":
+                self.apply_delta(*value)
+            elif kind == "replaced":
+                self.replace_transactions(value)
+            else:
+                self.load_label.config(text = value)
+
+        if not self.reloading and not self.loading:
+            stamp = self.storage.get_stamp()
+            if stamp != self.stamp:
+                self.reloading = True
+                reload_thread = threading.Thread(target = self.run_reload, args = (stamp,), daemon = True)
+                reload_thread.start()
+
+        #Checking for the changed rows more often while they are being read
+        self.root.after(self.LOAD_POLL_MS if self.reloading else self.WATCH_POLL_MS, self.poll_file_changes)
+
+
+    #Creating a function to read the changed transaction records on the reload thread and find the rows which were added, changed or removed
+    #The result is sent back through the queue as a list of the kind of result, the stamp of the records and its value
+    #(the rows in memory are only changed from the Tk loop once the result has been sent back, so they can be read here)
+    def run_reload(self, stamp):
+        with instrumentation.measure("gui refresh") as measurement:
+            transactions = {}
+            try:
+                for expense, info in self.storage.iter_transactions():
+                    if expense not in transactions:
+                        transactions[expense] = []
+                    transactions[expense].append(info)
+                self.storage.replay_changes(transactions)
+            except json.JSONDecodeError as error_msg:
+                self.watch_results.put(["invalid", stamp, f"Error decoding JSON: {error_msg}"])
+                return
+            except sqlite3.Error as error_msg:
+                self.watch_results.put(["invalid", stamp, f"Error reading the transactions database: {error_msg}"])
+                return
+            except FileNotFoundError:
+                self.watch_results.put(["invalid", stamp, "Transaction records cannot be found."])
+                return
+            measurement.records = count_transactions(transactions)
+
+            #The row ids of a storage backend which runs the searches and sorts itself are positions in its own order, so every row is replaced instead
+            if isinstance(self.storage, QueryMixin):
+                self.watch_results.put(["replaced", stamp, transactions])
+            else:
+                #Rows whose amount cannot be converted are left out of the delta, and only counted (see add_row)
+                rows = get_rows(transactions)
+                valid_rows = [row for row in rows if is_valid_row(row)]
+                self.watch_results.put(["delta", stamp, [transactions, len(rows) - len(valid_rows)] + self.get_delta(valid_rows)])
+
+
+    #Creating a function to compare the rows of the transactions read again with the rows in memory
+    #Rows are matched by their values (a row which appears several times is matched as many times as it appears in both). A removed row and
+    #an added row with the same purpose are counted as a changed row (eg: a transaction whose amount was updated), which keeps its row id
+    #A list of the removed row ids, the changed rows (as [row id, new row] lists) and the added rows is returned
+    def get_delta(self, new_rows):
+        #Keeping the row ids of each value in reverse order, so the earliest row id is matched first by pop()
+        old_ids = {}
+        for row_id, row in enumerate(self.all_rows):
+            if row != None:
+                if row not in old_ids:
+                    old_ids[row] = []
+                old_ids[row].append(row_id)
+        for row_ids in old_ids.values():
+            row_ids.reverse()
+
+        added = []
+        for row in new_rows:
+            row_ids = old_ids.get(row)
+            if row_ids:
+                row_ids.pop()
+            else:
+                added.append(row)
+
+        #Pairing the removed rows and added rows of each purpose (in order) as changed rows
+        removed_ids = {}
+        for row_id in sorted(row_id for row_ids in old_ids.values() for row_id in row_ids):
+            expense = self.all_rows[row_id][0]
+            if expense not in removed_ids:
+                removed_ids[expense] = []
+            removed_ids[expense].append(row_id)
+        for row_ids in removed_ids.values():
+            row_ids.reverse()
+
+        changed = []
+        inserted = []
+        for row in added:
+            row_ids = removed_ids.get(row[0])
+            if row_ids:
+                changed.append([row_ids.pop(), row])
+            else:
+                inserted.append(row)
+        return [sorted(row_id for row_ids in removed_ids.values() for row_id in row_ids), changed, inserted]
+
+
+    #Creating a function to apply the rows which were removed, changed or added on disk to the rows, the search indexes and the TransactionStore
+    #skipped_count is the number of rows read again which could not be displayed (they are not part of the removed, changed or added rows)
+    #Only the visible rows of the Treeview are shown again, without scrolling back to the top
+    def apply_delta(self, transactions, skipped_count, removed_ids, changed, inserted):
+        self.transactions = transactions
+        self.skipped_count = skipped_count
+        if not removed_ids and not changed and not inserted:
+            return
+
+        first_row_id = len(self.all_rows)
+        with self.index_lock:
+            for row_id in removed_ids:
+                self.search_index.remove(row_id, self.all_rows[row_id])
+                self.columns.remove(row_id)
+                self.all_rows[row_id] = None
+            for row_id, row in changed:
+                self.search_index.remove(row_id, self.all_rows[row_id])
+                self.search_index.add(row_id, row)
+                self.columns.replace(row_id, row[0], {"amount": row[1], "type": row[2], "date": row[3]})
+                self.all_rows[row_id] = row
+            for row in inserted:
+                self.search_index.add(len(self.all_rows), row)
+                self.all_rows.append(row)
+                self.columns.add(row[0], {"amount": row[1], "type": row[2], "date": row[3]})
+        self.removed_count += len(removed_ids)
+        self.live_ids = None
+
+        #Added rows are merged into the cached sort orders, but the sort orders have to be found again if rows were changed or removed
+        if removed_ids or changed:
+            self.clear_sort_cache()
+        else:
+            self.add_to_sort_cache(first_row_id)
+
+        #Applying the current search or date range to the changed rows. A search which was still running is started again, as its results may include removed rows
+        if self.search_running:
+            self.start_search()
+        elif self.view_filter != None and self.filter_ids != None:
+            self.filter_ids = self.get_filtered_ids(removed_ids, changed, first_row_id)
+        self.refresh_view()
+        self.scroll_to(self.first_row)
+        message = f"The transaction records were changed on disk ({len(inserted)} added, {len(changed)} changed and {len(removed_ids)} removed)."
+        self.load_label.config(text = " ".join([message, self.get_skipped_message()]).strip())
+
+
+    #Creating a function to get the ids of the rows matching the current search or date range after rows were removed, changed or added (from first_row_id)
+    #The rows in a date range are found again with the sorted dates of the search index. For a search, only the changed and added rows are searched,
+    #using an index of just those rows so the same rules are used as the search of every row
+    def get_filtered_ids(self, removed_ids, changed, first_row_id):
+        kind, first_value, second_value = self.view_filter
+        if kind == "date":
+            return self.search_index.date_range(first_value, second_value)
+
+        changed_index = SearchIndex()
+        changed_ids = set(removed_ids)
+        for row_id, row in changed:
+            changed_index.add(row_id, row)
+            changed_ids.add(row_id)
+        for row_id in range(first_row_id, len(self.all_rows)):
+            changed_index.add(row_id, self.all_rows[row_id])
+        row_ids = [row_id for row_id in self.filter_ids if row_id not in changed_ids]
+        return sorted(row_ids + changed_index.search(first_value, second_value))
+
+
+    #Creating a function to replace every row with the rows of the transactions read again and apply the current search or date range to them
+    #(used for storage backends which run the searches and sorts themselves, as their row ids are positions in the order of the backend)
+    def replace_transactions(self, transactions):
+        self.set_loaded_transactions(transactions)
+        if self.view_filter != None:
+            kind, first_value, second_value = self.view_filter
+            if kind == "search":
+                self.start_search()
+            else:
+                self.filter_ids = self.storage.date_range(first_value, second_value)
+                self.refresh_view()
+        self.load_label.config(text = " ".join(["The transaction records were changed on disk and have been loaded again.", self.get_skipped_message()]).strip())
+
 
     
-    #Creating a function to display all transactions to the user in the Treeview of the GUI
-    def display_transactions(self, transactions):
-        #Removing any existing items in the treeview
-        for info in self.tree.get_children():
-            self.tree.delete(info)
-
-        #Add all transactions to the Treeview
-        #Iterating through the key-value pairs of the transactions dictionary
-        for  expense, exp_transactions in transactions.items():
-            #Iterating through the values (which exist as lists consisting of dictionaries for each transaction) of the transactions dictionary
-            for info in exp_transactions:
-                #Inserting the relevant values to a row of the under each respective column Treeview
-                self.tree.insert("", "end", values = (expense, info["amount"], info["type"], info["date"]))
+    #Creating a function to get the ids of all rows
+    #A range is used rather than a list, so displaying all rows does not depend on the number of rows. Once rows have been removed,
+    #a list of the ids of the remaining rows is used instead (made once and kept until the rows change again)
+    def get_all_row_ids(self):
+        if self.removed_count == 0:
+            return range(len(self.all_rows))
+        if self.live_ids == None:
+            self.live_ids = [row_id for row_id, row in enumerate(self.all_rows) if row != None]
+        return self.live_ids
+
+
+    #Creating a function to set the rows displayed in the Treeview (by their row ids) and scroll back to the first row
+    #None is used to display all rows. The rows are displayed in the order of the column being sorted, if there is one
+    def set_view(self, row_ids):
+        self.filter_ids = row_ids
+
+        #The cached sort order of the previous search results no longer applies
+        self.sort_cache_filtered = {}
+
+        self.view_ids = self.get_sorted_ids()
+        self.first_row = 0
+        self.render_rows()
+
+
+    #Creating a function to display the rows again after the rows matching the current search have changed, without scrolling back to the top
+    def refresh_view(self):
+        self.sort_cache_filtered = {}
+        self.view_ids = self.get_sorted_ids()
+        self.render_rows()
+
+
+    #Creating a function to get the sort key of every row for a column
+    #Amounts are sorted by their value in cents and dates by their day number. Purposes and types are sorted by the position
+    #of their name in the sorted list of names, so every sort key is an integer from the arrays of the TransactionStore
+    def get_sort_keys(self, column_name):
+        if column_name not in self.sort_keys:
+            columns = self.columns
+            if column_name == "Amount":
+                keys = columns.amounts
+            elif column_name == "Date":
+                keys = columns.dates
+            else:
+                if column_name == "Transaction":
+                    names = columns.categories
+                    name_ids = columns.category_ids
+                else:
+                    names = columns.type_names
+                    name_ids = columns.types
+
+                #Finding the position of each name in the sorted list of names
+                ranks = [0] * len(names)
+                for rank, name_id in enumerate(sorted(range(len(names)), key = names.__getitem__)):
+                    ranks[name_id] = rank
+                #Rows which have been removed are never displayed, so their type flag (TransactionStore.DELETED or SKIPPED) is given the last position
+                keys = array("i", [ranks[name_id] if name_id < len(ranks) else len(ranks) for name_id in name_ids])
+            self.sort_keys[column_name] = keys
+        return self.sort_keys[column_name]
+
+
+    #Creating a function to get the ids of the rows to display, in the order of the column being sorted
+    #The ascending order of each column is cached, and the descending order is the same order read backwards
+    def get_sorted_ids(self):
+        if self.filter_ids == None:
+            row_ids = self.get_all_row_ids()
+            sort_cache = self.sort_cache_all
+        else:
+            row_ids = self.filter_ids
+            sort_cache = self.sort_cache_filtered
+
+        if self.sort_column == None:
+            return row_ids
+
+        if self.sort_column not in sort_cache:
+            if self.filter_ids == None and isinstance(self.storage, QueryMixin) and not self.loading:
+                #Passing the sort of all rows down to the storage backend, which sorts them with the index of the column (ORDER BY)
+                sort_cache[self.sort_column] = self.storage.sort(self.sort_column)
+            else:
+                #Rows with the same value stay in the order of their row ids, as sorted() keeps the original order of equal values
+                sort_cache[self.sort_column] = sorted(row_ids, key = self.get_sort_keys(self.sort_column).__getitem__)
+        sorted_ids = sort_cache[self.sort_column]
+
+        if self.sort_descending:
+            return ReversedRowIds(sorted_ids)
+        return sorted_ids
+
+
+    #Creating a function to add new rows (from first_row_id to the last row) to the cached sort orders of all rows
+    #Adding rows does not change the order of the existing rows (names keep their order when the ranks are recalculated),
+    #so the new rows only have to be merged into each sorted order rather than sorting every row again
+    def add_to_sort_cache(self, first_row_id):
+        self.sort_keys = {}
+        self.sort_cache_filtered = {}
+        new_ids = [row_id for row_id in range(first_row_id, len(self.all_rows)) if self.all_rows[row_id] != None]
+        for column_name, sorted_ids in self.sort_cache_all.items():
+            self.sort_cache_all[column_name] = sorted(sorted_ids + new_ids, key = self.get_sort_keys(column_name).__getitem__)
+
+
+    #Creating a function to clear every cached sort order and sort key, after rows have been added or removed
+    def clear_sort_cache(self):
+        self.sort_cache_all = {}
+        self.sort_cache_filtered = {}
+        self.sort_keys = {}
+
+
+    #Creating a function to show the visible rows in the Treeview
+    #Existing Treeview items are reused by changing their values, and items are only inserted or deleted when the number of visible rows changes
+    def render_rows(self):
+        count = max(0, min(self.visible_rows + self.OVERSCAN, len(self.view_ids) - self.first_row))
+
+        items = self.tree.get_children()
+        if len(items) > count:
+            self.tree.delete(*items[count:])
+        for num in range(len(items), count):
+            self.tree.insert("", "end")
+        items = self.tree.get_children()
+
+        all_rows = self.all_rows
+        for item, row_id in zip(items, self.view_ids[self.first_row:self.first_row + count]):
+            self.tree.item(item, values = all_rows[row_id])
+
+        #Updating the position and size of the scrollbar slider to match the rows shown
+        total = len(self.view_ids)
+        if total == 0:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.first_row / total, min(1, (self.first_row + self.visible_rows) / total))
+
+
+    #Creating a function to scroll so that a specific row is the first visible row
+    def scroll_to(self, first_row):
+        #Keeping the first row within the range that still fills the Treeview
+        first_row = max(0, min(first_row, len(self.view_ids) - self.visible_rows))
+        if first_row != self.first_row:
+            self.first_row = first_row
+            self.render_rows()
+
+
+    #Creating a function to handle the scrollbar being dragged ("moveto") or its arrows/trough being clicked ("scroll")
+    def on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.view_ids)))
+        elif args[0] == "scroll":
+            if args[2] == "pages":
+                self.scroll_to(self.first_row + int(args[1]) * self.visible_rows)
+            else:
+                self.scroll_to(self.first_row + int(args[1]))
+
+
+    #Creating a function to scroll the rows with the mouse wheel
+    def on_mousewheel(self, event):
+        if event.num == 4:
+            step = -3
+        elif event.num == 5:
+            step = 3
+        else:
+            step = -3 if event.delta > 0 else 3
+        self.scroll_to(self.first_row + step)
+
+        #Returning "break" stops the Treeview from also scrolling its own items
+        return "break"
+
+
+    #Creating a function to update the number of visible rows when the Treeview is resized
+    def on_resize(self, event):
+        try:
+            row_height = int(ttk.Style().lookup("Treeview", "rowheight"))
+        except (TypeError, ValueError):
+            row_height = self.DEFAULT_ROW_HEIGHT
+
+        #The column headings take up around one row at the top of the Treeview
+        visible_rows = max(1, event.height // row_height - 1)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.scroll_to(self.first_row)
+            self.render_rows()
 
     
-    #Creating a function to search for transactions that match the user inputted value and chosen value category
+    #Creating a function to search for transactions that match the user inputted value and chosen value category (when the Search button is clicked)
     def search_transactions(self):
+        #Cancelling the search waiting for the user to stop typing, as the search is started straight away
+        if self.search_after_id != None:
+            self.root.after_cancel(self.search_after_id)
+            self.search_after_id = None
+        self.start_search()
+
+
+    #Creating a function to start a search once the user has stopped typing for SEARCH_DELAY_MS milliseconds
+    def on_search_changed(self, *args):
+        if self.search_after_id != None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(self.SEARCH_DELAY_MS, self.start_search)
+
+
+    #Creating a function to start searching for the user inputted value on a separate thread
+    def start_search(self):
+        self.search_after_id = None
+
         #Getting user inputted value from the search_str variable and the search choice
         user_input = self.search_str.get().capitalize()
         search_choice = self.search_choice.get()
 
-        #Creating an empty dictionary to store all filtered transaction information
-        filtered_transactions = {}
-
-        #Iterating through the key-value pairs of the transactions dictionary
-        for expense, exp_transactions in self.transactions.items():
-
-            #Creating an empty list to store information related to a transaction
-            filtered_items = []
-
-            #Iterating through the values (which exist as lists consisting of dictionaries for each transaction) of the transactions dictionary
-            #The values get added to the filtered_items list if they match the user input and search criteria
-            for info in exp_transactions:
-                if search_choice == "Transaction" and user_input in expense:
-                    filtered_items.append(info)
-                elif search_choice == "Amount" and user_input == info["amount"]:
-                    filtered_items.append(info)
-                elif search_choice == "Type" and user_input in info["type"].capitalize():
-                    filtered_items.append(info)
-                elif search_choice == "Date" and user_input in info["date"]:
-                    filtered_items.append(info)
-
-            #Adding the filtered items related to a specific type of transaction (key) as a value for the relevant transaction in the filtered_transactions dictionary
-            if filtered_items:
-                filtered_transactions[expense] = filtered_items
-
-        #Adding the filtered transactions to the treeview by calling the display transactions function
-        if filtered_transactions:
-            self.display_transactions(filtered_transactions)
-            #The label is emptied here to ensure that if a previous search had no results and the new search does, the unnecessary text in the label will be erased
+        #Displaying all transactions again if the searchbar has been emptied
+        if user_input == "":
+            self.reset_transactions()
+            return
+
+        #Starting a new generation of search, which makes any search still running out of date
+        self.search_generation += 1
+        self.search_ids = []
+        self.search_running = True
+        self.view_filter = ["search", search_choice, user_input]
+
+        search_thread = threading.Thread(target = self.run_search, args = (self.search_generation, search_choice, user_input), daemon = True)
+        search_thread.start()
+
+        #Checking for results from the Tk loop, as Tk widgets can only be changed from the thread running the Tk loop
+        if not self.search_polling:
+            self.search_polling = True
+            self.root.after(self.SEARCH_POLL_MS, self.poll_search_results)
+
+
+    #Creating a function to search the indexes on the search thread, sending the matching row ids back through the queue in batches
+    def run_search(self, generation, search_choice, user_input):
+        #Creating a function to check if a newer search has been started
+        def is_cancelled():
+            return generation != self.search_generation
+
+        with instrumentation.measure("gui search") as measurement:
+            if isinstance(self.storage, QueryMixin):
+                #Passing the search down to the storage backend, which searches the index of the column
+                #(the lock is held for the whole query, as the connection to the database is shared with the loading thread)
+                with self.index_lock:
+                    row_ids = self.storage.search(search_choice, user_input)
+                if is_cancelled():
+                    return
+            else:
+                #Copying the sets of matching row ids while the lock is held, so that loading can carry on changing the index
+                #while the sets are combined and sorted
+                with self.index_lock:
+                    row_sets = [set(rows) for rows in self.search_index.get_row_sets(search_choice, user_input)]
+                row_ids = SearchIndex.merge_row_sets(row_sets, is_cancelled)
+            if row_ids != None:
+                measurement.records = len(row_ids)
+        if row_ids == None:
+            return
+
+        for start in range(0, len(row_ids), self.SEARCH_BATCH_SIZE):
+            if is_cancelled():
+                return
+            self.search_results.put([generation, row_ids[start:start + self.SEARCH_BATCH_SIZE]])
+
+        #An empty batch marks the end of the results
+        self.search_results.put([generation, None])
+
+
+    #Creating a function to add the batches of results sent back from the search thread to the Treeview
+    def poll_search_results(self):
+        finished = False
+        first_batch = False
+        try:
+            while True:
+                generation, row_ids = self.search_results.get_nowait()
+
+                #Ignoring results from searches which have been replaced by a newer search
+                if generation != self.search_generation:
+                    continue
+                if row_ids == None:
+                    finished = True
+                    break
+                if not self.search_ids:
+                    first_batch = True
+                self.search_ids.extend(row_ids)
+        except queue.Empty:
+            pass
+
+        if first_batch:
+            #Displaying the first batch of matching rows straight away and the label is emptied here to ensure that
+            #if a previous search had no results and the new search does, the unnecessary text in the label will be erased
+            self.set_view(self.search_ids)
             self.invalid_input_label.config(text = "")
-        else:
+        elif self.search_ids:
+            #Showing the rows added by later batches without scrolling back to the top
+            self.refresh_view()
+
+        if finished and not self.search_ids:
             #Displaying a message in the label to the user if no results that match the input and search criteria have been found
             self.invalid_input_label.config(text = "No results were found to match the chosen search criteria.")
 
+        if finished:
+            self.search_running = False
+
+        #Continuing to check for results while a search is still running
+        if self.search_running:
+            self.root.after(self.SEARCH_POLL_MS, self.poll_search_results)
+        else:
+            self.search_polling = False
+
     
+    #Creating a function to display the transactions between the dates entered in the From and To fields, in date order
+    #The range is found with the sorted dates of the search index (or the date index of the storage backend), so it does not have to be sorted afterwards
+    def filter_date_range(self):
+        try:
+            start, end = parse_date_range(self.date_from_str.get(), self.date_to_str.get())
+        except ValueError as error_msg:
+            self.invalid_input_label.config(text = str(error_msg))
+            return
+
+        #Displaying all transactions again if both fields are empty
+        if start == None and end == None:
+            self.reset_transactions()
+            return
+
+        #Making any search still running out of date, so its results do not replace the transactions in the date range
+        self.search_generation += 1
+        self.search_running = False
+
+        with self.index_lock, instrumentation.measure("gui date range") as measurement:
+            if isinstance(self.storage, QueryMixin):
+                row_ids = self.storage.date_range(start, end)
+            else:
+                row_ids = self.search_index.date_range(start, end)
+            measurement.records = len(row_ids)
+
+        #Clearing the column being sorted, so the transactions are displayed in date order
+        self.sort_column = None
+        self.sort_descending = False
+        self.view_filter = ["date", start, end]
+        self.set_view(row_ids)
+        if row_ids:
+            self.invalid_input_label.config(text = "")
+        else:
+            self.invalid_input_label.config(text = "No transactions were found in this date range.")
+
+
     #Creating a function to reset the values displayed in the Treeview
     def reset_transactions(self):
-        #Calling the display transactions function and setting the invalid input label to "" (To empty the label)
-        self.display_transactions(self.transactions)
+        #Making any search still running out of date, so its results are not displayed after the reset
+        self.search_generation += 1
+        self.search_running = False
+
+        #Displaying the rows of all transactions and setting the invalid input label to "" (To empty the label)
+        self.view_filter = None
+        self.set_view(None)
         self.invalid_input_label.config(text = "")
 
 
@@ -191,33 +971,12 @@ class FinanceTrackerGUI:
             self.sort_column = column_name
             self.sort_descending = False
 
-        #Creating an empty list to store the values related to in each row of a column in tuples
-        data = []
-
-        #Iterating throught the values of each row of the Treeview
-        for item in self.tree.get_children(""):
-            #Getting the value of the specified column and assigning it to the value for each item
-            value = self.tree.set(item, column_name)
-
-            #Converting the value to a floating point value if it is of the type "Amount" to ensure it isn't sorted as a string value
-            if column_name == "Amount":
-                value = float(value)
-
-            #Appending a tuple with the value and item to the data list
-            data.append((value, item))
-
-        #Sorting the values in the data list.
-        #The reverse parameter is determined by the the sort_descending value (True/False) in the beginning of the function
-        data.sort(reverse = self.sort_descending)
-
-        #Initializing variable to specify the new position of a row (item) in the Treeview
-        num = 0
-
-        #Iterating throught the tuples in the the data list
-        for val, item in data:
-            #Moving the item in the Treeview to the new position based on the sorting order and num value
-            self.tree.move(item, "", num)
-            num += 1
+        #Getting the sorted order of the rows from the data model (rather than reading the values back from the Treeview)
+        #and showing the sorted rows in the Treeview
+        with instrumentation.measure("gui sort") as measurement:
+            self.view_ids = self.get_sorted_ids()
+            self.render_rows()
+            measurement.records = len(self.view_ids)
 
 #Creating a function to open a GUI that allow user to navigate through the transactions in the Finance Tracker and search for specific transactions
 def search_and_sort_transactions(filename):
@@ -225,7 +984,8 @@ def search_and_sort_transactions(filename):
     app = FinanceTrackerGUI(root, filename)
     root.mainloop()
 
-search_and_sort_transactions("transactions.json")
-
 
 
+#Opening the GUI when this file is run (importing it does not open the GUI)
+if __name__ == "__main__":
+    search_and_sort_transactions("transactions.json")
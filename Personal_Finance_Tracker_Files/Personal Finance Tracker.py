@@ -1,7 +1,255 @@
-import tkinter as tk
-from tkinter import ttk
 import json
-from datetime import datetime
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from datetime import date, datetime
+
+#Modules which are only needed by some of the menu actions and commands (tkinter, sqlite3, threading, csv and argparse)
+#are imported inside the functions which use them, so starting the Finance Tracker does not have to wait for them.
+#The GUI is kept in "Personal Finance Tracker GUI.py", which is only loaded when the user opens it (see load_gui)
+#The spending statistics are kept in "Personal Finance Tracker Analytics.py" (which uses NumPy if it is installed), which is only loaded when they are needed (see load_analytics)
+
+#Registering this file as the "finance_tracker" module, so the GUI module uses this copy of it rather than loading the file again
+if __name__ in sys.modules:
+    sys.modules.setdefault("finance_tracker", sys.modules[__name__])
+
+#Journal settings
+#When journal mode is enabled, every add/update/delete appends one small change record to a journal file next to the JSON file
+#instead of rewriting the whole JSON file. The journal is folded back into the JSON file once it grows past JOURNAL_COMPACT_SIZE bytes.
+JOURNAL_MODE = True
+JOURNAL_COMPACT_SIZE = 64 * 1024
+
+#Number of characters read from the JSON file at a time by the streaming reader
+STREAM_CHUNK_SIZE = 64 * 1024
+
+#Snapshot settings
+#When snapshot mode is enabled, the JSON backend keeps a binary cache of the JSON file next to it (eg: transactions.snapshot), which is loaded
+#instead of parsing the JSON text. The snapshot is written when the journal is compacted into the JSON file, and is written again the next time
+#the transactions are loaded once the JSON file has been changed in any other way (eg: by editing it or with journal mode disabled).
+#Snapshot mode can be disabled by setting the FINANCE_TRACKER_SNAPSHOT environment variable to 0
+SNAPSHOT_MODE = os.environ.get("FINANCE_TRACKER_SNAPSHOT", "1") != "0"
+
+#When verification is enabled (by setting the FINANCE_TRACKER_VERIFY environment variable to 1), the running totals kept by the session
+#are recalculated from scratch after every change and compared with the totals updated from the change
+VERIFY_AGGREGATES = os.environ.get("FINANCE_TRACKER_VERIFY") == "1"
+
+#Number of transactions displayed per page by view_transactions and transactions_summary when the output is a terminal
+PAGE_SIZE = 20
+
+#Number of CSV rows validated and saved together by the bulk import (each batch is saved with a single write)
+IMPORT_BATCH_SIZE = 1000
+
+#Parallel aggregation settings
+#The running totals of ledgers with at least PARALLEL_MIN_RECORDS transactions are added up by AGGREGATE_WORKERS worker processes, which can be changed
+#with the FINANCE_TRACKER_WORKERS environment variable or the --workers option (0 uses one worker per CPU and 1 adds them up in a single process)
+#The totals are added up in a single process by default, as worker processes were not found to be faster on every machine (eg: with a single CPU)
+AGGREGATE_WORKERS = os.environ.get("FINANCE_TRACKER_WORKERS", "1")
+AGGREGATE_WORKERS = int(AGGREGATE_WORKERS) if AGGREGATE_WORKERS.isdigit() else 1
+PARALLEL_MIN_RECORDS = 200000
+
+#Storage backend used for the transaction records ("json", "sqlite" or "sharded"), which can be changed with the FINANCE_TRACKER_STORAGE environment variable
+#The JSON file is used by default. The SQLite database is kept next to the JSON file (eg: transactions.db) and the JSON file is imported into it when the database is created
+STORAGE_BACKEND = os.environ.get("FINANCE_TRACKER_STORAGE", "json")
+
+#Period of each shard of the sharded storage backend ("year" or "month"), which can be changed with the FINANCE_TRACKER_SHARD_PERIOD environment variable
+#The period is only used when the shards are first created, after which the period recorded in the manifest is used
+SHARD_PERIOD = os.environ.get("FINANCE_TRACKER_SHARD_PERIOD", "year")
+
+#Instrumentation settings
+#When instrumentation is enabled (by setting the FINANCE_TRACKER_PROFILE environment variable to 1 or with the --profile option), loading, saving,
+#adding, updating, deleting, the summary and the GUI search and sort are timed, along with the number of records, the bytes read and written
+#and the peak memory use (from tracemalloc). The stats of each session are added to STATS_FILENAME on exit and can be viewed from the main menu.
+#If the FINANCE_TRACKER_PROFILE_DIR environment variable is set to a folder, a cProfile dump of every measured operation is also written to it
+INSTRUMENTATION = os.environ.get("FINANCE_TRACKER_PROFILE") == "1"
+PROFILE_DIR = os.environ.get("FINANCE_TRACKER_PROFILE_DIR")
+STATS_FILENAME = "finance_tracker_stats.jsonl"
+
+
+#Creating a class definition for a single measurement of an operation, used as a "with" block around the code being measured
+#The number of records handled by the operation can be set on the measurement inside the block
+class Measurement:
+
+    #Creating a function to act as the constructor of an object
+    #A measurement without an instrumentation object (when instrumentation is disabled) does nothing
+    def __init__(self, instrumentation = None, operation = None):
+        self.instrumentation = instrumentation
+        self.operation = operation
+        self.records = 0
+
+
+    #Creating a function to start the measurement at the start of the "with" block
+    def __enter__(self):
+        if self.instrumentation != None:
+            self.instrumentation.start(self)
+        return self
+
+
+    #Creating a function to stop the measurement at the end of the "with" block (the measurement is also recorded if an error was raised)
+    def __exit__(self, error_type, error, traceback):
+        if self.instrumentation != None:
+            self.instrumentation.stop(self)
+        return False
+
+
+#Creating a class definition for a pause in the measurements (eg: while waiting for the user to type), so the time spent waiting is not counted
+class MeasurementPause:
+
+    #Creating a function to act as the constructor of an object
+    def __init__(self, instrumentation):
+        self.instrumentation = instrumentation
+
+
+    #Creating a function to start the pause
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+
+    #Creating a function to add the length of the pause to the paused time of the instrumentation
+    def __exit__(self, error_type, error, traceback):
+        self.instrumentation.paused_time += time.perf_counter() - self.start
+        return False
+
+
+#Creating a class definition for the instrumentation of the Finance Tracker, which keeps the stats of every operation measured in this session
+#The bytes read and written are counted by the functions reading and writing the JSON file and its journal
+class Instrumentation:
+
+    #Creating a function to act as the constructor of an object
+    def __init__(self, enabled = False, profile_dir = None, stats_filename = STATS_FILENAME):
+        self.enabled = False
+        self.profile_dir = profile_dir
+        self.stats_filename = stats_filename
+        self.stats = {}
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.paused_time = 0
+        self.active = 0
+        self.dumps = 0
+        if enabled:
+            self.enable()
+
+
+    #Creating a function to start recording stats (tracemalloc, threading and cProfile are only imported once instrumentation is enabled)
+    #The stats are written to the stats file when the program exits
+    def enable(self, profile_dir = None):
+        if self.enabled:
+            return
+        import atexit
+        import threading
+        import tracemalloc
+        if profile_dir != None:
+            self.profile_dir = profile_dir
+        self.lock = threading.Lock()
+        self.started = datetime.now().isoformat(timespec = "seconds")
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        atexit.register(self.write_stats)
+        self.enabled = True
+
+
+    #Creating a function to create a measurement of an operation
+    def measure(self, operation):
+        if self.enabled:
+            return Measurement(self, operation)
+        return Measurement()
+
+
+    #Creating a function to create a pause in the measurements
+    def pause(self):
+        return MeasurementPause(self)
+
+
+    #Creating a function to count text read from a file opened in text mode, as the number of bytes it takes up in the file
+    #The file has to be opened with newline = "" so the line endings are not changed, and the text is only encoded while the instrumentation is enabled
+    def count_text_read(self, text, encoding):
+        if self.enabled:
+            self.bytes_read += len(text.encode(encoding))
+
+
+    #Creating a function to start a measurement
+    #The peak memory use is only reset when no other operation is being measured, so the peak of an operation includes the operations it is part of
+    def start(self, measurement):
+        import tracemalloc
+        with self.lock:
+            if self.active == 0:
+                tracemalloc.reset_peak()
+            self.active += 1
+            outermost = self.active == 1
+
+        #Only the outermost operation is profiled, as only one profiler can run at a time
+        measurement.profiler = None
+        if outermost and self.profile_dir != None:
+            import cProfile
+            measurement.profiler = cProfile.Profile()
+            try:
+                measurement.profiler.enable()
+            except ValueError:
+                measurement.profiler = None
+
+        measurement.start_memory = tracemalloc.get_traced_memory()[0]
+        measurement.bytes_read = self.bytes_read
+        measurement.bytes_written = self.bytes_written
+        measurement.paused_time = self.paused_time
+        measurement.start_time = time.perf_counter()
+
+
+    #Creating a function to stop a measurement and add it to the stats of its operation
+    def stop(self, measurement):
+        import tracemalloc
+        elapsed = time.perf_counter() - measurement.start_time - (self.paused_time - measurement.paused_time)
+        if measurement.profiler != None:
+            measurement.profiler.disable()
+        peak_memory = max(0, tracemalloc.get_traced_memory()[1] - measurement.start_memory)
+
+        with self.lock:
+            self.active -= 1
+            stats = self.stats.setdefault(measurement.operation, {"calls": 0, "total_s": 0, "max_s": 0, "records": 0, "bytes_read": 0, "bytes_written": 0, "peak_memory": 0})
+            stats["calls"] += 1
+            stats["total_s"] += elapsed
+            stats["max_s"] = max(stats["max_s"], elapsed)
+            stats["records"] += measurement.records
+            stats["bytes_read"] += self.bytes_read - measurement.bytes_read
+            stats["bytes_written"] += self.bytes_written - measurement.bytes_written
+            stats["peak_memory"] = max(stats["peak_memory"], peak_memory)
+            if measurement.profiler != None:
+                self.dumps += 1
+                dump_number = self.dumps
+
+        if measurement.profiler != None:
+            os.makedirs(self.profile_dir, exist_ok = True)
+            measurement.profiler.dump_stats(os.path.join(self.profile_dir, f"{measurement.operation.replace(' ', '_')}-{os.getpid()}-{dump_number}.prof"))
+
+
+    #Creating a function to get the stats of this session as a dictionary
+    def get_session(self):
+        with self.lock:
+            operations = {operation: dict(stats) for operation, stats in self.stats.items()}
+        return {"started": self.started, "finished": datetime.now().isoformat(timespec = "seconds"), "pid": os.getpid(), "operations": operations}
+
+
+    #Creating a function to add the stats of this session to the stats file as a line of JSON (nothing is written if nothing was measured)
+    def write_stats(self):
+        if not self.enabled or self.stats == {}:
+            return
+        try:
+            with open(self.stats_filename, "a") as file:
+                file.write(json.dumps(self.get_session()) + "\n")
+        except OSError as error_msg:
+            print(f"The performance stats could not be saved: {error_msg}")
+        return
+
+
+#The instrumentation of this session (the GUI module uses the same object)
+instrumentation = Instrumentation(INSTRUMENTATION, PROFILE_DIR)
 
 #Creating a function to verify if a value inputted is of the data type 'float'
 def float_input(msg, error_msg = "\nInvalid input. Please enter a numerical value.\n"):
@@ -11,6 +259,11 @@ def float_input(msg, error_msg = "\nInvalid input. Please enter a numerical valu
         except ValueError:
             print(error_msg)
         else:
+            #"nan" and "inf" are read by float() but cannot be added up, so they are not accepted as amounts
+            if not math.isfinite(num):
+                print(error_msg)
+                continue
+
             #Changing the format of the number to ensure it has 2 decimal points
             return "{:.2f}".format(num)
 
@@ -105,586 +358,3568 @@ def create_new_transaction(msg1, msg2, msg3):
     return[purpose, sub_dict]
 
 
-#Creating a function to load data from JSON file
-def load_json(filename):
-    try: 
-        #Loading information in the JSON file to a data variable (with an initial value of None)
-        loaded_data = None
-        with open(filename, "r") as file:
-            loaded_data = json.load(file)
-    except json.JSONDecodeError as error_msg:
-        print(f"Error decoding JSON: {error_msg}")
-    except FileNotFoundError:
-        print("Transaction records cannot be found.")
-    return loaded_data
+#Creating a function to read the transactions in a JSON file one at a time instead of loading the whole file at once
+#The file is read in chunks and each transaction is yielded as a [purpose, transaction dictionary] list as soon as it has been parsed,
+#so only the current chunk and the current transaction are held in memory by the reader
+#A json.JSONDecodeError is raised if the file is not in the {purpose: [transactions...]} layout used by the Finance Tracker
+def iter_transactions_from_file(filename, chunk_size = STREAM_CHUNK_SIZE):
+    decoder = json.JSONDecoder()
+    whitespace = re.compile(r"[ \t\n\r]*")
+
+    #The line endings are not changed as the file is read (the decoder skips "\r" as whitespace), so the bytes read can be counted
+    with open(filename, "r", newline = "") as file:
+        #"state" holds the unparsed text, the current position in it and whether the end of the file has been reached
+        state = {"buffer": "", "position": 0, "end_of_file": False}
+
+        #Creating a function to read the next chunk of the file into the buffer. False is returned at the end of the file
+        def read_chunk():
+            chunk = file.read(chunk_size)
+            if not chunk:
+                state["end_of_file"] = True
+                return False
+            instrumentation.count_text_read(chunk, file.encoding)
+
+            #Dropping the text which has already been parsed so the buffer does not keep growing
+            state["buffer"] = state["buffer"][state["position"]:] + chunk
+            state["position"] = 0
+            return True
+
+        #Creating a function to get the next character which is not whitespace ("" is returned at the end of the file)
+        def next_character():
+            while True:
+                buffer = state["buffer"]
+                position = whitespace.match(buffer, state["position"]).end()
+                state["position"] = position
+                if position < len(buffer):
+                    return buffer[position]
+                if not read_chunk():
+                    return ""
+
+        #Creating a function to check the next character is the one expected and move past it
+        def expect(characters):
+            character = next_character()
+            if character == "" or character not in characters:
+                raise json.JSONDecodeError(f"Expecting one of {characters!r}", state["buffer"], state["position"])
+            state["position"] += 1
+            return character
+
+        #Creating a function to decode the next JSON value, reading more of the file until the value is complete
+        def next_value():
+            next_character()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(state["buffer"], state["position"])
+                except json.JSONDecodeError:
+                    if state["end_of_file"] or not read_chunk():
+                        raise
+                    continue
+
+                #A value ending exactly at the end of the buffer (eg: a number) may continue in the next chunk
+                if end == len(state["buffer"]) and not state["end_of_file"] and read_chunk():
+                    continue
+                state["position"] = end
+                return value
+
+        expect("{")
+        if next_character() == "}":
+            return
+
+        while True:
+            #Reading the purpose of the transactions, followed by the list of transactions
+            if next_character() != '"':
+                raise json.JSONDecodeError("Expecting property name enclosed in double quotes", state["buffer"], state["position"])
+            expense = next_value()
+            expect(":")
+            expect("[")
+
+            if next_character() == "]":
+                state["position"] += 1
+            else:
+                while True:
+                    yield [expense, next_value()]
+                    if expect(",]") == "]":
+                        break
+
+            if expect(",}") == "}":
+                return
 
 
 #Creating a function to bulk read information stored in the JSON file
-def read_bulk_transactions_from_file(filename):
+#If a TransactionIndex is provided, every transaction loaded is also added to the index
+#If snapshot is True, the transactions are loaded from the binary snapshot of the JSON file when it is up to date, and from the JSON file otherwise
+#(in which case the snapshot is written again, so the next load can use it)
+def read_bulk_transactions_from_file(filename, index = None, snapshot = False):
+    #Getting the modification time and size of the JSON file before it is read, which is saved with the snapshot
+    stamp = get_file_stamp(filename)
+    if snapshot:
+        transactions = read_snapshot(filename, stamp, index)
+        if transactions != None:
+            #Applying any changes recorded in the journal since the JSON file was last compacted
+            replay_journal(transactions, filename, index)
+            return transactions
+
     #Creating an empty dictionary to store all transactions 
     transactions = {}
 
-    #Calling a function to load  data from a JSON File
-    bulk_data = load_json(filename)
+    try:
+        #Iterating through the transactions as they are read from the JSON file
+        for expense, info in iter_transactions_from_file(filename):
 
-    if bulk_data != None:    
-        #Iterating through the key-value pairs of loaded data
-        for expense, exp_transactions in bulk_data.items():
-
-            #Iterating through the value (which consists of a transaction list) of each key
-            for info in exp_transactions:
+            #Creating a new list for all transactions related to the key (expenses/income category) if the key does not exist in the main transactions dictionary
+            if expense not in transactions:
+                transactions[expense] = []
 
-                #Creating a new list for all transactions related to the key (expenses/income category) if the key does not exist in the main transactions dictionary
-                if expense not in transactions:
-                    transactions[expense] = []
+            #Using a temporary variable to append the expense(transaction) to the transactions list related to it's key (category)
+            temp = transactions[expense]
+            temp.append(info)
+            transactions[expense] = temp
+            if index != None:
+                index.add(expense, info)
 
-                #Using a temporary variable to append the expense(transaction) to the transactions list related to it's key (category)
-                temp = transactions[expense]
-                temp.append(info)
-                transactions[expense] = temp
+    except json.JSONDecodeError as error_msg:
+        print(f"Error decoding JSON: {error_msg}")
+        return None
+    except FileNotFoundError:
+        print("Transaction records cannot be found.")
+        return None
 
-        return transactions
+    #Writing the snapshot which was out of date (or missing or damaged) before the journal is applied, as it only holds the transactions in the JSON file
+    #It is not written if the JSON file was changed while it was being read. The snapshot is only a cache, so if it cannot be written the JSON file is read again next time
+    if snapshot and get_file_stamp(filename) == stamp:
+        try:
+            write_snapshot(transactions, filename, stamp)
+        except OSError:
+            pass
 
-    else:
-        return bulk_data
+    #Applying any changes recorded in the journal since the JSON file was last compacted
+    replay_journal(transactions, filename, index)
+    return transactions
 
 
 #Creating a function to add the values in the main transactions dictionary to a JSON file
 def add_to_json(transactions, filename):
-    with open(filename, "w") as file:
+    #Writing to a temporary file first and then replacing the JSON file, so the JSON file is never left half-written
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, "w") as file:
         file.write("{\n")
+        last_key = len(transactions) - 1
+
         #Iterating through the key-value pairs of the main transactions dictionary 
-        for expense, exp_transactions in transactions.items():
-            file.write(f'  "{expense}": [\n    ')
+        for key_position, (expense, exp_transactions) in enumerate(transactions.items()):
+            #The purpose is written with json.dumps, so quotes and backslashes in it (eg: from an imported bank statement) are escaped
+            file.write(f"  {json.dumps(expense)}: [\n    ")
 
             #Iterating through the value (which consists of a transaction list) of each key in order to ensure every transaction gets serealized line-by-line
             # "info" represents each individual transaction under a certain key (which is an expense/income)
-            for info in exp_transactions:
+            #Positions are compared rather than values, as a duplicate of the last transaction must still be followed by a comma
+            last_position = len(exp_transactions) - 1
+            for position, info in enumerate(exp_transactions):
                 json.dump(info, file)
-                if info != exp_transactions[-1]:
+                if position != last_position:
                     file.write(",\n    ")
                 else:
                     file.write("\n  ")
 
-            #Adding the transaction keys to a list and changing how "]" is written to the JSON file based on if the final element in the keys list has been reached
-            if expense == list(transactions.keys())[-1]:
+            #Changing how "]" is written to the JSON file based on if the final key has been reached
+            if key_position == last_key:
                 file.write("]\n")
             else:
                 file.write("],\n")
-                    
+
         file.write("}")
+        instrumentation.bytes_written += file.tell()
+
+    #Reading the temporary file back before it replaces the JSON file, so a file which does not hold exactly the same transactions
+    #(eg: because of a bug in the way they were written) never replaces it
+    if not check_written_file(temp_filename, transactions):
+        os.remove(temp_filename)
+        raise ValueError(f"The transactions written to {temp_filename} could not be read back, so {filename} has not been replaced.")
+    os.replace(temp_filename, filename)
     return
 
 
-#Creating a function to add a new transaction to the Finance Tracker
-def add_transaction(transactions, filename):
-    #Calling a function to create a list to store information about the transaction
-    new_transaction = create_new_transaction("Enter the amount paid/receieved during the transaction : ", "Enter the purpose of the transaction : ", "Enter the type of transaction being made (Type 'CR' for Income or 'DR' for Expenses) : ")
-    purpose = new_transaction[0]
-    sub_dict = new_transaction[1]
-    
-    #Creating a new list for all transactions related to a key(purpose) if the key does not exist in the main transactions dictionary
-    if purpose not in transactions:
-        transactions[purpose] = []
+#Creating a function to check if a JSON file written by add_to_json holds exactly the transactions in the main transactions dictionary, in the same order
+def check_written_file(filename, transactions):
+    expected = ([expense, info] for expense, exp_transactions in transactions.items() for info in exp_transactions)
+    try:
+        for entry in iter_transactions_from_file(filename):
+            if entry != next(expected, None):
+                return False
+    except json.JSONDecodeError:
+        return False
+    return next(expected, None) == None
 
-    #Using a temporary variable to append the sub dictionary to the transactions list related to it's key   
-    temp = transactions[purpose]
-    temp.append(sub_dict)
-    transactions[purpose] = temp
 
-    #Calling a function to add all information from the main transactions dictionary to the JSON file
-    add_to_json(transactions, filename)
-    print("\nThe transaction has been successfully added.\n")
-    return
+#Creating a function to get the name of the journal file related to a JSON file
+def get_journal_filename(filename):
+    return filename + ".journal"
 
 
-#Creating a function to view all transactions recorded in the JSON file
-def view_transactions(transactions):
-    #Checking if the JSON file contains an empty dictionary. If the dictionary is empty, there are no financial records.
-    if transactions != {}:
-        #Displaying information about each transaction to the user by iterating through the key-value pairs of the main transactions dictionary
-        for expense,exp_transactions in transactions.items():
-            for info in exp_transactions:
-                print(f"Transaction amount : {info["amount"]}\nTransaction purpose : {expense}\nTransaction type : {info["type"]}\nTransaction date : {info["date"]}\n\n")
+#Creating a function to get the name of the rollup report file (eg: transactions.json.rollup.json) related to the file of the transaction records
+#The kind of storage backend is part of the name, as the JSON file, the SQLite database and the folder of shards have the same name without their extension
+def get_rollup_filename(filename, kind):
+    return os.path.splitext(filename)[0] + f".{kind}.rollup.json"
+
+
+#Creating a function to get the name of the binary snapshot file (eg: transactions.snapshot) related to a JSON file
+def get_snapshot_filename(filename):
+    return os.path.splitext(filename)[0] + ".snapshot"
+
+
+#Creating a function to get the modification time and size of a file (None is returned if the file does not exist)
+def get_file_stamp(filename):
+    try:
+        file_stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return [file_stat.st_mtime_ns, file_stat.st_size]
+
+
+#Creating a function to count the transactions in the main transactions dictionary (0 is returned if it could not be loaded)
+def count_transactions(transactions):
+    if transactions == None:
+        return 0
+    return sum(len(exp_transactions) for exp_transactions in transactions.values())
+
+
+#Creating a function to apply a single change record from the journal to the main transactions dictionary
+#If a TransactionIndex is provided, it is used to find the transaction and kept up to date with the change
+def apply_change(transactions, change, index = None):
+    purpose = change["purpose"]
+    info = change["record"]
+
+    if change["op"] == "add":
+        #Creating a new list for all transactions related to the purpose if the key does not exist in the main transactions dictionary
+        if purpose not in transactions:
+            transactions[purpose] = []
+        transactions[purpose].append(info)
+        if index != None:
+            index.add(purpose, info)
+        return True
+
+    #Updates and deletes are only applied if the original transaction can still be found
+    exp_transactions = transactions.get(purpose, [])
+    if index != None:
+        info = index.find(purpose, info)
+        if info == None:
+            return False
+        index.remove(purpose, info)
+    elif info in exp_transactions:
+        info = exp_transactions[exp_transactions.index(info)]
     else:
-        #Displaying a message if no transactions have been recorded
-        print("There are no financial records.\n")
+        return False
+
+    if change["op"] == "delete":
+        remove_record(exp_transactions, info)
+
+    elif change["op"] == "update":
+        new_purpose = change["new_purpose"]
+        new_info = change["new_record"]
+        if new_purpose == purpose:
+            #Replacing the transaction in the same position if the purpose has not been changed
+            info.clear()
+            info.update(new_info)
+            new_info = info
+        else:
+            #Moving the transaction to the end of the list related to the new purpose (the same way update_transaction does it)
+            remove_record(exp_transactions, info)
+            if new_purpose not in transactions:
+                transactions[new_purpose] = []
+            transactions[new_purpose].append(new_info)
+        if index != None:
+            index.add(new_purpose, new_info)
+    return True
+
+
+#Creating a function to apply all changes recorded in the journal on top of the transactions loaded from the JSON file
+def replay_journal(transactions, filename, index = None):
+    journal_filename = get_journal_filename(filename)
+    try:
+        #The line endings are not changed as the journal is read, so the bytes read can be counted (json.loads ignores the "\r" of a "\r\n")
+        with open(journal_filename, "r", newline = "") as file:
+            #The first line of the journal records the modification time and size of the JSON file the journal was started from
+            header = file.readline()
+            instrumentation.count_text_read(header, file.encoding)
+            try:
+                snapshot = json.loads(header)["snapshot"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                print("The transactions journal is damaged and has been ignored.")
+                return 0
+
+            #Ignoring the journal if the JSON file has been replaced since (eg: a compaction was interrupted before the journal was removed)
+            if snapshot != get_file_stamp(filename):
+                print("The transactions journal is out of date and has been ignored.")
+                return 0
+
+            count = 0
+            for line in file:
+                instrumentation.count_text_read(line, file.encoding)
+                try:
+                    change = json.loads(line)
+                except json.JSONDecodeError:
+                    #A partially written final line is left behind if the program stopped while appending to the journal
+                    break
+                apply_change(transactions, change, index)
+                count += 1
+    except FileNotFoundError:
+        return 0
+    return count
+
+
+#Creating a function to append a list of change records to the journal with a single write
+#The size of the journal is returned
+def append_changes_to_journal(changes, filename):
+    journal_filename = get_journal_filename(filename)
+    with open(journal_filename, "a") as file:
+        lines = [json.dumps(change) + "\n" for change in changes]
+
+        #Writing the header line if the journal has just been created
+        start = file.tell()
+        if start == 0:
+            lines.insert(0, json.dumps({"snapshot": get_file_stamp(filename)}) + "\n")
+        file.write("".join(lines))
+
+        #Counting the bytes written from the size of the journal (which includes any line endings changed as the text was written)
+        size = file.tell()
+        instrumentation.bytes_written += size - start
+        return size
+
+
+#Creating a function to fold the journal back into the JSON file
+#The journal is only removed once the JSON file has been replaced by a copy which was read back successfully, so if the JSON file
+#cannot be written (add_to_json raises an OSError or ValueError) the changes are kept in the journal. True is returned if the journal was compacted
+#The binary snapshot of the JSON file is written again here (it is otherwise only written when the transactions are loaded and it was out of date)
+#The transactions can be a main transactions dictionary or a TransactionStore
+def compact_journal(transactions, filename):
+    transactions = get_transactions_dictionary(transactions)
+    try:
+        add_to_json(transactions, filename)
+    except (OSError, ValueError) as error_msg:
+        print(f"The transactions journal could not be compacted and has been kept: {error_msg}")
+        return False
+    try:
+        os.remove(get_journal_filename(filename))
+    except FileNotFoundError:
+        pass
+
+    #The snapshot is only a cache of the JSON file, so if it cannot be written the JSON file is read instead the next time
+    if SNAPSHOT_MODE:
+        try:
+            write_snapshot(transactions, filename, get_file_stamp(filename))
+        except OSError:
+            pass
+    return True
+
+
+#Creating a function to save a list of changes made to the main transactions dictionary with a single write
+#compact_size can be set to None so the journal is not compacted (eg: while a bulk import is still adding to it)
+#The transactions can be a main transactions dictionary or a TransactionStore, which is only turned into a dictionary if the JSON file is rewritten
+def save_changes(transactions, filename, changes, compact_size = JOURNAL_COMPACT_SIZE):
+    if JOURNAL_MODE:
+        journal_size = append_changes_to_journal(changes, filename)
+
+        #Compacting the journal into the JSON file once it grows past the configured size
+        if compact_size != None and journal_size > compact_size:
+            compact_journal(transactions, filename)
+    else:
+        #Rewriting the whole JSON file if journal mode is disabled
+        add_to_json(get_transactions_dictionary(transactions), filename)
     return
 
 
-#Creating a function to update a transaction from the Finance Tracker
-def update_transaction(transactions, filename):
-    #Allowing user to input transaction information to be updated if there are previous transaction records in the main transactions dictionary
-    if transactions != {}:
-        
-        #Calling a function to create a new list for comparison purposes
-        upd_transaction_info = create_new_transaction("Enter the amount of money from the transaction to be updated : ", "Enter the purpose of the transaction which should to be updated : ", "Enter the type of transaction which should be updated (Type 'CR' for Income or 'DR' for Expenses): ")
-        purpose = upd_transaction_info[0]
-        sub_dict = upd_transaction_info[1]
-        
-        #Comparing the the list information consisting of user inputs with existing transaction information to verify if the transaction exists
-        try:
-            for expense, exp_transactions in transactions.items():
-                #Checking if the value of "purpose" is among the keys of the main dictionary
-                if purpose == expense:
-                    #Iterating through the values (which exist as lists consisting of dictionaries for each transaction) of the main transactions dictionary
-                    for info in exp_transactions:
-                        if sub_dict == info:
-                            while True:
-                                #Getting the field to be updated and it's updated value from the user
-                                field = input("\nWhich field do you wish to update? (Please type Amount/Purpose/Type/Date) : ").lower()
-                                if field == "amount":
-                                    info["amount"] = float_input("Enter updated amount paid/recieved : ")
-                                    
-                                elif field == "purpose":
-                                    new_expense = input("Enter updated purpose : ").capitalize()
-
-                                    #Creating a new list for all transactions related to "new_expense" if the a key of the same value does not exist in the main transactions dictionary
-                                    if new_expense not in transactions:
-                                        transactions[new_expense] = []
-                                        
-                                    #Using a temporary variable to append the transaction information(the dictionary "info") to the transactions list related to it's key
-                                    temp = transactions[new_expense]
-                                    temp.append(info)
-                                    transactions[new_expense] = temp
-
-                                    #Deleting the old transaction "info" as the same transaction exists with a new key value(new_purpose)
-                                    del transactions[expense][exp_transactions.index(info)]
-         
-                                elif field == "type":
-                                    info["type"] = get_transaction_type("Enter updated transaction type (Type 'CR' for Income or 'DR' for Expenses) : ")
-                                elif field == "date":
-                                    info["date"] = get_transaction_date()
-                                else:
-                                    print("\nInvalid field. Please try again.\n")
-                                    continue
-                                
-                                #Giving user the option to make more changes to the transaction
-                                #.upper() is used for the user input for comparison purposes with the if-statement.
-                                choice = get_choice("\nDo you wish to make more updates to this transaction? (Y/N) : ")
-                                if choice == "Y":
-                                    continue
-                                else:
-                                    print("\nAll changes to the transaction have been made.\n")
-                                    break
-                        
-                            #Calling a function to add all information from the main transactions dictionary to the JSON file
-                            add_to_json(transactions, filename)
-                            return
-
-                        #Displaying a message to the user if the final iteration of the list of transactions related to each key of the main transactions dictionary has been reached                 
-                        elif info == exp_transactions[-1]:
-                            print("\nThis transaction could not be found.\n")
-
-                            #Giving user the option to try again if the transaction details entered does not match any transactions stored in the main transactions dictionary
-                            choice = get_choice("Do you wish to try again? (Y/N) : ")
-                            if choice == "Y":
-                                print("\n")
-                                update_transaction(transactions,filename)
-                            else:
-                                break
-
-                #Giving user the option to try again if the entered "purpose" does not match any key of the main transactions dictionary
-                elif purpose not in list(transactions.keys()):
-                    print("\nThis transaction could not be found.\n")
-                    
-                    choice2 = get_choice("Do you wish to try again? (Y/N) : ")
-                    if choice2 == "Y":
-                        print("\n")
-                        update_transaction(transactions, filename)
-                    else:
-                        break
+#Creating a function to convert an amount stored as a string (eg: "5000.00") to an integer number of cents
+def amount_to_cents(amount):
+    return round(float(amount) * 100)
 
-        #Returning to the main program if a Runtime error is experienced due after changes made to the main transactions dictionary            
-        except RuntimeError:
-            return
-                        
-    else:
-        #Displaying message if no transactions have been recorded
-        print("No transactions to be updated are available.\n")
-        return
 
+#Creating a function to convert an amount to cents, or to get None if it cannot be converted (eg: an amount of "ten", "nan" or "inf" in a JSON file edited by hand)
+#Transactions whose amount cannot be converted are left out of the totals and reports and counted, rather than stopping the Finance Tracker
+def get_valid_cents(amount):
+    try:
+        return amount_to_cents(amount)
+    except (TypeError, ValueError, OverflowError):
+        return None
 
-#Creating a function to delete a transaction from the Finance Tracker
-def delete_transaction(transactions, filename):
 
-    #Allowing user to input transaction information to be deleted if there are previous transaction records
-    if transactions != {}:
-        
-        #Calling a function to create a new list for comparison purposes
-        del_transaction_info = create_new_transaction("Enter the amount of money from the transaction to be deleted : ", "Enter the purpose of the transaction which should to be deleted : ", "Enter the type of transaction which should be deleted (Type 'CR' for Income or 'DR' for Expenses): ")
-        purpose = del_transaction_info[0]
-        sub_dict = del_transaction_info[1]
-        
-        #Comparing the the list information consisting of user inputs with existing transaction information to verify if the transaction exists
-        try:
-            for expense, exp_transactions in transactions.items():
-                #Checking if the value of "purpose" is among the keys of the main transactions dictionary
-                if purpose == expense:
-                    #Iterating through the values (which exist as lists consisting of dictionaries for each transaction) of the main transactions dictionary
-                    for info in exp_transactions:
-                        
-                        if sub_dict == info:
-                            #Removing transaction to be deleted from main transactions dictionary and displaying "successfully removed" message to the user
-                            del transactions[expense][exp_transactions.index(info)]
-                            print("\nThe transaction has been successfully removed.\n")
-
-                            #Calling a function to add all information from the main transactions dictionary to the JSON file
-                            add_to_json(transactions, filename)
-                            return
-
-                        #Displaying a message to the user if the final iteration of the list of transactions related to each key of the main transactions dictionary has been reached
-                        elif info == exp_transactions[-1]:
-                            print("\nThis transaction could not be found.\n")
-
-                            #Giving user the option to try again if the transaction details entered does not match any transactions stored in the main transactions dictionary
-                            choice = get_choice("Do you wish to try again? (Y/N) : ")
-                            if choice == "Y":
-                                print("\n")
-                                delete_transaction(transactions, filename)
-                            else:
-                                break
-                
-                #Giving user the option to try again if the entered "purpose" does not match any key of the main transactions dictionary
-                elif purpose not in list(transactions.keys()):
-                    print("\nThis transaction could not be found.\n")
-                    
-                    choice2 = get_choice("Do you wish to try again? (Y/N) : ")
-                    if choice2 == "Y":
-                        print("\n")
-                        delete_transaction(transactions, filename)
-                    else:
-                        break
+#Creating a function to get the message displayed when transactions whose amount is not a number have been left out of the totals
+def get_skipped_message(count):
+    return f"{count} transaction{'s' if count != 1 else ''} could not be added to the totals, as the amount is not a number."
 
-        #Returning to the main program if a Runtime error is experienced due after changes made to the main transactions dictionary            
-        except RuntimeError:
-            return
 
-    else:
-        #Displaying message if no transactions have been recorded
-        print("No transactions to be deleted are available.\n")
-        return
-    
+#Creating a function to convert an integer number of cents back to the amount format used in the JSON file (eg: "5000.00")
+def cents_to_amount(cents):
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
 
-#Creating a function to display a summary of all transactions recorded by the Finance Tracker
-def transactions_summary(transactions):
-    total_expenses = 0
-    total_income = 0
-    total_usable = 0
 
-    #Displaying information about all transactions recorded by iterating through the key-value pairs of the main transactions dictionary
-    for expense, exp_transactions in transactions.items():
+#Creating a function to convert a date stored as a string (eg: "2024-03-31") to an integer day number (ordinal)
+def date_to_ordinal(date_):
+    return date.fromisoformat(date_).toordinal()
 
-        #Setting a counter to number each transaction related to a specific key
-        count = 1
 
-        #Iterating through the values (which exist as lists consisting of dictionaries for each transaction) of the main transactions dictionary and displaying the information
-        print(f"{expense} :\n")
-        for info in exp_transactions:
-            print(f"{count}. Transaction amount : {info["amount"]}\n   Transaction type : {info["type"]}\n   Transaction date : {info["date"]}\n\n")
-            count += 1
+#Creating a function to convert an integer day number (ordinal) back to the date format used in the JSON file
+def ordinal_to_date(ordinal):
+    return date.fromordinal(ordinal).isoformat()
 
-            #Calculating the total income and expenses incurred by the user
-            if info["type"] == "Expense":
-                total_expenses += float(info["amount"])
-            else:
-                total_income += float(info["amount"])
 
-        #Calculating the usable amount of money based on the transactions recorded in the Finance Tracker
-        total_usable = total_income - total_expenses
-        if total_usable < 0:
-            total_usable = 0
-            
-    #Displaying the total expenses, income and usable balance to the users
-    print(f"Total Expenses are : {"{:.2f}".format(total_expenses)} \nTotal Income is : {"{:.2f}".format(total_income)} \nUsable Balance : {"{:.2f}".format(total_usable)}")
-    return                       
+#Creating a class definition for the binary snapshot of the transactions in a JSON file, which is opened with mmap
+#The file starts with a header, followed by fixed-width arrays with one item per transaction (the amount in cents, the date as a day number,
+#the category id and the type id) and then the tables of category names, type names and transactions kept as JSON text. It is a cache of the
+#JSON file which saves parsing the JSON text. Loading every transaction reads the whole file, while a date range (see iter_range) only
+#reads the dates and type ids, and then the other items of the transactions in the range.
+class Snapshot:
 
+    MAGIC = b"PFTSNAP\0"
+    VERSION = 1
 
+    #Header layout: magic, version, byte order of the arrays (0 for little-endian and 1 for big-endian), modification time and size of
+    #the JSON file, number of transactions, number of categories, number of types and number of transactions kept as JSON text
+    HEADER = struct.Struct("<8sHHqqQIII")
+    HEADER_SIZE = 64
+    LENGTH = struct.Struct("<I")
+
+    #Type id used for transactions which cannot be converted to cents and a day number and back to exactly the same text
+    #(eg: "5000" rather than "5000.00", or a transaction with extra keys). Their amount item holds their position in the JSON text table
+    JSON_TEXT = 255
 
-#Creating a class definition for the GUI the Finance Tracker to Search and Sort Transactions
-class FinanceTrackerGUI:
-    
     #Creating a function to act as the constructor of an object
-    def __init__(self, root, filename):
-        self.root = root
-        
-        #Changing the title of the root window
-        self.root.title("Personal Finance Tracker")
-        
-        #Calling a function to create widgets for the GUI
-        self.create_widgets()
-        
-        #Calling a function to load the transactions from the JSON file
-        self.transactions = self.load_transactions(filename)
-        
-        #Calling a function to display the transactions to be added to the treeview
-        self.display_transactions(self.transactions)
-        
-        #Using the style module of the ttk module to modify the theme of the window and change the font style and background colour of the column headings
-        self.style = ttk.Style()
-        self.style.theme_use("default")
-        self.style.configure("Treeview.Heading", font = ("Calibri", 12), background = "lightgrey")
-        
-        #Initializing variables for the sort function of the GUI
-        self.sort_column = None
-        self.sort_descending = False
+    #A ValueError is raised if the mapped file is not a snapshot which can be read
+    def __init__(self, mapped):
+        self.mapped = mapped
+        if len(mapped) < self.HEADER_SIZE:
+            raise ValueError("The snapshot is too short")
+        magic, version, byte_order, mtime, size, count, category_count, type_count, text_count = self.HEADER.unpack_from(mapped, 0)
+        if magic != self.MAGIC or version != self.VERSION or byte_order != self.get_byte_order():
+            raise ValueError("The snapshot was written by a different version or on a different platform")
+        self.stamp = [mtime, size]
+        self.count = count
+
+        #Getting the positions of the arrays, which are stored largest item first so every array is aligned to the size of its items
+        position = self.HEADER_SIZE
+        self.views = [memoryview(mapped)]
+        arrays = []
+        for typecode, item_size in (("q", 8), ("i", 4), ("I", 4), ("B", 1)):
+            end = position + count * item_size
+            if end > len(mapped):
+                self.close()
+                raise ValueError("The snapshot is too short")
+            arrays.append(self.views[0][position:end].cast(typecode))
+            position = end
+        self.views.extend(arrays)
+        self.amounts, self.dates, self.category_ids, self.types = arrays
+
+        #Reading the interned tables of category names and type names. The JSON text table is only read if it is needed
+        try:
+            self.categories, position = self.read_strings(position, category_count)
+            self.type_names, position = self.read_strings(position, type_count)
+        except ValueError:
+            self.close()
+            raise
+        self.texts_position = position
+        self.text_count = text_count
+        self.texts = None
+
+
+    #Creating a function to get the byte order flag of this platform, as the arrays are stored in the byte order they are used in
+    @staticmethod
+    def get_byte_order():
+        return 0 if sys.byteorder == "little" else 1
+
+
+    #Creating a function to read a table of strings (each stored as its length followed by its UTF-8 text) starting at a position
+    #The list of strings and the position after the table are returned. A ValueError is raised if the table is damaged
+    def read_strings(self, position, count):
+        strings = []
+        for _ in range(count):
+            if position + self.LENGTH.size > len(self.mapped):
+                raise ValueError("The snapshot is damaged")
+            (length,) = self.LENGTH.unpack_from(self.mapped, position)
+            position += self.LENGTH.size
+            if position + length > len(self.mapped):
+                raise ValueError("The snapshot is damaged")
+            strings.append(self.mapped[position:position + length].decode("utf-8", "surrogatepass"))
+            position += length
+        return [strings, position]
+
+
+    #Creating a function to get the transaction at a row as a [purpose, transaction dictionary] list (in the same format as the JSON file)
+    def get_transaction(self, row):
+        type_id = self.types[row]
+        if type_id == self.JSON_TEXT:
+            if self.texts == None:
+                self.texts = self.read_strings(self.texts_position, self.text_count)[0]
+            info = json.loads(self.texts[self.amounts[row]])
+        else:
+            info = {"amount": cents_to_amount(self.amounts[row]), "type": self.type_names[type_id], "date": ordinal_to_date(self.dates[row])}
+        return [self.categories[self.category_ids[row]], info]
+
+
+    #Creating a function to iterate through every transaction in the snapshot as [purpose, transaction dictionary] lists
+    #The text of each amount and date is only made once, as many transactions share the same amounts and dates
+    def __iter__(self):
+        instrumentation.bytes_read += len(self.mapped)
+        amounts = self.amounts
+        dates = self.dates
+        types = self.types
+        category_ids = self.category_ids
+        categories = self.categories
+        type_names = self.type_names
+        amount_texts = {}
+        date_texts = {}
+        for row in range(self.count):
+            type_id = types[row]
+            if type_id == self.JSON_TEXT:
+                yield self.get_transaction(row)
+                continue
+
+            cents = amounts[row]
+            amount = amount_texts.get(cents)
+            if amount == None:
+                amount = amount_texts[cents] = cents_to_amount(cents)
+            ordinal = dates[row]
+            date_ = date_texts.get(ordinal)
+            if date_ == None:
+                date_ = date_texts[ordinal] = ordinal_to_date(ordinal)
+            yield [categories[category_ids[row]], {"amount": amount, "type": type_names[type_id], "date": date_}]
+
+
+    #Creating a function to iterate through the transactions between two dates (YYYY-MM-DD, inclusive, with None leaving either end of the range open)
+    #as [purpose, transaction dictionary] lists, in the same order as the JSON file. Only the dates and type ids are read for the other transactions.
+    #Transactions kept as JSON text are always included, as their date is not in the arrays (so the transactions may need to be filtered again)
+    def iter_range(self, start = None, end = None):
+        first = 1 if start == None else date_to_ordinal(start)
+        last = date.max.toordinal() if end == None else date_to_ordinal(end)
+        dates = self.dates
+        types = self.types
+        instrumentation.bytes_read += self.count * (dates.itemsize + types.itemsize)
+        for row in range(self.count):
+            if types[row] == self.JSON_TEXT or first <= dates[row] <= last:
+                instrumentation.bytes_read += self.amounts.itemsize + self.category_ids.itemsize
+                yield self.get_transaction(row)
+
+
+    #Creating a function to close the snapshot. The views of the arrays have to be released before the file can be unmapped
+    def close(self):
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        self.mapped.close()
+        return
 
-    
-    #Creating a function to create widgets for the GUI 
-    def create_widgets(self):
-        
-        #Creating a frame for the table and scrollbar and setting it to expand horizontally and vertically (when the frame size is adjusted)
-        frame = ttk.Frame(self.root)
-        frame.pack(fill = "both", expand = True)
-        
-        #Treeview for displaying transactions
-        #Creating a tuple with columns
-        column_names =("Transaction", "Amount", "Type", "Date")
-        
-        #Creating a Treeview in the frame with the names of each column
-        self.tree = ttk.Treeview(frame, columns = column_names, show = "headings")
-        
-        #Setting the headings for each column
-        #When each column heading is clicked, the column name is set as the parameter for a function that is called to sort the elements of the columns
-        self.tree.heading("Transaction", text = "Transaction", command = lambda: self.sort_by_column("Transaction"))
-        self.tree.heading("Amount", text = "Amount", command = lambda: self.sort_by_column("Amount"))
-        self.tree.heading("Type", text = "Type", command = lambda: self.sort_by_column("Type"))
-        self.tree.heading("Date", text = "Date", command = lambda: self.sort_by_column("Date"))
-        
-        #Setting the treeview to the left side of the frame and enabling it to expand horizontally and vertically (when the frame size is adjusted)
-        self.tree.pack(side = "left", fill = "both", expand = True)
-        
-        #Center aligning items in each column, including the column headings
-        for col in ("Transaction", "Amount", "Type", "Date"):
-            self.tree.heading(col, anchor = "center")
-            self.tree.column(col, anchor = "center")
-        
-        #Scrollbar for the Treeview
-        #Creating a vertical scrollbar in the y-axis (vertically) of the Treeview
-        scrollbar = ttk.Scrollbar(frame, orient="vertical", command = self.tree.yview)
-        self.tree.configure(yscrollcommand = scrollbar.set)
-        
-        #Adding the scrollbar on the right side of the Treeview
-        scrollbar.pack(side = "right", fill = "y")
-        
-        #Creating string variable for the search choice and setting the default value to "Transaction"
-        self.search_choice = tk.StringVar()
-        self.search_choice.set("Transaction")
-        
-        #Creating a seperate frame for search functions
-        search_frame = ttk.Frame(self.root)
-        search_frame.pack(pady = 5)
-        
-        #Creating radio buttons in the search frame for each type of value in the treeview (Transaction, Amount, Type, Date)
-        #'side = "left"' is used to indicate that each radio button is aligned in the frame towards the left side of eachother consecutively.
-        ttk.Radiobutton(search_frame, text = "Transaction", variable = self.search_choice, value = "Transaction").pack(side = "left")
-        ttk.Radiobutton(search_frame, text = "Amount", variable = self.search_choice, value = "Amount").pack(side = "left")
-        ttk.Radiobutton(search_frame, text = "Type", variable = self.search_choice, value = "Type").pack(side = "left")
-        ttk.Radiobutton(search_frame, text = "Date", variable = self.search_choice, value = "Date").pack(side = "left")
-        
-        #Creating the searchbar for the user to enter the value they wish to filter out
-        #Initializing a string variable for the value entered in the searchbar
-        self.search_str = tk.StringVar()
-
-        #Creating an entry widget/textbox for the user input
-        #textvariable is set to search_str to ensure the user input can be set as an accessible variable
-        searchbar = ttk.Entry(self.root, textvariable = self.search_str)
-        searchbar.pack(pady = 5)
-        
-        #Creating a search button which, when clicked, calls a search transaction function
-        search_button = ttk.Button(self.root, text = "Search", command = self.search_transactions)
-        search_button.pack()
 
-        #Creating an empty label which can be used in cases on an invalid input being entered
-        self.invalid_input_label = tk.Label(self.root, text = "", fg = "red")
-        self.invalid_input_label.pack()
+    #Creating functions so the snapshot can be used in a "with" statement, which closes it at the end
+    def __enter__(self):
+        return self
 
-        #Creating a reset button that calls a function to reset the elements in the treeview
-        reset_button = ttk.Button(self.root, text = "Reset", command = self.reset_transactions)
-        reset_button.pack(pady = 5)
 
-    
-    #Creating a function to load transactions from the JSON file to the self.transactions variable
-    def load_transactions(self, filename):
-        try:
-            with open(filename, "r") as file:
-                loaded_data = json.load(file)
-            return loaded_data
-        except json.JSONDecodeError as error_msg:
-            print(f"Error decoding JSON: {error_msg}")
-        except FileNotFoundError:
-            return {}
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
 
-    
-    #Creating a function to display all transactions to the user in the Treeview of the GUI
-    def display_transactions(self, transactions):
-        #Removing any existing items in the treeview
-        for info in self.tree.get_children():
-            self.tree.delete(info)
-
-        #Add all transactions to the Treeview
-        #Iterating through the key-value pairs of the transactions dictionary
-        for  expense, exp_transactions in transactions.items():
-            #Iterating through the values (which exist as lists consisting of dictionaries for each transaction) of the transactions dictionary
+
+#Creating a function to open the snapshot of a JSON file with mmap
+#None is returned if there is no snapshot, if it cannot be read or if it was written from a different version of the JSON file (stamp)
+def open_snapshot(filename, stamp):
+    if stamp == None:
+        return None
+    try:
+        with open(get_snapshot_filename(filename), "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        snapshot = Snapshot(mapped)
+    except ValueError:
+        mapped.close()
+        return None
+    if snapshot.stamp != stamp:
+        snapshot.close()
+        return None
+    return snapshot
+
+
+#Creating a function to iterate through the transactions of an open snapshot, closing it once they have all been read
+def iter_snapshot_transactions(snapshot):
+    with snapshot:
+        yield from snapshot
+
+
+#Creating a function to load the main transactions dictionary from the snapshot of a JSON file
+#None is returned if the snapshot is not up to date with the JSON file (stamp) or cannot be read, so the JSON file is read instead
+#If a TransactionIndex is provided, every transaction loaded is also added to the index
+def read_snapshot(filename, stamp, index = None):
+    snapshot = open_snapshot(filename, stamp)
+    if snapshot == None:
+        return None
+
+    transactions = {}
+    try:
+        with snapshot:
+            for expense, info in snapshot:
+                if expense not in transactions:
+                    transactions[expense] = []
+                transactions[expense].append(info)
+    except (IndexError, ValueError):
+        #The ids stored in the arrays are only checked as the transactions are read, so a damaged snapshot may only be found part of the way through
+        return None
+
+    #Adding the transactions to the index only once the whole snapshot has been read, so a damaged snapshot does not leave the index half filled
+    if index != None:
+        for expense, exp_transactions in transactions.items():
             for info in exp_transactions:
-                #Inserting the relevant values to a row of the under each respective column Treeview
-                self.tree.insert("", "end", values = (expense, info["amount"], info["type"], info["date"]))
+                index.add(expense, info)
+    return transactions
 
-    
-    #Creating a function to search for transactions that match the user inputted value and chosen value category
-    def search_transactions(self):
-        #Getting user inputted value from the search_str variable and the search choice
-        user_input = self.search_str.get().capitalize()
-        search_choice = self.search_choice.get()
 
-        #Creating an empty dictionary to store all filtered transaction information
-        filtered_transactions = {}
+#Creating a function to write a snapshot of the main transactions dictionary saved in a JSON file, along with the stamp of the JSON file
+#(from get_file_stamp, taken once it was written). The snapshot is not written if the JSON file could not be found
+def write_snapshot(transactions, filename, stamp):
+    if stamp == None:
+        return
+    amounts = array("q")
+    dates = array("i")
+    category_ids = array("I")
+    types = array("B")
+    categories = []
+    type_lookup = {}
+    texts = []
+
+    #Keeping the cents and day number of every amount and date text already converted (None if it does not convert back to the same text),
+    #as many transactions share the same amounts and dates
+    amount_cents = {}
+    date_ordinals = {}
+
+    for category_id, (expense, exp_transactions) in enumerate(transactions.items()):
+        categories.append(expense)
+        for info in exp_transactions:
+            #Only storing the transaction in the arrays if converting it back gives exactly the same transaction dictionary
+            #(the type table is limited to the type ids below JSON_TEXT, so any further types are kept as JSON text)
+            type_id = Snapshot.JSON_TEXT
+            cents = None
+            ordinal = None
+            try:
+                if list(info) == ["amount", "type", "date"] and isinstance(info["type"], str) and (info["type"] in type_lookup or len(type_lookup) < Snapshot.JSON_TEXT):
+                    amount = info["amount"]
+                    date_ = info["date"]
+                    if isinstance(amount, str) and isinstance(date_, str):
+                        if amount not in amount_cents:
+                            cents = amount_to_cents(amount)
+                            amount_cents[amount] = cents if cents_to_amount(cents) == amount else None
+                        if date_ not in date_ordinals:
+                            ordinal = date_to_ordinal(date_)
+                            date_ordinals[date_] = ordinal if ordinal_to_date(ordinal) == date_ else None
+                        cents = amount_cents[amount]
+                        ordinal = date_ordinals[date_]
+            except (TypeError, ValueError, OverflowError):
+                pass
+
+            if cents != None and ordinal != None:
+                try:
+                    amounts.append(cents)
+                    type_id = type_lookup.setdefault(info["type"], len(type_lookup))
+                except OverflowError:
+                    #The amount is too large for the array, in which case nothing has been added to it
+                    pass
+
+            if type_id == Snapshot.JSON_TEXT:
+                amounts.append(len(texts))
+                dates.append(0)
+                texts.append(json.dumps(info))
+            else:
+                dates.append(ordinal)
+            category_ids.append(category_id)
+            types.append(type_id)
+
+    header = Snapshot.HEADER.pack(Snapshot.MAGIC, Snapshot.VERSION, Snapshot.get_byte_order(), stamp[0], stamp[1], len(types),
+                                  len(categories), len(type_lookup), len(texts))
+
+    #Writing to a temporary file first and then replacing the snapshot, so the snapshot is never left half-written
+    snapshot_filename = get_snapshot_filename(filename)
+    temp_filename = snapshot_filename + ".tmp"
+    with open(temp_filename, "wb") as file:
+        file.write(header.ljust(Snapshot.HEADER_SIZE, b"\0"))
+        for values in (amounts, dates, category_ids, types):
+            values.tofile(file)
+        for strings in (categories, list(type_lookup), texts):
+            for string in strings:
+                data = string.encode("utf-8", "surrogatepass")
+                file.write(Snapshot.LENGTH.pack(len(data)))
+                file.write(data)
+        instrumentation.bytes_written += file.tell()
+    os.replace(temp_filename, snapshot_filename)
+    return
+
+
+#Creating a class definition for a compact store of transactions kept in parallel arrays instead of a dictionary per transaction
+#Each transaction is a row made up of its amount in cents, its date as a day number, a type flag and a category id. Amounts and dates are
+#converted once when a row is added, so loops that total up transactions do not need to convert any strings. The session keeps its transactions
+#in a store rather than in the main transactions dictionary, and to_transactions produces the dictionary when it is needed (eg: to write the JSON file).
+#Only the transactions which cannot be produced again from the arrays exactly as they were saved (eg: an amount of "500" rather than "500.00",
+#or an amount which is not a number) are also kept as dictionaries.
+class TransactionStore:
+
+    #Type flag used to mark rows which have been removed (the type flags are unsigned bytes, so the flags of the transaction types are below it)
+    DELETED = 0xFF
+
+    #Type flag of rows which are kept, but cannot be added to the totals (an amount which is not a number, or more transaction types than the flags can hold)
+    SKIPPED = 0xFE
+
+    #Day number stored for dates which are not in the ISO format (eg: "01/05/2024" in a JSON file edited by hand), whose text is kept in date_texts
+    UNKNOWN_DATE = 0
+
+    #Names of the values of a transaction, in the order they are saved in the JSON file
+    FIELDS = ("amount", "type", "date")
+
+    #Creating a function to act as the constructor of an object
+    def __init__(self):
+        self.amounts = array("q")
+        self.dates = array("i")
+        self.types = array("B")
+        self.category_ids = array("i")
+
+        #Interned tables of category names and transaction type names, which the rows refer to by their position
+        self.categories = []
+        self.category_lookup = {}
+        self.type_names = ["Expense", "Income"]
+        self.type_lookup = {"Expense": 0, "Income": 1}
+
+        #Text of the dates which could not be converted to a day number, by row
+        self.date_texts = {}
+
+        #Transaction dictionaries of the rows which cannot be produced again from the arrays exactly as they were saved, by row
+        self.originals = {}
 
-        #Iterating through the key-value pairs of the transactions dictionary
-        for expense, exp_transactions in self.transactions.items():
+        self.deleted_count = 0
 
-            #Creating an empty list to store information related to a transaction
-            filtered_items = []
+        #Number of rows whose amount cannot be converted to cents (see get_valid_cents), which are left out of the totals
+        self.skipped_count = 0
 
-            #Iterating through the values (which exist as lists consisting of dictionaries for each transaction) of the transactions dictionary
-            #The values get added to the filtered_items list if they match the user input and search criteria
+        #Rows of the transactions by their values, which is only built when a row is first looked up (see find_row)
+        self.row_lookup = None
+
+
+    #Creating a function to create a store from a main transactions dictionary
+    @classmethod
+    def from_transactions(cls, transactions):
+        store = cls()
+        for expense, exp_transactions in transactions.items():
+            #Adding the category even if it has no transactions, so the dictionary view keeps the same keys
+            store.get_category_id(expense)
             for info in exp_transactions:
-                if search_choice == "Transaction" and user_input in expense:
-                    filtered_items.append(info)
-                elif search_choice == "Amount" and user_input == info["amount"]:
-                    filtered_items.append(info)
-                elif search_choice == "Type" and user_input in info["type"].capitalize():
-                    filtered_items.append(info)
-                elif search_choice == "Date" and user_input in info["date"]:
-                    filtered_items.append(info)
-
-            #Adding the filtered items related to a specific type of transaction (key) as a value for the relevant transaction in the filtered_transactions dictionary
-            if filtered_items:
-                filtered_transactions[expense] = filtered_items
-
-        #Adding the filtered transactions to the treeview by calling the display transactions function
-        if filtered_transactions:
-            self.display_transactions(filtered_transactions)
-            #The label is emptied here to ensure that if a previous search had no results and the new search does, the unnecessary text in the label will be erased
-            self.invalid_input_label.config(text = "")
-        else:
-            #Displaying a message in the label to the user if no results that match the input and search criteria have been found
-            self.invalid_input_label.config(text = "No results were found to match the chosen search criteria.")
+                store.add(expense, info)
+        return store
 
-    
-    #Creating a function to reset the values displayed in the Treeview
-    def reset_transactions(self):
-        #Calling the display transactions function and setting the invalid input label to "" (To empty the label)
-        self.display_transactions(self.transactions)
-        self.invalid_input_label.config(text = "")
-
-
-    #Creating a function to sort the values in ascending or descending order by column
-    def sort_by_column(self, column_name):
-        #When the coumn is clicked, the current sort_descending value changes to its opposite value (True or False)
-        if self.sort_column == column_name:
-            self.sort_descending = not self.sort_descending
-        else:
-            self.sort_column = column_name
-            self.sort_descending = False
 
-        #Creating an empty list to store the values related to in each row of a column in tuples
-        data = []
+    #Creating a function to get the id of a category, adding the category to the category table if it is new
+    def get_category_id(self, purpose):
+        if purpose not in self.category_lookup:
+            self.category_lookup[purpose] = len(self.categories)
+            self.categories.append(purpose)
+        return self.category_lookup[purpose]
 
-        #Iterating throught the values of each row of the Treeview
-        for item in self.tree.get_children(""):
-            #Getting the value of the specified column and assigning it to the value for each item
-            value = self.tree.set(item, column_name)
 
-            #Converting the value to a floating point value if it is of the type "Amount" to ensure it isn't sorted as a string value
-            if column_name == "Amount":
-                value = float(value)
+    #Creating a function to get the flag of a transaction type, adding the type to the type table if it is new
+    def get_type_flag(self, type_):
+        if type_ not in self.type_lookup:
+            if len(self.type_names) >= self.SKIPPED:
+                raise ValueError(f"Too many transaction types to add {type_!r}")
+            self.type_lookup[type_] = len(self.type_names)
+            self.type_names.append(type_)
+        return self.type_lookup[type_]
 
-            #Appending a tuple with the value and item to the data list
-            data.append((value, item))
 
-        #Sorting the values in the data list.
-        #The reverse parameter is determined by the the sort_descending value (True/False) in the beginning of the function
-        data.sort(reverse = self.sort_descending)
+    #Creating a function to get the day number of a date, or UNKNOWN_DATE if it is not in the ISO format
+    def get_date_ordinal(self, date_):
+        try:
+            return date_to_ordinal(date_)
+        except (TypeError, ValueError):
+            return self.UNKNOWN_DATE
+
+
+    #Creating a function to get the values of a transaction used to find its row
+    #A transaction whose amount has 2 decimal places and whose date is either an ISO date or not in the ISO format at all is found by its purpose,
+    #amount in cents, type and day number (or date text). Any other transaction is found by the exact values it was saved with
+    def get_key(self, purpose, info):
+        amount = info["amount"]
+        date_ = info["date"]
+        if isinstance(amount, str) and isinstance(date_, str):
+            cents = get_valid_cents(amount)
+            if cents != None and cents_to_amount(cents) == amount:
+                ordinal = self.get_date_ordinal(date_)
+                if ordinal == self.UNKNOWN_DATE:
+                    return (purpose, cents, info["type"], date_)
+                if ordinal_to_date(ordinal) == date_:
+                    return (purpose, cents, info["type"], ordinal)
+        return ("text", purpose, amount, info["type"], date_)
+
+
+    #Creating a function to get the values of the transaction in a row, in the same format as get_key
+    def get_row_key(self, row):
+        purpose = self.categories[self.category_ids[row]]
+        if row in self.originals:
+            return self.get_key(purpose, self.originals[row])
+        ordinal = self.dates[row]
+        return (purpose, self.amounts[row], self.type_names[self.types[row]], self.date_texts[row] if ordinal == self.UNKNOWN_DATE else ordinal)
+
+
+    #Creating a function to convert a transaction to the values stored in a row: its amount in cents, day number, type flag and category id
+    #A transaction whose amount cannot be converted (or whose type cannot be given a flag) is stored with the SKIPPED flag
+    def get_row_values(self, purpose, info):
+        category_id = self.get_category_id(purpose)
+        try:
+            cents = amount_to_cents(info["amount"])
+            if not -2 ** 63 <= cents < 2 ** 63:
+                raise OverflowError(f"The amount {info['amount']!r} is too large")
+            return [cents, self.get_date_ordinal(info["date"]), self.get_type_flag(info["type"]), category_id]
+        except (TypeError, ValueError, OverflowError):
+            return [0, self.UNKNOWN_DATE, self.SKIPPED, category_id]
+
+
+    #Creating a function to check if the transaction of a row is produced again from the arrays exactly as it was saved
+    def is_stored_exactly(self, row, info):
+        if self.types[row] == self.SKIPPED or tuple(info) != self.FIELDS or info["amount"] != cents_to_amount(self.amounts[row]):
+            return False
+        if self.dates[row] == self.UNKNOWN_DATE:
+            return isinstance(info["date"], str)
+        return info["date"] == ordinal_to_date(self.dates[row])
+
+
+    #Creating a function to keep the date text or the transaction dictionary of a row which need them, and to add the row to the lookup of rows by their values
+    def index_row(self, row, info):
+        if self.types[row] == self.SKIPPED:
+            self.skipped_count += 1
+        elif self.dates[row] == self.UNKNOWN_DATE:
+            self.date_texts[row] = info["date"]
+        if not self.is_stored_exactly(row, info):
+            self.originals[row] = info
+        if self.row_lookup != None:
+            self.row_lookup.setdefault(self.get_row_key(row), []).append(row)
+
+
+    #Creating a function to take a row out of the lookup of rows by their values, along with its date text and transaction dictionary
+    def forget_row(self, row):
+        if self.row_lookup != None:
+            key = self.get_row_key(row)
+            rows = self.row_lookup[key]
+            rows.remove(row)
+            if len(rows) == 0:
+                del self.row_lookup[key]
+        if self.types[row] == self.SKIPPED:
+            self.skipped_count -= 1
+        self.date_texts.pop(row, None)
+        self.originals.pop(row, None)
+
+
+    #Creating a function to add a transaction to the store. The position (row) of the new transaction is returned
+    def add(self, purpose, info):
+        cents, ordinal, flag, category_id = self.get_row_values(purpose, info)
+        self.amounts.append(cents)
+        self.dates.append(ordinal)
+        self.types.append(flag)
+        self.category_ids.append(category_id)
+        row = len(self.amounts) - 1
+        self.index_row(row, info)
+        return row
+
+
+    #Creating a function to replace the transaction in a row (which has not been removed), so the changed transaction keeps its position
+    def replace(self, row, purpose, info):
+        self.forget_row(row)
+        self.amounts[row], self.dates[row], self.types[row], self.category_ids[row] = self.get_row_values(purpose, info)
+        self.index_row(row, info)
+
+
+    #Creating a function to update the transaction in a row in the same way as update_transaction. The row of the updated transaction is returned
+    #The transaction keeps its position if the purpose has not been changed, otherwise it is moved to the end of the transactions of the new purpose
+    def update(self, row, purpose, info):
+        if purpose == self.categories[self.category_ids[row]]:
+            self.replace(row, purpose, info)
+            return row
+        self.remove(row)
+        return self.add(purpose, info)
+
+
+    #Creating a function to add a row which is already marked as removed, so a transaction which could not be added still takes up a position
+    #(eg: so the rows stay in the same order as the rows of the GUI). The position (row) is returned
+    def add_removed(self):
+        self.amounts.append(0)
+        self.dates.append(self.UNKNOWN_DATE)
+        self.types.append(self.DELETED)
+        self.category_ids.append(0)
+        self.deleted_count += 1
+        return len(self.amounts) - 1
+
+
+    #Creating a function to remove the transaction in a row. The row is only marked as removed so other rows keep their position
+    def remove(self, row):
+        if self.types[row] != self.DELETED:
+            self.forget_row(row)
+            self.types[row] = self.DELETED
+            self.deleted_count += 1
+
+
+    #Creating a function to find the row of a transaction which has not been removed (None is returned if there is no such row)
+    #The lookup of rows by their values is built the first time, and kept up to date as rows are added, replaced and removed
+    def find_row(self, purpose, info):
+        if self.row_lookup == None:
+            self.row_lookup = {}
+            for row in self.rows(True):
+                self.row_lookup.setdefault(self.get_row_key(row), []).append(row)
+        rows = self.row_lookup.get(self.get_key(purpose, info))
+        if not rows:
+            return None
+        return rows[0]
+
+
+    #Creating a function to apply an add, update or delete change record (the same format as the journal) to the store
+    #False is returned if the transaction being updated or deleted cannot be found
+    def apply_change(self, change):
+        if change["op"] == "add":
+            self.add(change["purpose"], change["record"])
+            return True
+
+        row = self.find_row(change["purpose"], change["record"])
+        if row == None:
+            return False
+        if change["op"] == "delete":
+            self.remove(row)
+        elif change["op"] == "update":
+            self.update(row, change["new_purpose"], change["new_record"])
+        return True
+
+
+    #Creating a function to get the number of transactions in the store (including the transactions left out of the totals)
+    def __len__(self):
+        return len(self.amounts) - self.deleted_count
+
+
+    #Creating a function to iterate through the rows of all transactions which have not been removed
+    #The rows of transactions which are left out of the totals (see SKIPPED) are only included if skipped is True
+    def rows(self, skipped = False):
+        types = self.types
+        for row in range(len(types)):
+            if types[row] < self.SKIPPED or (skipped and types[row] == self.SKIPPED):
+                yield row
+
+
+    #Creating a function to get the purpose and the transaction dictionary (in the same format as the JSON file) of a row
+    #The dictionary kept for a row in originals is returned rather than a copy of it, so it must not be changed
+    def get_transaction(self, row):
+        if row in self.originals:
+            return [self.categories[self.category_ids[row]], self.originals[row]]
+        ordinal = self.dates[row]
+        date_ = self.date_texts[row] if ordinal == self.UNKNOWN_DATE else ordinal_to_date(ordinal)
+        info = {"amount": cents_to_amount(self.amounts[row]), "type": self.type_names[self.types[row]], "date": date_}
+        return [self.categories[self.category_ids[row]], info]
+
+
+    #Creating a function to produce the main transactions dictionary of the store (every category is included, even if it has no transactions left)
+    #If date_filter is given, only the transactions whose date it returns True for are included. The transactions are only read from the
+    #dictionary, so the dictionaries kept in originals are used rather than copied
+    def to_transactions(self, date_filter = None):
+        transactions = {purpose: [] for purpose in self.categories}
+        category_lists = [transactions[purpose] for purpose in self.categories]
+
+        #Converting each distinct amount and day number to text once
+        amount_texts = {}
+        date_texts = {}
+        for row in self.rows(True):
+            info = self.originals.get(row)
+            if info == None:
+                cents = self.amounts[row]
+                ordinal = self.dates[row]
+                if cents not in amount_texts:
+                    amount_texts[cents] = cents_to_amount(cents)
+                if ordinal == self.UNKNOWN_DATE:
+                    date_ = self.date_texts[row]
+                else:
+                    if ordinal not in date_texts:
+                        date_texts[ordinal] = ordinal_to_date(ordinal)
+                    date_ = date_texts[ordinal]
+                info = {"amount": amount_texts[cents], "type": self.type_names[self.types[row]], "date": date_}
+            if date_filter == None or date_filter(info["date"]):
+                category_lists[self.category_ids[row]].append(info)
+        return transactions
 
-        #Initializing variable to specify the new position of a row (item) in the Treeview
-        num = 0
 
-        #Iterating throught the tuples in the the data list
-        for val, item in data:
-            #Moving the item in the Treeview to the new position based on the sorting order and num value
-            self.tree.move(item, "", num)
-            num += 1
+    #Creating a function to calculate the total expenses and total income in cents
+    def totals(self):
+        total_expenses = 0
+        total_income = 0
+        expense_flag = self.type_lookup["Expense"]
+        for cents, flag in zip(self.amounts, self.types):
+            if flag == expense_flag:
+                total_expenses += cents
+            elif flag < self.SKIPPED:
+                total_income += cents
+        return [total_expenses, total_income]
 
-#Creating a function to open a GUI that allow user to navigate through the transactions in the Finance Tracker and search for specific transactions
-def search_and_sort_transactions(filename):
-    root = tk.Tk()
-    app = FinanceTrackerGUI(root, filename)
-    root.mainloop()
 
+#Creating a function to get the main transactions dictionary of a TransactionStore (a dictionary is returned unchanged)
+#The storage backends use it so they can be given either, and only produce the dictionary when they need it (eg: to rewrite the JSON file)
+def get_transactions_dictionary(transactions, date_filter = None):
+    if isinstance(transactions, TransactionStore):
+        return transactions.to_transactions(date_filter)
+    return transactions
 
-#Creating a function to display the main menu to the user
-def main_menu():
-    #Creating an infinite loop with functions the Finance Tracker can perform
-    while True:
-        filename = "transactions.json"
-        transactions = read_bulk_transactions_from_file(filename)
+
+#Creating a class definition for a hash index of transactions
+#The index maps the values of a transaction (purpose, amount, type, date) to the transaction dictionaries with those values,
+#so a transaction entered by the user can be found without comparing it to every transaction. Duplicate transactions are supported.
+#The transaction dictionaries with the same values are kept in a dictionary by their id(), in the order they were added, so a specific
+#transaction dictionary (rather than any duplicate of it) can be removed without going through the others.
+class TransactionIndex:
+
+    #Creating a function to act as the constructor of an object
+    def __init__(self, transactions = None):
+        self.records = {}
+        self.count = 0
+
+        #Adding every transaction from the main transactions dictionary if one is provided
         if transactions != None:
-            print("\n-----------------------------------------------------------------------------")
-            print("\n Welcome to Your Personal Finance Tracker!!\n")
-            print("1. Add a Transaction")
-            print("2. View All Transactions")
-            print("3. Update a Transaction")
-            print("4. Delete a Transaction")
-            print("5. Display Transactions Summary")
-            print("6. Search for Transactions")
-            print("7. Exit Finance Tracker")
+            for expense, exp_transactions in transactions.items():
+                for info in exp_transactions:
+                    self.add(expense, info)
 
-            #Gettng user input for the function user wants to perform
-            choice = input("\nEnter your choice : ")
-            print("\n")
 
-            #Verifying if user input is valid and performing the respective function if the input is valid
-            if choice == "1":
-                add_transaction(transactions, filename)
-            elif choice == "2":
-                view_transactions(transactions)
-            elif choice == "3":
-                update_transaction(transactions, filename)
-            elif choice == "4":
-                delete_transaction(transactions, filename)
-            elif choice == "5":
-                transactions_summary(transactions)
-            elif choice == "6":
-                search_and_sort_transactions(filename)
-            elif choice == "7":
-                print("\nExiting Finance Tracker.\n")
-                break
-            else:
-                print("\nInvalid choice. Please try again.\n")
+    #Creating a function to get the key a transaction is stored under in the index
+    @staticmethod
+    def get_key(purpose, info):
+        return (purpose, info["amount"], info["type"], info["date"])
 
+
+    #Creating a function to add a transaction dictionary to the index
+    def add(self, purpose, info):
+        key = self.get_key(purpose, info)
+        if key in self.records:
+            self.records[key][id(info)] = info
         else:
-            break
-        
-    return
+            self.records[key] = {id(info): info}
+        self.count += 1
 
 
+    #Creating a function to find a transaction dictionary with the same values as "info". None is returned if there is no such transaction
+    def find(self, purpose, info):
+        matches = self.records.get(self.get_key(purpose, info))
+        if matches:
+            #Returning the earliest added transaction, which is the one a search through the transactions list would find first
+            return next(iter(matches.values()))
+        return None
 
-#---------------------------------------------------------------------------------------------------------------------------------------------------------------------------  Main Code
 
-#Displaying main menu to user as the program executes
-if __name__ == "__main__":
-    main_menu()
+    #Creating a function to remove a transaction dictionary from the index
+    #The index must be updated before the values of the transaction are changed, as the key is based on them
+    def remove(self, purpose, info):
+        key = self.get_key(purpose, info)
+        matches = self.records[key]
+        del matches[id(info)]
+        if not matches:
+            del self.records[key]
+        self.count -= 1
 
 
+    #Creating a function to get the number of transactions in the index
+    def __len__(self):
+        return self.count
 
 
-    
+#Creating a function to remove a specific transaction dictionary from a list (rather than the first transaction with equal values)
+def remove_record(records, info):
+    position = records.index(info)
+
+    #list.index() stops at the first equal transaction, which may be a duplicate of "info" rather than "info" itself
+    if records[position] is not info:
+        for position in range(len(records)):
+            if records[position] is info:
+                break
+    del records[position]
 
 
+#Creating a class definition for running totals of the transactions
+#The totals are kept per transaction type, per category (and type) and per month (and type) in integer cents.
+#They are calculated once when the transactions are loaded and then updated with the difference each change makes,
+#so the totals never need to be recalculated by going through every transaction.
+class RunningAggregates:
 
+    #Creating a function to act as the constructor of an object
+    def __init__(self, transactions = None):
+        self.by_type = {}
+        self.by_category = {}
+        self.by_month = {}
 
+        #Number of transactions left out of the totals as their amount cannot be converted to cents (see get_valid_cents)
+        self.skipped_count = 0
 
+        #Adding every transaction from the main transactions dictionary if one is provided
+        if transactions != None:
+            for expense, exp_transactions in transactions.items():
+                for info in exp_transactions:
+                    self.add(expense, info)
 
 
-    
+    #Creating a function to add an amount to a total in one of the dictionaries of totals, removing totals which drop to zero
+    @staticmethod
+    def add_to_total(totals, key, cents):
+        total = totals.get(key, 0) + cents
+        if total == 0:
+            totals.pop(key, None)
+        else:
+            totals[key] = total
+
+
+    #Creating a function to add a transaction to the totals (a sign of -1 removes the transaction instead)
+    #A transaction whose amount cannot be converted is only counted in skipped_count
+    def add(self, purpose, info, sign = 1):
+        cents = get_valid_cents(info["amount"])
+        if cents == None:
+            self.skipped_count += sign
+            return
+        cents *= sign
+        type_ = info["type"]
+        self.add_to_total(self.by_type, type_, cents)
+        self.add_to_total(self.by_category, (purpose, type_), cents)
+        self.add_to_total(self.by_month, (info["date"][:7], type_), cents)
+
+
+    #Creating a function to remove a transaction from the totals
+    def remove(self, purpose, info):
+        self.add(purpose, info, -1)
+
+
+    #Creating a function to update the totals with a change record created by add_transaction, update_transaction or delete_transaction
+    def apply_change(self, change):
+        if change["op"] == "add":
+            self.add(change["purpose"], change["record"])
+        elif change["op"] == "delete":
+            self.remove(change["purpose"], change["record"])
+        elif change["op"] == "update":
+            self.remove(change["purpose"], change["record"])
+            self.add(change["new_purpose"], change["new_record"])
+
+
+    #Creating a function to get the total expenses and total income in cents
+    #(every transaction type other than "Expense" is counted as income, the same way transactions_summary does it)
+    def totals(self):
+        total_expenses = self.by_type.get("Expense", 0)
+        total_income = 0
+        for type_, cents in self.by_type.items():
+            if type_ != "Expense":
+                total_income += cents
+        return [total_expenses, total_income]
+
+
+    #Creating a function to add the totals of another set of transactions (a list of the by_type, by_category and by_month dictionaries
+    #and the skipped_count, as returned by aggregate_chunk)
+    def merge(self, totals):
+        for own_totals, other_totals in zip((self.by_type, self.by_category, self.by_month), totals[:3]):
+            for key, cents in other_totals.items():
+                self.add_to_total(own_totals, key, cents)
+        self.skipped_count += totals[3]
+
+
+    #Creating a function to verify the running totals by recalculating them from scratch
+    #An AssertionError is raised if any of the totals do not match
+    def verify(self, transactions):
+        expected = RunningAggregates(transactions)
+        assert self.by_type == expected.by_type, f"Running totals per type do not match: {self.by_type} != {expected.by_type}"
+        assert self.by_category == expected.by_category, "Running totals per category do not match"
+        assert self.by_month == expected.by_month, "Running totals per month do not match"
+        assert self.skipped_count == expected.skipped_count, "Number of transactions left out of the totals does not match"
+
+
+#Transactions shared with the worker processes of aggregate_transactions. When the workers are started with fork they inherit the transactions,
+#so only the position of each chunk has to be sent to them rather than the transactions themselves
+shared_transactions = None
+
+
+#Creating a function to calculate the running totals of a chunk of transactions in a worker process
+#The chunk is a list of [purpose, transactions list, start, end] lists, where the transactions list is None if the shared transactions are used
+#The totals are returned as a list of the by_type, by_category and by_month dictionaries and the skipped_count
+def aggregate_chunk(chunk):
+    aggregates = RunningAggregates()
+    for expense, exp_transactions, start, end in chunk:
+        if exp_transactions == None:
+            exp_transactions = shared_transactions[expense]
+        for info in exp_transactions[start:end]:
+            aggregates.add(expense, info)
+    return [aggregates.by_type, aggregates.by_category, aggregates.by_month, aggregates.skipped_count]
+
+
+#Creating a function to split the main transactions dictionary into chunks of up to chunk_size transactions for aggregate_chunk
+#If share is False, each chunk holds its own copy of the lists of transactions, so it can be sent to a worker which does not have the shared transactions
+def get_aggregate_chunks(transactions, chunk_size, share = True):
+    chunks = []
+    chunk = []
+    size = 0
+    for expense, exp_transactions in transactions.items():
+        start = 0
+        while start < len(exp_transactions):
+            end = min(start + chunk_size - size, len(exp_transactions))
+            if share:
+                chunk.append([expense, None, start, end])
+            else:
+                chunk.append([expense, exp_transactions[start:end], 0, end - start])
+            size += end - start
+            start = end
+
+            if size == chunk_size:
+                chunks.append(chunk)
+                chunk = []
+                size = 0
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+#Creating a function to get the number of worker processes used by aggregate_transactions (0 or less uses one worker per CPU)
+#More workers than CPUs are never used, as the extra processes only add the cost of starting them and sending the totals back
+def get_worker_count(workers = None):
+    if workers == None:
+        workers = AGGREGATE_WORKERS
+    cpu_count = os.cpu_count() or 1
+    if workers <= 0:
+        workers = cpu_count
+    return min(workers, cpu_count)
+
+
+#Creating a function to calculate the RunningAggregates of the main transactions dictionary
+#Ledgers with at least PARALLEL_MIN_RECORDS transactions are split into chunks which are added up by worker processes, and the totals of
+#every chunk are merged in order. Smaller ledgers (or a single worker) are added up in this process, which gives exactly the same totals.
+def aggregate_transactions(transactions, workers = None):
+    workers = get_worker_count(workers)
+    count = count_transactions(transactions)
+    if workers <= 1 or count < PARALLEL_MIN_RECORDS:
+        return RunningAggregates(transactions)
+
+    global shared_transactions
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    #Splitting the transactions into a few chunks per worker, so a worker which finishes early can take another chunk
+    share = "fork" in multiprocessing.get_all_start_methods()
+    chunks = get_aggregate_chunks(transactions, math.ceil(count / (workers * 4)), share)
+    aggregates = RunningAggregates()
+    try:
+        shared_transactions = transactions if share else None
+        context = multiprocessing.get_context("fork") if share else None
+        with ProcessPoolExecutor(min(workers, len(chunks)), context) as executor:
+            for totals in executor.map(aggregate_chunk, chunks):
+                aggregates.merge(totals)
+    except (OSError, ImportError, NotImplementedError, RuntimeError):
+        #Adding up the transactions in this process if worker processes cannot be started on this platform (or a worker stopped)
+        return RunningAggregates(transactions)
+    finally:
+        shared_transactions = None
+    return aggregates
+
+
+#Creating a class definition for an index of transactions ordered by their date, used for date range queries
+#The dates of every transaction are kept in a sorted list, with the row (purpose, amount, type, date) of each transaction in a list of the same order,
+#so the transactions in a range of dates are found with bisect in O(log N) and returned already in date order.
+#Transactions with the same date are kept in the order they were added
+class DateIndex:
+
+    #Creating a function to act as the constructor of an object
+    def __init__(self, transactions = None):
+        self.dates = []
+        self.rows = []
+
+        #Sorting the rows of every transaction once (sorted() keeps the original order of rows with the same date)
+        if transactions != None:
+            self.rows = sorted(get_rows(transactions), key = lambda row: row[3])
+            self.dates = [row[3] for row in self.rows]
+
+
+    #Creating a function to get the row of a transaction
+    @staticmethod
+    def get_row(purpose, info):
+        return (purpose, info["amount"], info["type"], info["date"])
+
+
+    #Creating a function to add a transaction to the index, after any transactions with the same date
+    def add(self, purpose, info):
+        row = self.get_row(purpose, info)
+        position = bisect_right(self.dates, row[3])
+        self.dates.insert(position, row[3])
+        self.rows.insert(position, row)
+
+
+    #Creating a function to remove a transaction from the index
+    #Transactions with equal values are interchangeable in the index, so the first one with the same date and values is removed
+    def remove(self, purpose, info):
+        row = self.get_row(purpose, info)
+        start = bisect_left(self.dates, row[3])
+        position = self.rows.index(row, start, bisect_right(self.dates, row[3], start))
+        del self.dates[position]
+        del self.rows[position]
+
+
+    #Creating a function to update the index with a change record created by add_transaction, update_transaction or delete_transaction
+    def apply_change(self, change):
+        if change["op"] == "add":
+            self.add(change["purpose"], change["record"])
+        elif change["op"] == "delete":
+            self.remove(change["purpose"], change["record"])
+        elif change["op"] == "update":
+            self.remove(change["purpose"], change["record"])
+            self.add(change["new_purpose"], change["new_record"])
+
+
+    #Creating a function to get the rows of the transactions between two dates (inclusive) in date order
+    #None can be used for either date to leave that end of the range open
+    def get_range(self, start = None, end = None):
+        first = 0 if start == None else bisect_left(self.dates, start)
+        last = len(self.dates) if end == None else bisect_right(self.dates, end)
+        return self.rows[first:last]
+
+
+    #Creating a function to get the number of transactions in the index
+    def __len__(self):
+        return len(self.rows)
+
+
+#Creating a function to convert a date entered for the start or end of a date range (YYYY-MM-DD, YYYY-MM or YYYY) to a YYYY-MM-DD date
+#The start of a range is the first day of the month or year entered, and the end of a range is the last day
+#None is returned for an empty date (which leaves that end of the range open) and a ValueError is raised if the date is not valid
+def parse_date_bound(text, end = False):
+    text = text.strip()
+    if text == "":
+        return None
+
+    for date_format in ("%Y-%m-%d", "%Y-%m", "%Y"):
+        try:
+            first_day = datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+
+        if not end or date_format == "%Y-%m-%d":
+            return first_day.isoformat()
+        if date_format == "%Y-%m":
+            #The last day of a month is the day before the first day of the next month
+            next_month = date(first_day.year + first_day.month // 12, first_day.month % 12 + 1, 1)
+            return date.fromordinal(next_month.toordinal() - 1).isoformat()
+        return date(first_day.year, 12, 31).isoformat()
+
+    raise ValueError(f"Invalid date '{text}'. Please enter a date as YYYY-MM-DD, YYYY-MM or YYYY.")
+
+
+#Creating a function to convert the dates entered for a date range to a list of its first and last dates (YYYY-MM-DD, or None if left empty)
+#A ValueError is raised if either date is not valid or the range ends before it starts
+def parse_date_range(start_text, end_text):
+    start = parse_date_bound(start_text)
+    end = parse_date_bound(end_text, True)
+    if start != None and end != None and start > end:
+        raise ValueError("Invalid date range. The first date must not be after the last date.")
+    return [start, end]
+
+
+#Creating a class definition for the rollup report, which keeps the total amount (in cents) and the number of transactions of every month, purpose and type
+#The report is saved as a sidecar file next to the transaction records (see get_rollup_filename) with the stamp of the files it was calculated from,
+#so it only has to be calculated again if the files were changed by something other than a change applied to the report
+class RollupReport:
+
+    #Version of the layout of the rollup report file
+    #Version 2 added the number of transactions left out of the report
+    VERSION = 2
+
+    #Creating a function to act as the constructor of an object
+    #"cells" maps each (month, purpose, type) to a list of the total in cents and the number of transactions
+    #skipped_count is the number of transactions left out of the report as their amount cannot be converted to cents (see get_valid_cents)
+    def __init__(self, cells = None, stamp = None, skipped_count = 0):
+        self.cells = cells if cells != None else {}
+        self.stamp = stamp
+        self.skipped_count = skipped_count
+
+
+    #Creating a function to calculate the report from every transaction in the main transactions dictionary
+    @classmethod
+    def from_transactions(cls, transactions, stamp = None):
+        report = cls(stamp = stamp)
+        for expense, exp_transactions in transactions.items():
+            for info in exp_transactions:
+                report.add(expense, info)
+        return report
+
+
+    #Creating a function to load a saved report (None is returned if the file does not exist or is damaged)
+    @classmethod
+    def load(cls, filename):
+        try:
+            with open(filename, "r") as file:
+                data = json.load(file)
+            if data["version"] != cls.VERSION:
+                return None
+            cells = {(month, purpose, type_): [cents, count] for month, purpose, type_, cents, count in data["cells"]}
+            return cls(cells, data["stamp"], data["skipped"])
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+
+
+    #Creating a function to save the report, writing to a temporary file first so the report is never left half-written
+    def save(self, filename):
+        temp_filename = filename + ".tmp"
+        with open(temp_filename, "w") as file:
+            cells = [[month, purpose, type_, cents, count] for (month, purpose, type_), (cents, count) in self.cells.items()]
+            json.dump({"version": self.VERSION, "stamp": self.stamp, "cells": cells, "skipped": self.skipped_count}, file)
+        os.replace(temp_filename, filename)
+
+
+    #Creating a function to add a transaction to the cell of its month, purpose and type (a sign of -1 removes the transaction instead)
+    #Cells are removed once they have no transactions. A transaction whose amount cannot be converted is only counted in skipped_count
+    def add(self, purpose, info, sign = 1):
+        cents = get_valid_cents(info["amount"])
+        if cents == None:
+            self.skipped_count += sign
+            return
+        key = (info["date"][:7], purpose, info["type"])
+        cell = self.cells.get(key)
+        if cell == None:
+            cell = self.cells[key] = [0, 0]
+        cell[0] += cents * sign
+        cell[1] += sign
+        if cell[1] == 0:
+            del self.cells[key]
+
+
+    #Creating a function to update the cells affected by a change record created by add_transaction, update_transaction or delete_transaction
+    def apply_change(self, change):
+        if change["op"] == "add":
+            self.add(change["purpose"], change["record"])
+        elif change["op"] == "delete":
+            self.add(change["purpose"], change["record"], -1)
+        elif change["op"] == "update":
+            self.add(change["purpose"], change["record"], -1)
+            self.add(change["new_purpose"], change["new_record"])
+
+
+    #Creating a function to get the rows of the report for each month (period "month") or year (period "year")
+    #Each row is a list of the period, purpose, type, total in cents and number of transactions, in order of period, purpose and type
+    def get_rows(self, period = "month"):
+        if period == "month":
+            return sorted([month, purpose, type_, cents, count] for (month, purpose, type_), (cents, count) in self.cells.items())
+
+        totals = {}
+        for (month, purpose, type_), (cents, count) in self.cells.items():
+            key = (month[:4], purpose, type_)
+            total = totals.get(key)
+            if total == None:
+                totals[key] = [cents, count]
+            else:
+                total[0] += cents
+                total[1] += count
+        return sorted([year, purpose, type_, cents, count] for (year, purpose, type_), (cents, count) in totals.items())
+
+
+#Creating a class definition for the interface shared by every storage backend of the transaction records
+#A backend loads the main transactions dictionary and saves the change records made to it (see apply_change). Every backend implements
+#get_stamp, iter_transactions and save_changes, and the other functions have defaults built on them.
+#Backends which can run queries themselves (see QueryMixin) are used by the GUI for searches and sorts instead of its own indexes
+class StorageBackend(ABC):
+
+    #Name of the kind of storage backend (eg: used in the name of the rollup report file)
+    KIND = None
+
+    #Creating a function to get a value which changes whenever the stored transactions are changed by another program
+    @abstractmethod
+    def get_stamp(self):
+        pass
+
+
+    #Creating a function to get the modification times and sizes of the files the transactions are stored in
+    #Unlike get_stamp, the value can be compared with one saved by an earlier session (it is saved with the rollup report)
+    def get_source_stamp(self):
+        return self.get_stamp()
+
+
+    #Creating a function to load the transactions between two dates (YYYY-MM-DD, inclusive, with None leaving either end of the range open)
+    #The transactions returned may include transactions outside of the range, as backends which cannot load part of the transactions load all of them
+    def load_range(self, start = None, end = None, index = None):
+        return self.load(index)
+
+
+    #Creating a function to load the main transactions dictionary (None is returned if the transactions cannot be loaded)
+    #If a TransactionIndex is provided, every transaction loaded is also added to the index
+    #By default the transactions are read with iter_transactions, and the changes saved since are applied with replay_changes
+    def load(self, index = None):
+        with instrumentation.measure("load") as measurement:
+            transactions = {}
+            for expense, info in self.iter_transactions():
+                if expense not in transactions:
+                    transactions[expense] = []
+                transactions[expense].append(info)
+            self.replay_changes(transactions)
+            if index != None:
+                for expense, exp_transactions in transactions.items():
+                    for info in exp_transactions:
+                        index.add(expense, info)
+            measurement.records = count_transactions(transactions)
+        return transactions
+
+
+    #Creating a function to iterate through the stored transactions as [expense, info] lists
+    #The position of each transaction in this order is its row id in search and sort
+    @abstractmethod
+    def iter_transactions(self):
+        pass
+
+
+    #Creating a function to apply the changes saved since the transactions returned by iter_transactions were written (True is returned if there were any)
+    def replay_changes(self, transactions):
+        return False
+
+
+    #Creating a function to set how many of the transactions read by the last iter_transactions are displayed (eg: by the GUI, as it adds the rows read)
+    #Until it is called, search and sort keep returning the row ids of the transactions displayed before, so a reload on another thread does not change them
+    def show_rows(self, count):
+        return
+
+
+    #Creating a function to save a single change record made to the main transactions dictionary
+    def save_change(self, transactions, change):
+        self.save_changes(transactions, [change])
+        return
+
+
+    #Creating a function to save a list of change records made to the main transactions dictionary with a single write
+    @abstractmethod
+    def save_changes(self, transactions, changes):
+        pass
+
+
+    #Creating a function to finish any work left by a bulk change (eg: compacting the journal), once all changes have been saved
+    def flush(self, transactions):
+        return
+
+
+#Creating a class definition for the JSON storage backend, which keeps the transactions in a JSON file and its journal
+#In bulk mode, the journal is only compacted by flush rather than every time it grows past JOURNAL_COMPACT_SIZE
+class JSONBackend(StorageBackend):
+
+    KIND = "json"
+
+    #Creating a function to act as the constructor of an object
+    def __init__(self, filename, bulk = False):
+        self.filename = filename
+        self.bulk = bulk
+
+
+    #Creating a function to get the modification time and size of the JSON file and its journal
+    def get_stamp(self):
+        return [get_file_stamp(self.filename), get_file_stamp(get_journal_filename(self.filename))]
+
+
+    #Creating a function to load the main transactions dictionary from the JSON file and its journal
+    def load(self, index = None):
+        with instrumentation.measure("load") as measurement:
+            transactions = read_bulk_transactions_from_file(self.filename, index, SNAPSHOT_MODE)
+            measurement.records = count_transactions(transactions)
+        return transactions
+
+
+    #Creating a function to load the transactions between two dates (YYYY-MM-DD, inclusive, with None leaving either end of the range open)
+    #If the snapshot is up to date and there are no changes in the journal, only the transactions in the range are read from the arrays of the snapshot
+    #(along with any transactions kept as JSON text). Otherwise every transaction is loaded
+    def load_range(self, start = None, end = None, index = None):
+        if SNAPSHOT_MODE and get_file_stamp(get_journal_filename(self.filename)) == None:
+            snapshot = open_snapshot(self.filename, get_file_stamp(self.filename))
+            if snapshot != None:
+                transactions = {}
+                with instrumentation.measure("load") as measurement:
+                    try:
+                        with snapshot:
+                            for expense, info in snapshot.iter_range(start, end):
+                                if expense not in transactions:
+                                    transactions[expense] = []
+                                transactions[expense].append(info)
+                    except (IndexError, ValueError):
+                        #A damaged snapshot is only found part of the way through, in which case every transaction is loaded from the JSON file instead
+                        transactions = None
+                    measurement.records = count_transactions(transactions)
+                if transactions != None:
+                    if index != None:
+                        for expense, exp_transactions in transactions.items():
+                            for info in exp_transactions:
+                                index.add(expense, info)
+                    return transactions
+        return self.load(index)
+
+
+    #Creating a function to iterate through the transactions in the JSON file (the journal is applied afterwards by replay_changes)
+    #The transactions are read from the binary snapshot of the JSON file instead if it is up to date
+    def iter_transactions(self):
+        if SNAPSHOT_MODE:
+            snapshot = open_snapshot(self.filename, get_file_stamp(self.filename))
+            if snapshot != None:
+                return iter_snapshot_transactions(snapshot)
+        return iter_transactions_from_file(self.filename)
+
+
+    #Creating a function to apply the changes recorded in the journal
+    def replay_changes(self, transactions):
+        return replay_journal(transactions, self.filename) > 0
+
+
+    #Creating a function to save a list of change records to the journal (or the JSON file)
+    def save_changes(self, transactions, changes):
+        with instrumentation.measure("save") as measurement:
+            measurement.records = len(changes)
+            if self.bulk:
+                save_changes(transactions, self.filename, changes, None)
+            else:
+                save_changes(transactions, self.filename, changes)
+        return
+
+
+    #Creating a function to compact the journal into the JSON file after a bulk change
+    def flush(self, transactions):
+        if self.bulk and get_file_stamp(get_journal_filename(self.filename)) != None:
+            with instrumentation.measure("save"):
+                compact_journal(transactions, self.filename)
+        return
+
+
+#Creating a class definition for the searches, sorts and date ranges run by the SQLite backend with the indexes on each column of its transactions table
+#The GUI uses them instead of its own indexes for any storage backend which includes this class. The row ids returned are the positions of the
+#transactions in the order of iter_transactions (search results in ascending order, the same way as SearchIndex.search).
+#The queries use the connection, lock and row ids of the SQLiteBackend they are part of
+class QueryMixin:
+
+    #Columns of the transactions table used to sort each column of the GUI
+    SORT_COLUMNS = {"Transaction": "purpose", "Amount": "cents", "Type": "type", "Date": "date"}
+
+    #Creating a function to get the row ids of the transactions returned by a query of their ids, in the order returned by the query (while holding the lock)
+    #Transactions which are not displayed yet (see show_rows) are left out
+    def get_row_ids(self, query, parameters = ()):
+        row_ids = []
+        for (record_id,) in self.connection.execute(query, parameters):
+            row_id = self.row_ids.get(record_id)
+            if row_id != None and row_id < self.row_count:
+                row_ids.append(row_id)
+        return row_ids
+
+
+    #Creating a function to get the row ids of the transactions returned by a query of their ids, in ascending order of row id
+    def get_sorted_row_ids(self, query, parameters = ()):
+        row_ids = self.get_row_ids(query, parameters)
+        row_ids.sort()
+        return row_ids
+
+
+    #Creating a function to search a column for a search term with a query using the index of the column
+    def search(self, column_name, text):
+        with self.lock:
+            if column_name == "Transaction":
+                #The purposes containing the search term are found in the (much smaller) purposes table
+                return self.get_sorted_row_ids("SELECT id FROM transactions WHERE purpose IN (SELECT name FROM purposes WHERE instr(name, ?) > 0)", (text,))
+
+            if column_name == "Amount":
+                amount_range = SearchIndex.AMOUNT_RANGE.match(text)
+                try:
+                    cents = amount_to_cents(text)
+                except ValueError:
+                    cents = None
+                if cents != None:
+                    #Searching for the exact amount first, and then for the range of amounts if the exact amount was not found
+                    row_ids = self.get_sorted_row_ids("SELECT id FROM transactions WHERE cents = ? AND amount = ?", (cents, text))
+                    if row_ids:
+                        return row_ids
+                if amount_range:
+                    low = amount_to_cents(amount_range.group(1))
+                    high = amount_to_cents(amount_range.group(2))
+                    return self.get_sorted_row_ids("SELECT id FROM transactions WHERE cents BETWEEN ? AND ?", (low, high))
+                return []
+
+            if column_name == "Type":
+                types = [type_ for (type_,) in self.connection.execute("SELECT DISTINCT type FROM transactions") if text in type_.capitalize()]
+                placeholders = ", ".join("?" * len(types))
+                return self.get_sorted_row_ids(f"SELECT id FROM transactions WHERE type IN ({placeholders})", types)
+
+            if column_name == "Date":
+                if SearchIndex.DATE_PREFIX.match(text):
+                    #A search term starting with a year can only match the beginning of an ISO date, so a range of the date index is used
+                    #Dates which are not in the ISO format (eg: "31/05/2024") can contain the year anywhere, so they are also searched for the term
+                    return self.get_sorted_row_ids("SELECT id FROM transactions WHERE date >= ? AND date < ? UNION "
+                                                   "SELECT id FROM transactions WHERE date NOT GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]' AND instr(date, ?) > 0",
+                                                   (text, text + chr(0x10FFFF), text))
+                return self.get_sorted_row_ids("SELECT id FROM transactions WHERE instr(date, ?) > 0", (text,))
+        return []
+
+
+    #Creating a function to get the row ids of every transaction sorted by a column using the index of the column
+    #Transactions with the same value are sorted in the same order as iter_transactions, which is the order of their row ids
+    def sort(self, column_name):
+        with self.lock:
+            return self.get_row_ids(f"SELECT t.id FROM transactions t JOIN purposes p ON p.name = t.purpose ORDER BY t.{self.SORT_COLUMNS[column_name]}, p.rowid, t.id")
+
+
+    #Creating a function to get the row ids of the transactions between two dates (inclusive) in date order using the index of the date column
+    #Transactions with the same date are in the order of their row ids, and None leaves either end of the range open
+    def date_range(self, start = None, end = None):
+        with self.lock:
+            return self.get_row_ids("SELECT t.id FROM transactions t JOIN purposes p ON p.name = t.purpose WHERE t.date >= ? AND t.date <= ? ORDER BY t.date, p.rowid, t.id",
+                                    (start if start != None else "", end if end != None else chr(0x10FFFF)))
+
+
+#Creating a class definition for the SQLite storage backend, which keeps the transactions in an SQLite database in WAL mode
+#Each change record is saved with a single statement rather than rewriting the file, and searches and sorts are run by SQLite using the indexes on each column (see QueryMixin)
+class SQLiteBackend(QueryMixin, StorageBackend):
+
+    KIND = "sqlite"
+
+    #Version of the database schema, which is stored as the user_version of the database (0 for a database which has just been created)
+    #Version 2 added the revision table
+    SCHEMA_VERSION = 2
+
+    #Number of rows fetched from the database at a time by iter_transactions
+    FETCH_SIZE = 2000
+
+    #Creating a function to act as the constructor of an object
+    #If the database is created, the transactions in json_filename (if it exists) are imported into it
+    def __init__(self, filename, json_filename = None):
+        self.filename = filename
+
+        #Row ids (positions in the order of iter_transactions) of the transactions displayed, by their id in the database, and the number of them displayed
+        #(see show_rows). The row ids of the transactions read by the last iter_transactions are kept separately until they are displayed
+        self.row_ids = {}
+        self.row_count = 0
+        self.loaded_row_ids = {}
+
+        import sqlite3
+        import threading
+
+        #The connection is shared by the Tk thread and the threads which load and search transactions in the GUI, so it is only used while holding the lock
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(filename, check_same_thread = False)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version < self.SCHEMA_VERSION:
+            self.create_schema(json_filename, version)
+
+
+    #Creating a function to create (or upgrade from an earlier version) the tables and indexes of the database, and import the transactions from the JSON file
+    #Everything is done in a single transaction, so the import is either completed or not done at all
+    def create_schema(self, json_filename, version = 0):
+        with self.connection:
+            self.connection.execute("BEGIN")
+
+            #The purposes are kept in their own table so the order they were added in (and purposes without transactions) are kept, as they are in the JSON file
+            self.connection.execute("CREATE TABLE IF NOT EXISTS purposes (name TEXT PRIMARY KEY)")
+
+            #The amount is kept as it was entered (eg: "5000.00") along with the number of cents which is used for sorting and ranges
+            self.connection.execute("CREATE TABLE IF NOT EXISTS transactions (id INTEGER PRIMARY KEY, purpose TEXT NOT NULL, amount NOT NULL, cents INTEGER NOT NULL, type TEXT NOT NULL, date TEXT NOT NULL)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS transactions_purpose ON transactions (purpose)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS transactions_cents ON transactions (cents)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS transactions_type ON transactions (type)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS transactions_date ON transactions (date)")
+
+            #The revision number is increased by every save, so a saved copy of a calculation (eg: the rollup report) can tell if the transactions have changed since
+            self.connection.execute("CREATE TABLE IF NOT EXISTS revision (id INTEGER PRIMARY KEY CHECK (id = 1), number INTEGER NOT NULL)")
+            self.connection.execute("INSERT OR IGNORE INTO revision (id, number) VALUES (1, 0)")
+
+            #The JSON file is only imported when the database is first created
+            if version == 0 and json_filename != None and os.path.exists(json_filename):
+                transactions = read_bulk_transactions_from_file(json_filename)
+                if transactions != None:
+                    rejected = []
+                    self.connection.executemany("INSERT OR IGNORE INTO purposes (name) VALUES (?)", [(expense,) for expense in transactions])
+                    self.connection.executemany("INSERT INTO transactions (purpose, amount, cents, type, date) VALUES (?, ?, ?, ?, ?)",
+                                                self.iter_import_values(json_filename, transactions, rejected))
+                    print(f"The transaction records in {json_filename} have been imported into {self.filename}.")
+
+                    #Transactions whose amount is not a number cannot be stored with their cents, so they are written to a CSV file next to the database
+                    #(in the same layout as the rejected rows of the import command) rather than stopping the import
+                    if rejected:
+                        rejected_filename = os.path.splitext(self.filename)[0] + ".rejected.csv"
+                        write_rejected_rows(rejected, rejected_filename)
+                        print(f"{len(rejected)} transaction{'s' if len(rejected) != 1 else ''} could not be imported, as the amount is not a number, and {'have' if len(rejected) != 1 else 'has'} been written to {rejected_filename}.")
+
+            self.connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+
+    #Creating a function to get the values of the columns of the transactions table for a transaction
+    #A ValueError (or OverflowError if it is too large for an SQLite integer) is raised if the amount cannot be converted to cents
+    @staticmethod
+    def get_values(purpose, info):
+        cents = amount_to_cents(info["amount"])
+        if not -2 ** 63 <= cents < 2 ** 63:
+            raise OverflowError(f"The amount {info['amount']!r} is too large")
+        return (purpose, info["amount"], cents, info["type"], info["date"])
+
+
+    #Creating a function to iterate through the values of the transactions imported from the JSON file when the database is created
+    #Transactions whose amount cannot be converted are added to rejected as [JSON file, position of the transaction in the file, row, reason] lists instead
+    def iter_import_values(self, json_filename, transactions, rejected):
+        position = 0
+        for expense, exp_transactions in transactions.items():
+            for info in exp_transactions:
+                position += 1
+                try:
+                    values = self.get_values(expense, info)
+                except (TypeError, ValueError, OverflowError):
+                    rejected.append([json_filename, position, [expense, info["amount"], info["type"], info["date"]], f"invalid amount {info['amount']!r}"])
+                    continue
+                yield values
+
+
+    #Creating a function to get a value which changes whenever another connection has changed the database
+    #(changes made through this connection do not change it, in the same way the session records its own changes with mark_saved)
+    def get_stamp(self):
+        with self.lock:
+            return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+
+    #Creating a function to get the revision number of the database (the modification time of the database file is not used,
+    #as the write-ahead log is written back into the database file whenever the last connection is closed)
+    def get_source_stamp(self):
+        with self.lock:
+            return self.connection.execute("SELECT number FROM revision").fetchone()[0]
+
+
+    #Creating a function to load the main transactions dictionary from the database
+    def load(self, index = None):
+        import sqlite3
+        transactions = {}
+        try:
+            with instrumentation.measure("load") as measurement:
+                with self.lock:
+                    names = self.connection.execute("SELECT name FROM purposes ORDER BY rowid").fetchall()
+                for (expense,) in names:
+                    transactions[expense] = []
+
+                for expense, info in self.iter_transactions():
+                    if expense not in transactions:
+                        transactions[expense] = []
+                    transactions[expense].append(info)
+                    if index != None:
+                        index.add(expense, info)
+                measurement.records = count_transactions(transactions)
+        except sqlite3.Error as error_msg:
+            print(f"Error reading the transactions database: {error_msg}")
+            return None
+        return transactions
+
+
+    #Creating a function to iterate through the transactions, fetching FETCH_SIZE rows at a time
+    #The transactions are grouped by purpose in the order the purposes were added and then in the order they were added, the same order as the JSON file
+    #The row ids of the transactions are only used by search and sort once show_rows has been called
+    def iter_transactions(self):
+        row_ids = {}
+        with self.lock:
+            self.loaded_row_ids = row_ids
+            cursor = self.connection.execute("SELECT t.id, t.purpose, t.amount, t.type, t.date FROM transactions t JOIN purposes p ON p.name = t.purpose ORDER BY p.rowid, t.id")
+        while True:
+            with self.lock:
+                rows = cursor.fetchmany(self.FETCH_SIZE)
+                for row in rows:
+                    row_ids[row[0]] = len(row_ids)
+            if not rows:
+                break
+            for record_id, expense, amount, type_, date_ in rows:
+                yield [expense, {"amount": amount, "type": type_, "date": date_}]
+
+
+    #Creating a function to make the row ids of the transactions read by the last iter_transactions the ones used by search and sort
+    #Only the row ids of the first count transactions read are returned, as the later ones may not have been displayed yet
+    def show_rows(self, count):
+        with self.lock:
+            self.row_ids = self.loaded_row_ids
+            self.row_count = count
+
+
+    #Creating a function to get the id of the first transaction (the same one TransactionIndex.find returns) which matches a purpose and transaction
+    def find(self, purpose, info):
+        row = self.connection.execute("SELECT id FROM transactions WHERE purpose = ? AND amount = ? AND cents = ? AND type = ? AND date = ? ORDER BY id LIMIT 1",
+                                      self.get_values(purpose, info)).fetchone()
+        if row == None:
+            return None
+        return row[0]
+
+
+    #Creating a function to add a transaction to the database
+    def insert(self, purpose, info):
+        self.connection.execute("INSERT OR IGNORE INTO purposes (name) VALUES (?)", (purpose,))
+        self.connection.execute("INSERT INTO transactions (purpose, amount, cents, type, date) VALUES (?, ?, ?, ?, ?)", self.get_values(purpose, info))
+
+
+    #Creating a function to save a list of change records to the database in a single transaction
+    def save_changes(self, transactions, changes):
+        with instrumentation.measure("save") as measurement, self.lock, self.connection:
+            measurement.records = len(changes)
+            for change in changes:
+                self.apply_change(change)
+            self.connection.execute("UPDATE revision SET number = number + 1")
+        return
+
+
+    #Creating a function to apply a single change record to the database
+    def apply_change(self, change):
+        purpose = change["purpose"]
+        if change["op"] == "add":
+            self.insert(purpose, change["record"])
+            return
+
+        #Updates and deletes are only applied if the original transaction can still be found
+        record_id = self.find(purpose, change["record"])
+        if record_id == None:
+            return
+
+        if change["op"] == "delete":
+            self.connection.execute("DELETE FROM transactions WHERE id = ?", (record_id,))
+
+        elif change["op"] == "update":
+            new_purpose = change["new_purpose"]
+            if new_purpose == purpose:
+                self.connection.execute("UPDATE transactions SET amount = ?, cents = ?, type = ?, date = ? WHERE id = ?",
+                                        self.get_values(purpose, change["new_record"])[1:] + (record_id,))
+            else:
+                #Giving the transaction a new id, so it is moved to the end of the transactions of the new purpose (the same way update_transaction does it)
+                self.connection.execute("DELETE FROM transactions WHERE id = ?", (record_id,))
+                self.insert(new_purpose, change["new_record"])
+        return
+
+
+#Creating a class definition for the sharded storage backend, which keeps the transactions in a folder with one JSON file (shard) for each year or month
+#and a manifest listing the shards. A change only rewrites the shards of the dates it touches, and a date range only reads the shards it overlaps.
+#Shards are never changed in place: the changed shards are written to new files and the manifest is then replaced (a single rename) to point to them,
+#so a change which touches several shards (eg: an update which moves a transaction to a different year) is saved completely or not at all
+class ShardedBackend(StorageBackend):
+
+    KIND = "sharded"
+
+    #Version of the layout of the manifest
+    VERSION = 1
+
+    #Creating a function to act as the constructor of an object
+    #If the folder has not been created yet, the transactions in json_filename (if it exists) are split into shards
+    def __init__(self, folder, json_filename = None, period = None):
+        self.filename = folder
+        self.manifest_filename = os.path.join(folder, "manifest.json")
+        if not os.path.exists(self.manifest_filename):
+            self.create_shards(json_filename, period if period != None else SHARD_PERIOD)
+
+
+    #Creating a function to create the folder and the shards of the transactions in the JSON file
+    def create_shards(self, json_filename, period):
+        if period not in ("year", "month"):
+            raise ValueError(f"Invalid shard period {period!r}. Please use year or month.")
+        os.makedirs(self.filename, exist_ok = True)
+        self.manifest = {"version": self.VERSION, "period": period, "generation": 0, "purposes": [], "shards": {}}
+
+        transactions = {}
+        if json_filename != None and os.path.exists(json_filename):
+            transactions = read_bulk_transactions_from_file(json_filename)
+            if transactions == None:
+                transactions = {}
+        self.write_shards(transactions, {self.get_shard_key(info["date"]) for exp_transactions in transactions.values() for info in exp_transactions})
+        if transactions != {}:
+            print(f"The transaction records in {json_filename} have been split into the shards in {self.filename}.")
+
+
+    #Creating a function to read the manifest (a json.JSONDecodeError is raised if it is damaged)
+    def read_manifest(self):
+        with open(self.manifest_filename, "r") as file:
+            self.manifest = json.load(file)
+        return self.manifest
+
+
+    #Creating a function to get the key of the shard of a date (eg: "2024" for the year 2024, or "2024-05" for May 2024)
+    def get_shard_key(self, date_):
+        if self.manifest["period"] == "month":
+            return date_[:7]
+        return date_[:4]
+
+
+    #Creating a function to get the modification time and size of the manifest, which is replaced every time a change is saved
+    def get_stamp(self):
+        return get_file_stamp(self.manifest_filename)
+
+
+    #Creating a function to read the transactions in a list of shards into a transactions dictionary, with the purposes in the order of the manifest
+    #A FileNotFoundError or json.JSONDecodeError is raised if the manifest or a shard cannot be read
+    def read_shards(self, keys = None, index = None):
+        manifest = self.read_manifest()
+        if keys == None:
+            keys = manifest["shards"].keys()
+
+        transactions = {expense: [] for expense in manifest["purposes"]}
+        for key in sorted(keys):
+            for expense, info in iter_transactions_from_file(os.path.join(self.filename, manifest["shards"][key]["file"])):
+                if expense not in transactions:
+                    transactions[expense] = []
+                transactions[expense].append(info)
+                if index != None:
+                    index.add(expense, info)
+        return transactions
+
+
+    #Creating a function to load the main transactions dictionary from the shards
+    def load(self, index = None):
+        return self.load_range(None, None, index)
+
+
+    #Creating a function to load the transactions of the shards which overlap a range of dates (YYYY-MM-DD, inclusive)
+    #None can be used for either date to leave that end of the range open. Every transaction of the shards read is returned
+    def load_range(self, start = None, end = None, index = None):
+        try:
+            with instrumentation.measure("load") as measurement:
+                keys = None
+                if start != None or end != None:
+                    #A shard key is the beginning of the dates in the shard, so it is compared with the same number of characters of the dates
+                    keys = [key for key in self.read_manifest()["shards"] if (start == None or start[:len(key)] <= key) and (end == None or key <= end[:len(key)])]
+                transactions = self.read_shards(keys, index)
+                measurement.records = count_transactions(transactions)
+        except json.JSONDecodeError as error_msg:
+            print(f"Error decoding JSON: {error_msg}")
+            return None
+        except FileNotFoundError:
+            print("Transaction records cannot be found.")
+            return None
+        return transactions
+
+
+    #Creating a function to iterate through the transactions in every shard, in the same order as load
+    def iter_transactions(self):
+        for expense, exp_transactions in self.read_shards().items():
+            for info in exp_transactions:
+                yield [expense, info]
+
+
+    #Creating a function to save a list of change records by rewriting only the shards of the dates the changes touch
+    #(an update which changes the date of a transaction touches the shard of its old date and the shard of its new date)
+    def save_changes(self, transactions, changes):
+        with instrumentation.measure("save") as measurement:
+            measurement.records = len(changes)
+            self.read_manifest()
+            keys = set()
+            for change in changes:
+                keys.add(self.get_shard_key(change["record"]["date"]))
+                if change["op"] == "update":
+                    keys.add(self.get_shard_key(change["new_record"]["date"]))
+            self.write_shards(transactions, keys)
+        return
+
+
+    #Creating a function to write the shards of a list of keys from the main transactions dictionary, and then the manifest pointing to them
+    #Each shard is written to a new file named after the generation of the manifest, so the shards in the current manifest are not changed
+    #until the new manifest has replaced it. The files of the replaced shards are removed afterwards
+    #The transactions can be a main transactions dictionary or a TransactionStore, of which only the transactions of the shards being written are produced
+    def write_shards(self, transactions, keys):
+        generation = self.manifest["generation"] + 1
+        transactions = get_transactions_dictionary(transactions, lambda date_: self.get_shard_key(date_) in keys)
+
+        #Going through the transactions once to find the transactions of every shard being written (the other shards do not have to be read or written)
+        shard_transactions = {key: {} for key in keys}
+        for expense, exp_transactions in transactions.items():
+            for info in exp_transactions:
+                shard = shard_transactions.get(self.get_shard_key(info["date"]))
+                if shard != None:
+                    if expense not in shard:
+                        shard[expense] = []
+                    shard[expense].append(info)
+
+        shards = dict(self.manifest["shards"])
+        old_files = []
+        for key, shard in shard_transactions.items():
+            if key in shards:
+                old_files.append(shards.pop(key)["file"])
+            #Shards with no transactions left are removed from the manifest
+            if shard != {}:
+                shard_filename = f"{key}.{generation}.json"
+                add_to_json(shard, os.path.join(self.filename, shard_filename))
+                shards[key] = {"file": shard_filename, "count": count_transactions(shard)}
+
+        manifest = {"version": self.VERSION, "period": self.manifest["period"], "generation": generation, "purposes": list(transactions), "shards": dict(sorted(shards.items()))}
+        temp_filename = self.manifest_filename + ".tmp"
+        with open(temp_filename, "w") as file:
+            json.dump(manifest, file, indent = 2)
+        os.replace(temp_filename, self.manifest_filename)
+        self.manifest = manifest
+
+        for shard_filename in old_files:
+            try:
+                os.remove(os.path.join(self.filename, shard_filename))
+            except FileNotFoundError:
+                pass
+        return
+
+
+#Creating a function to open the storage backend of the transaction records kept in a JSON file
+#The SQLite database and the folder of shards are named after the JSON file, which is imported into them if they have not been created yet
+#bulk is set to True when a large number of changes will be saved, followed by a call to flush
+def open_storage(filename, backend = None, bulk = False):
+    if backend == None:
+        backend = STORAGE_BACKEND
+    if backend == "sqlite":
+        return SQLiteBackend(os.path.splitext(filename)[0] + ".db", filename)
+    if backend == "sharded":
+        return ShardedBackend(os.path.splitext(filename)[0] + ".shards", filename)
+    return JSONBackend(filename, bulk)
+
+
+#Creating a class definition for a session store that keeps the transactions in memory for the whole Finance Tracker session
+#The transactions are kept in a TransactionStore, and the main transactions dictionary is only produced from it when it is needed (see get_transactions).
+#The transactions are only read again from the storage backend when its stamp changes (eg: the modification time or size of the JSON file)
+class SessionStore:
+
+    #Creating a function to act as the constructor of an object
+    #workers is the number of worker processes used to calculate the running totals of large ledgers (None uses AGGREGATE_WORKERS)
+    def __init__(self, storage, workers = None):
+        self.storage = storage
+        self.workers = workers
+        self.store = None
+        self.aggregates = None
+        self.stamp = None
+        self.reload_count = 0
+
+        #Index of the transactions in date order, which is only built when a date range is first viewed
+        self.date_index = None
+
+        #Rollup report of the transactions (loaded or calculated when it is first needed), the stamp of the files the transactions were loaded from
+        #and whether changes have been made to the transactions in memory which have not been saved yet
+        self.rollup = None
+        self.source_stamp = None
+        self.unsaved = False
+
+
+    #Creating a function to get the stamp of the storage backend
+    def get_stamp(self):
+        return self.storage.get_stamp()
+
+
+    #Creating a function to reload the transactions only if the files have changed on disk
+    #True is returned if the transactions were (re)loaded and False if the transactions in memory were kept
+    def refresh(self):
+        #The stamp is taken before reading, so a change made while the file is being read triggers another reload next time
+        stamp = self.get_stamp()
+        if self.store != None and stamp == self.stamp:
+            return False
+
+        self.source_stamp = self.storage.get_source_stamp()
+        transactions = self.storage.load()
+        self.stamp = stamp
+        self.reload_count += 1
+        self.store = None
+        self.date_index = None
+        self.rollup = None
+        self.unsaved = False
+
+        #Calculating the running totals once, after which they are only updated by the changes made during the session
+        #The loaded dictionary is only kept until the transactions have been added to the store
+        if transactions != None:
+            self.aggregates = aggregate_transactions(transactions, self.workers)
+            self.store = TransactionStore.from_transactions(transactions)
+        return True
+
+
+    #Creating a function to get the main transactions dictionary of the transactions in memory (None is returned if they could not be loaded)
+    #The dictionary is produced from the store every time, so changes must be made to the store rather than to the dictionary
+    def get_transactions(self):
+        if self.store == None:
+            return None
+        return self.store.to_transactions()
+
+
+    #Creating a function to get the TransactionStore of the transactions in memory (eg: for the spending statistics)
+    def get_columns(self):
+        return self.store
+
+
+    #Creating a function to get the DateIndex of the transactions in memory (built once and kept up to date with the changes made during the session)
+    def get_date_index(self):
+        if self.date_index == None and self.store != None:
+            self.date_index = DateIndex(self.get_transactions())
+        return self.date_index
+
+
+    #Creating a function to get the name of the rollup report file of the transactions
+    def get_rollup_filename(self):
+        return get_rollup_filename(self.storage.filename, self.storage.KIND)
+
+
+    #Creating a function to load the saved rollup report if it was calculated from the files the transactions were loaded from (otherwise None is returned)
+    def load_rollup(self):
+        rollup = RollupReport.load(self.get_rollup_filename())
+        if rollup == None or self.unsaved or rollup.stamp != self.source_stamp:
+            return None
+        return rollup
+
+
+    #Creating a function to get the rollup report of the transactions in memory
+    #The saved report is used if the files have not changed since it was saved, otherwise it is calculated again and saved
+    def get_rollup(self):
+        if self.rollup == None and self.store != None:
+            self.rollup = self.load_rollup()
+            if self.rollup == None:
+                self.rollup = RollupReport.from_transactions(self.get_transactions(), self.source_stamp)
+
+                #The report is only saved if it matches the files (changes which have not been saved yet are only in memory)
+                if not self.unsaved:
+                    self.rollup.save(self.get_rollup_filename())
+        return self.rollup
+
+
+    #Creating a function to refresh the cells of the rollup report affected by a change, rather than calculating the whole report again
+    #If the change has been saved, the report is also saved with the stamp of the files after the change. The report is only
+    #updated if it is in memory or its saved copy is up to date, otherwise it is calculated again when it is next needed
+    def update_rollup(self, change, saved = True):
+        if self.rollup == None:
+            self.rollup = self.load_rollup()
+        if not saved:
+            self.unsaved = True
+        if self.rollup != None:
+            self.rollup.apply_change(change)
+            if saved:
+                self.save_rollup()
+
+
+    #Creating a function to save the rollup report after the changes made to the transactions have been saved
+    def save_rollup(self):
+        self.unsaved = False
+        self.source_stamp = self.storage.get_source_stamp()
+        if self.rollup != None:
+            self.rollup.stamp = self.source_stamp
+            self.rollup.save(self.get_rollup_filename())
+
+
+    #Creating a function to record the current state of the files after the session has saved its own changes
+    #(this prevents the session from reloading transactions it already has in memory)
+    def mark_saved(self):
+        self.stamp = self.get_stamp()
+        self.source_stamp = self.storage.get_source_stamp()
+
+
+    #Creating a function to update the session after a change record has been made to the store and saved by add_transaction, update_transaction or delete_transaction
+    #(None is passed in if no change was made)
+    def record_change(self, change):
+        if change != None:
+            self.aggregates.apply_change(change)
+            if self.date_index != None:
+                self.date_index.apply_change(change)
+            self.update_rollup(change)
+
+            #Recalculating the totals from scratch to make sure the running totals are correct if verification is enabled
+            if VERIFY_AGGREGATES:
+                self.aggregates.verify(self.get_transactions())
+        self.mark_saved()
+
+
+#Creating a function to add a new transaction to the TransactionStore of the session and save it with the storage backend
+def add_transaction(store, storage):
+    #Calling a function to create a list to store information about the transaction
+    new_transaction = create_new_transaction("Enter the amount paid/receieved during the transaction : ", "Enter the purpose of the transaction : ", "Enter the type of transaction being made (Type 'CR' for Income or 'DR' for Expenses) : ")
+    purpose = new_transaction[0]
+    sub_dict = new_transaction[1]
+
+    #Measuring the change once the transaction has been entered (the time spent typing is not measured)
+    with instrumentation.measure("add") as measurement:
+        measurement.records = 1
+
+        #Adding the sub dictionary to the end of the transactions related to its key (purpose), which creates the key if it does not exist yet
+        store.add(purpose, sub_dict)
+
+        #Calling a function to save the new transaction
+        change = {"op": "add", "purpose": purpose, "record": sub_dict}
+        storage.save_change(store, change)
+    print("\nThe transaction has been successfully added.\n")
+
+    #Returning the change record so the session can update its running totals
+    return change
+
+
+#Creating a function to iterate through the transactions to be displayed by view_transactions
+def iter_view_entries(transactions):
+    for expense, exp_transactions in transactions.items():
+        for info in exp_transactions:
+            yield [expense, info]
+
+
+#Creating a function to get the text displayed for a transaction by view_transactions
+def format_view_entry(entry):
+    expense, info = entry
+    return f"Transaction amount : {info["amount"]}\nTransaction purpose : {expense}\nTransaction type : {info["type"]}\nTransaction date : {info["date"]}\n\n\n"
+
+
+#Creating a function to join the text of the entries into pages, so each page can be written to the output in a single write
+def iter_pages(entries, format_entry, page_size):
+    entries = iter(entries)
+    while True:
+        page = "".join([format_entry(entry) for entry in islice(entries, page_size)])
+        if not page:
+            return
+        yield page
+
+
+#Creating a function to display entries (eg: transactions) one page at a time
+#If the output is not a terminal (eg: it has been redirected to a file) or there is only one page, the entries are streamed without stopping
+#Otherwise the user can move to the next or previous page, jump to a page number or stop the output
+def display_paged(entries, format_entry, page_size = None):
+    if page_size == None:
+        page_size = PAGE_SIZE
+
+    try:
+        if not sys.stdout.isatty():
+            for page in iter_pages(entries, format_entry, page_size):
+                sys.stdout.write(page)
+            sys.stdout.flush()
+            return
+
+        #A list of the entries is needed so the user can move back to previous pages
+        entries = list(entries)
+        page_count = max(1, (len(entries) + page_size - 1) // page_size)
+        if page_count == 1:
+            sys.stdout.write("".join([format_entry(entry) for entry in entries]))
+            sys.stdout.flush()
+            return
+
+        page_number = 1
+        while True:
+            start = (page_number - 1) * page_size
+            page = "".join([format_entry(entry) for entry in entries[start:start + page_size]])
+            sys.stdout.write(page + f"---------------- Page {page_number} of {page_count} ----------------\n")
+            sys.stdout.flush()
+
+            #Getting the page the user wants to move to
+            #The time spent waiting for the user is not counted by the measurement of the summary
+            with instrumentation.pause():
+                choice = input("Type N for the next page, P for the previous page, a page number to jump to that page or Q to stop : ").strip().upper()
+            print()
+            if choice == "N" or choice == "":
+                if page_number == page_count:
+                    break
+                page_number += 1
+            elif choice == "P":
+                page_number = max(1, page_number - 1)
+            elif choice == "Q":
+                break
+            elif choice.isdigit() and 1 <= int(choice) <= page_count:
+                page_number = int(choice)
+            else:
+                print(f"\nInvalid choice. Please enter N, P, Q or a page number between 1 and {page_count}.\n")
+
+    except KeyboardInterrupt:
+        #Stopping the output cleanly if the user presses Ctrl+C
+        print("\n\nThe output has been stopped.\n")
+    return
+
+
+#Creating a function to view all transactions recorded in the JSON file
+def view_transactions(transactions, page_size = None):
+    #Checking if the JSON file contains an empty dictionary. If the dictionary is empty, there are no financial records.
+    if transactions != {}:
+        #Displaying information about each transaction to the user one page at a time
+        display_paged(iter_view_entries(transactions), format_view_entry, page_size)
+    else:
+        #Displaying a message if no transactions have been recorded
+        print("There are no financial records.\n")
+    return
+
+
+#Creating a function to view the transactions between two dates entered by the user in date order, with their total expenses and income
+#The transactions are found with a DateIndex of the transactions in the TransactionStore of the session
+def view_date_range(store, date_index):
+    if not store.categories:
+        print("There are no financial records.\n")
+        return
+
+    #Getting the first and last dates of the range from the user (either can be left empty to leave that end of the range open)
+    start_text = input("Enter the first date of the range (YYYY-MM-DD, YYYY-MM or YYYY, or leave empty to start from the earliest transaction) : ")
+    end_text = input("Enter the last date of the range (YYYY-MM-DD, YYYY-MM or YYYY, or leave empty to end at the latest transaction) : ")
+    print()
+    try:
+        start, end = parse_date_range(start_text, end_text)
+    except ValueError as error_msg:
+        print(f"\n{error_msg}\n")
+        return
+
+    rows = date_index.get_range(start, end)
+    if not rows:
+        print("There are no transactions in this date range.\n")
+        return
+
+    #Displaying the transactions one page at a time, in the same way as view_transactions
+    display_paged(([expense, {"amount": amount, "type": type_, "date": date_}] for expense, amount, type_, date_ in rows), format_view_entry)
+
+    #Calculating the total income and expenses in the date range in integer amounts (in cents), leaving out amounts which are not a number
+    total_expenses = 0
+    total_income = 0
+    skipped_count = 0
+    for expense, amount, type_, date_ in rows:
+        cents = get_valid_cents(amount)
+        if cents == None:
+            skipped_count += 1
+        elif type_ == "Expense":
+            total_expenses += cents
+        else:
+            total_income += cents
+    print(f"Transactions in this date range : {len(rows)}\nTotal Expenses are : {cents_to_amount(total_expenses)} \nTotal Income is : {cents_to_amount(total_income)}\n")
+    if skipped_count > 0:
+        print(get_skipped_message(skipped_count) + "\n")
+    return
+
+
+#Creating a function to update a transaction in the TransactionStore of the session
+#The change record saved is returned (None is returned if no transaction was updated)
+def update_transaction(store, storage):
+    #Allowing user to input transaction information to be updated if there are previous transaction records (or purposes) in the store
+    if store.categories:
+        #Calling a function to create a new list for comparison purposes
+        upd_transaction_info = create_new_transaction("Enter the amount of money from the transaction to be updated : ", "Enter the purpose of the transaction which should to be updated : ", "Enter the type of transaction which should be updated (Type 'CR' for Income or 'DR' for Expenses): ")
+        purpose = upd_transaction_info[0]
+        sub_dict = upd_transaction_info[1]
+        
+        #Looking up the row of the transaction in the store to verify if the transaction exists
+        row = store.find_row(purpose, sub_dict)
+        if row == None:
+            print("\nThis transaction could not be found.\n")
+
+            #Giving user the option to try again if the transaction details entered does not match any transactions stored in the store
+            choice = get_choice("Do you wish to try again? (Y/N) : ")
+            if choice == "Y":
+                print("\n")
+                return update_transaction(store, storage)
+            return None
+
+        #Entering the updated values into a copy of the transaction, so the store is only changed once all updates have been entered
+        info = store.get_transaction(row)[1]
+        new_info = dict(info)
+        new_purpose = purpose
+
+        while True:
+            #Getting the field to be updated and it's updated value from the user
+            field = input("\nWhich field do you wish to update? (Please type Amount/Purpose/Type/Date) : ").lower()
+            if field == "amount":
+                new_info["amount"] = float_input("Enter updated amount paid/recieved : ")
+                
+            elif field == "purpose":
+                new_purpose = input("Enter updated purpose : ").capitalize()
+            elif field == "type":
+                new_info["type"] = get_transaction_type("Enter updated transaction type (Type 'CR' for Income or 'DR' for Expenses) : ")
+            elif field == "date":
+                new_info["date"] = get_transaction_date()
+            else:
+                print("\nInvalid field. Please try again.\n")
+                continue
+            
+            #Giving user the option to make more changes to the transaction
+            #.upper() is used for the user input for comparison purposes with the if-statement.
+            choice = get_choice("\nDo you wish to make more updates to this transaction? (Y/N) : ")
+            if choice == "Y":
+                continue
+            else:
+                print("\nAll changes to the transaction have been made.\n")
+                break
+
+        #Measuring the change once the updated values have been entered (the time spent typing is not measured)
+        with instrumentation.measure("update") as measurement:
+            measurement.records = 1
+
+            #Updating the row of the transaction (the transaction is only moved to the end of the transactions of the new purpose if the purpose has actually changed)
+            store.update(row, new_purpose, new_info)
+
+            #Calling a function to save the updated transaction
+            change = {"op": "update", "purpose": purpose, "record": info, "new_purpose": new_purpose, "new_record": new_info}
+            storage.save_change(store, change)
+
+        #Returning the change record so the session can update its running totals
+        return change
+                        
+    else:
+        #Displaying message if no transactions have been recorded
+        print("No transactions to be updated are available.\n")
+        return
+
+
+#Creating a function to delete a transaction from the TransactionStore of the session
+#The change record saved is returned (None is returned if no transaction was deleted)
+def delete_transaction(store, storage):
+
+    #Allowing user to input transaction information to be deleted if there are previous transaction records (or purposes)
+    if store.categories:
+        #Calling a function to create a new list for comparison purposes
+        del_transaction_info = create_new_transaction("Enter the amount of money from the transaction to be deleted : ", "Enter the purpose of the transaction which should to be deleted : ", "Enter the type of transaction which should be deleted (Type 'CR' for Income or 'DR' for Expenses): ")
+        purpose = del_transaction_info[0]
+        sub_dict = del_transaction_info[1]
+        
+        #Looking up the row of the transaction in the store to verify if the transaction exists
+        row = store.find_row(purpose, sub_dict)
+        if row == None:
+            print("\nThis transaction could not be found.\n")
+
+            #Giving user the option to try again if the transaction details entered does not match any transactions stored in the store
+            choice = get_choice("Do you wish to try again? (Y/N) : ")
+            if choice == "Y":
+                print("\n")
+                return delete_transaction(store, storage)
+            return None
+
+        #Measuring the change once the transaction to be deleted has been found (the time spent typing is not measured)
+        with instrumentation.measure("delete") as measurement:
+            measurement.records = 1
+
+            #Removing transaction to be deleted from the store
+            info = store.get_transaction(row)[1]
+            store.remove(row)
+
+            #Calling a function to save the removal of the transaction
+            change = {"op": "delete", "purpose": purpose, "record": info}
+            storage.save_change(store, change)
+
+        #Displaying "successfully removed" message to the user once the removal has been saved
+        print("\nThe transaction has been successfully removed.\n")
+
+        #Returning the change record so the session can update its running totals
+        return change
+
+    else:
+        #Displaying message if no transactions have been recorded
+        print("No transactions to be deleted are available.\n")
+        return
+    
+
+#Creating a function to iterate through the entries displayed by transactions_summary
+#Each entry is the purpose, the transaction and its number within the purpose (a transaction of None is used for a purpose with no transactions)
+def iter_summary_entries(transactions):
+    for expense, exp_transactions in transactions.items():
+        if not exp_transactions:
+            yield [expense, None, 0]
+
+        #Setting a counter to number each transaction related to a specific key
+        count = 1
+        for info in exp_transactions:
+            yield [expense, info, count]
+            count += 1
+
+
+#Creating a function to get the text displayed for an entry by transactions_summary
+#The purpose is displayed as a heading before the first transaction related to it
+def format_summary_entry(entry):
+    expense, info, count = entry
+    text = ""
+    if count <= 1:
+        text = f"{expense} :\n\n"
+    if info != None:
+        text += f"{count}. Transaction amount : {info["amount"]}\n   Transaction type : {info["type"]}\n   Transaction date : {info["date"]}\n\n\n"
+    return text
+
+
+#Creating a function to display a summary of all transactions recorded by the Finance Tracker
+#If the RunningAggregates (or a TransactionStore) of the same transactions is provided, the totals are taken from it in integer cents
+def transactions_summary(transactions, store = None, page_size = None):
+    #Measuring the summary (the time spent waiting to move to the next page is not measured)
+    with instrumentation.measure("summary") as measurement:
+        measurement.records = count_transactions(transactions)
+        total_expenses = 0
+        total_income = 0
+        total_usable = 0
+
+        #Displaying information about all transactions recorded one page at a time
+        display_paged(iter_summary_entries(transactions), format_summary_entry, page_size)
+
+        if store != None:
+            #Getting the total income and expenses in integer amounts (in cents) from the store
+            expenses_cents, income_cents = store.totals()
+            total_expenses = expenses_cents / 100
+            total_income = income_cents / 100
+            skipped_count = store.skipped_count
+        else:
+            #Calculating the total income and expenses incurred by the user, leaving out amounts which are not a number
+            skipped_count = 0
+            for expense, exp_transactions in transactions.items():
+                for info in exp_transactions:
+                    cents = get_valid_cents(info["amount"])
+                    if cents == None:
+                        skipped_count += 1
+                    elif info["type"] == "Expense":
+                        total_expenses += cents / 100
+                    else:
+                        total_income += cents / 100
+
+        #Calculating the usable amount of money based on the transactions recorded in the Finance Tracker
+        total_usable = total_income - total_expenses
+        if total_usable < 0:
+            total_usable = 0
+
+        #Displaying the total expenses, income and usable balance to the users
+        print(f"Total Expenses are : {"{:.2f}".format(total_expenses)} \nTotal Income is : {"{:.2f}".format(total_income)} \nUsable Balance : {"{:.2f}".format(total_usable)}")
+        if skipped_count > 0:
+            print(get_skipped_message(skipped_count))
+    return                       
+
+
+#Creating a function to iterate through the entries displayed by display_rollup_report
+#Each entry is a period (month or year) and the rows of the rollup report for that period
+def iter_report_entries(rows):
+    entry = None
+    for row in rows:
+        if entry == None or entry[0] != row[0]:
+            if entry != None:
+                yield entry
+            entry = [row[0], []]
+        entry[1].append(row)
+    if entry != None:
+        yield entry
+
+
+#Creating a function to get the text displayed for a period of the rollup report, with the total expenses and income of the period
+def format_report_entry(entry):
+    period, rows = entry
+    text = f"{period} :\n\n"
+    total_expenses = 0
+    total_income = 0
+    for period, purpose, type_, cents, count in rows:
+        text += f"   {purpose} ({type_}) : {cents_to_amount(cents)} from {count} transaction{'s' if count != 1 else ''}\n"
+        if type_ == "Expense":
+            total_expenses += cents
+        else:
+            total_income += cents
+    return text + f"\n   Total Expenses : {cents_to_amount(total_expenses)}   Total Income : {cents_to_amount(total_income)}\n\n\n"
+
+
+#Creating a function to display the rollup report of each month or year (period "month" or "year") one page at a time
+def display_rollup_report(rollup, period = "month"):
+    with instrumentation.measure("report") as measurement:
+        rows = rollup.get_rows(period)
+        measurement.records = len(rows)
+        if rows:
+            display_paged(iter_report_entries(rows), format_report_entry)
+        else:
+            print("There are no financial records.\n")
+        if rollup.skipped_count > 0:
+            print(get_skipped_message(rollup.skipped_count) + "\n")
+    return
+
+
+#Creating a function to let the user choose between the monthly and yearly rollup report and display it
+def view_rollup_report(rollup):
+    while True:
+        choice = input("Enter M for the monthly report or Y for the yearly report : ").strip().upper()
+        if choice == "M" or choice == "Y":
+            break
+        print("\nInvalid letter entered. Please type M or Y\n")
+    print()
+    display_rollup_report(rollup, "month" if choice == "M" else "year")
+    return
+
+
+#Creating a class definition for an error raised when the values of a transaction (eg: a row of a CSV file) are not valid
+class InvalidTransactionError(ValueError):
+    pass
+
+
+#Transaction types accepted by the import and batch commands (in uppercase) and the type each one is saved as
+IMPORT_TYPES = {"CR": "Income", "DR": "Expense", "CREDIT": "Income", "DEBIT": "Expense", "INCOME": "Income", "EXPENSE": "Expense"}
+
+#Currency symbols, thousands separators and spaces which are removed from amounts by the import and batch commands
+IMPORT_AMOUNT_SYMBOLS = re.compile(r"[$£€,\s]")
+
+
+#Creating a function to validate the values of a transaction given as text and normalize them to a purpose and a transaction
+#(amount to 2 decimal points, CR/DR to Income/Expense and an ISO date). If type_text is None, negative amounts are expenses and other amounts are income
+#An InvalidTransactionError is raised if any of the values are not valid
+def normalize_transaction(purpose, amount_text, type_text, date_text, date_format = "%Y-%m-%d"):
+    if purpose == None or purpose.strip() == "":
+        raise InvalidTransactionError("missing purpose")
+    purpose = purpose.strip().capitalize()
+
+    #Removing currency symbols and thousands separators from the amount
+    try:
+        amount = float(IMPORT_AMOUNT_SYMBOLS.sub("", str(amount_text)))
+    except ValueError:
+        raise InvalidTransactionError(f"invalid amount {amount_text!r}")
+    if not math.isfinite(amount):
+        raise InvalidTransactionError(f"invalid amount {amount_text!r}")
+
+    if type_text == None:
+        type_ = "Expense" if amount < 0 else "Income"
+    elif str(type_text).strip().upper() in IMPORT_TYPES:
+        type_ = IMPORT_TYPES[str(type_text).strip().upper()]
+    else:
+        raise InvalidTransactionError(f"invalid type {type_text!r}")
+
+    try:
+        date_ = datetime.strptime(str(date_text).strip(), date_format).date()
+    except ValueError:
+        raise InvalidTransactionError(f"invalid date {date_text!r}")
+
+    return [purpose, {"amount": "{:.2f}".format(abs(amount)), "type": type_, "date": str(date_)}]
+
+
+#Creating a class definition for the mapping of the columns of a CSV file to the values of a transaction
+#Columns are given by their heading, or by their position (starting from 0) if the CSV file has no heading row.
+#The type column is optional: if the CSV file does not have it, negative amounts are imported as expenses and other amounts as income
+class ImportMapping:
+
+    #Creating a function to act as the constructor of an object
+    def __init__(self, purpose = "purpose", amount = "amount", type_ = "type", date_ = "date", date_format = "%Y-%m-%d"):
+        self.columns = {"purpose": purpose, "amount": amount, "type": type_, "date": date_}
+        self.date_format = date_format
+
+        #Positions of the columns in each row, which are found once the heading row (or the first row) has been read
+        self.positions = {}
+
+
+    #Creating a function to find the position of each column, from the heading row if there is one
+    #A ValueError is raised if a required column cannot be found
+    def find_positions(self, header = None):
+        self.positions = {}
+        for name, column in self.columns.items():
+            if header != None:
+                position = header.index(column) if column in header else None
+            elif column != None and column.isdigit():
+                position = int(column)
+            else:
+                position = None
+            if position == None and name != "type":
+                raise ValueError(f"The {name} column ({column}) cannot be found in the CSV file.")
+            self.positions[name] = position
+
+
+    #Creating a function to get a value from a row, by the position of its column
+    def get_value(self, row, name):
+        position = self.positions[name]
+        if position == None:
+            return None
+        if position >= len(row):
+            raise InvalidTransactionError(f"missing {name}")
+        return row[position].strip()
+
+
+    #Creating a function to validate a row and normalize it to a purpose and a transaction (see normalize_transaction)
+    #An InvalidTransactionError is raised if the row is not valid
+    def normalize(self, row):
+        return normalize_transaction(self.get_value(row, "purpose"), self.get_value(row, "amount"), self.get_value(row, "type"), self.get_value(row, "date"), self.date_format)
+
+
+#Creating a function to read the rows of a CSV file in batches of batch_size rows, along with their line numbers
+#The heading row (if there is one) is used to find the positions of the columns of the mapping
+def iter_csv_batches(file, mapping, delimiter = ",", has_header = True, batch_size = IMPORT_BATCH_SIZE):
+    import csv
+    reader = csv.reader(file, delimiter = delimiter)
+    header = None
+    if has_header:
+        header = [column.strip() for column in next(reader, [])]
+    mapping.find_positions(header)
+
+    batch = []
+    for row in reader:
+        #Skipping blank lines
+        if not row:
+            continue
+        batch.append([reader.line_num, row])
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+#Creating a function to import the transactions in a CSV file (such as a bank statement) with a storage backend
+#Rows are validated and normalized in batches, and the valid rows of each batch are saved with a single write.
+#A list of the number of transactions imported and a list of the rejected rows (as [line number, row, reason] lists) is returned
+def import_csv(storage, transactions, csv_filename, mapping, delimiter = ",", has_header = True, batch_size = IMPORT_BATCH_SIZE):
+    imported = 0
+    rejected = []
+
+    #"utf-8-sig" is used as bank statements are often saved with a byte order mark
+    with open(csv_filename, "r", newline = "", encoding = "utf-8-sig") as file:
+        for batch in iter_csv_batches(file, mapping, delimiter, has_header, batch_size):
+            changes = []
+            for line_num, row in batch:
+                try:
+                    purpose, info = mapping.normalize(row)
+                except InvalidTransactionError as error_msg:
+                    rejected.append([line_num, row, str(error_msg)])
+                    continue
+                changes.append({"op": "add", "purpose": purpose, "record": info})
+
+            if changes:
+                for change in changes:
+                    apply_change(transactions, change)
+                storage.save_changes(transactions, changes)
+                imported += len(changes)
+    return [imported, rejected]
+
+
+#Creating a function to write the rejected rows of an import to a CSV file
+#Each row is written after the file and line it came from (or its position, for a transaction of a JSON file) and the reason it was rejected
+def write_rejected_rows(rejected, filename):
+    import csv
+    with open(filename, "w", newline = "", encoding = "utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["file", "line", "reason", "row"])
+        for csv_filename, line_num, row, reason in rejected:
+            writer.writerow([csv_filename, line_num, reason] + row)
+    return
+
+
+#Creating a function to run the import command for each CSV file given on the command line and report the throughput and rejected rows
+def import_command(args):
+    import csv
+    storage = open_storage(args.file, bulk = True)
+    transactions = storage.load()
+    if transactions == None:
+        return 1
+
+    mapping = ImportMapping(args.purpose_column, args.amount_column, args.type_column, args.date_column, args.date_format)
+    all_rejected = []
+    for csv_filename in args.csv_files:
+        start_time = time.perf_counter()
+        try:
+            imported, rejected = import_csv(storage, transactions, csv_filename, mapping, args.delimiter, not args.no_header, args.batch_size)
+        except FileNotFoundError:
+            print(f"{csv_filename} cannot be found.")
+            storage.flush(transactions)
+            return 1
+        except (ValueError, csv.Error) as error_msg:
+            print(f"{csv_filename} cannot be imported: {error_msg}")
+            storage.flush(transactions)
+            return 1
+        elapsed = time.perf_counter() - start_time
+
+        rows = imported + len(rejected)
+        print(f"Imported {imported} of {rows} rows from {csv_filename} in {elapsed:.2f} seconds ({rows / max(elapsed, 1e-9):.0f} rows per second).")
+        if rejected:
+            print(f"{len(rejected)} rows were rejected:")
+            for line_num, row, reason in rejected[:10]:
+                print(f"  Line {line_num}: {reason}")
+            if len(rejected) > 10:
+                print(f"  ... and {len(rejected) - 10} more")
+        all_rejected.extend([csv_filename] + rejected_row for rejected_row in rejected)
+
+    #Compacting the journal once, after every file has been imported
+    storage.flush(transactions)
+
+    if args.rejected != None and all_rejected:
+        write_rejected_rows(all_rejected, args.rejected)
+        print(f"The rejected rows have been written to {args.rejected}.")
+    return 0
+
+
+#Creating a class definition for running the operations of the batch command mode against one loaded session
+#Every operation is a dictionary with an "op" (add, update, delete, summary, search or export) and the values it needs, either from the
+#command line or from a line of newline-delimited JSON. The changes are applied to the transactions in memory as they are run,
+#and are only saved once all operations have been run (by flush), with a single write
+class BatchRunner:
+
+    #Creating a function to act as the constructor of an object
+    def __init__(self, storage, output = None, workers = None):
+        self.storage = storage
+        self.output = output if output != None else sys.stdout
+        self.session = SessionStore(storage, workers)
+        self.session.refresh()
+        self.changes = []
+        self.failed = 0
+
+        #Search indexes of the transactions in memory, which are only built when a search is run and rebuilt after a change
+        self.rows = None
+        self.search_index = None
+
+
+    #Creating a function to check if the transactions were loaded
+    def is_loaded(self):
+        return self.session.store != None
+
+
+    #Creating a function to run a single operation
+    #An InvalidTransactionError is raised if the operation is not valid or the transaction to update or delete cannot be found
+    def run(self, operation):
+        op = operation.get("op")
+        if op == "add":
+            purpose, info = self.get_transaction(operation)
+            self.apply({"op": "add", "purpose": purpose, "record": info})
+        elif op in ("update", "delete"):
+            purpose, info = self.get_transaction(operation)
+            if self.session.store.find_row(purpose, info) == None:
+                raise InvalidTransactionError("the transaction cannot be found")
+            change = {"op": op, "purpose": purpose, "record": info}
+            if op == "update":
+                #Values which are not given keep the values of the original transaction
+                change["new_purpose"], change["new_record"] = normalize_transaction(operation.get("new_purpose", purpose), operation.get("new_amount", info["amount"]),
+                                                                                    operation.get("new_type", info["type"]), operation.get("new_date", info["date"]))
+            self.apply(change)
+        elif op == "summary":
+            self.summary(operation.get("json", False), operation.get("stats", False))
+        elif op == "search":
+            self.search(operation.get("column", "Transaction"), str(operation.get("text", "")))
+        elif op == "report":
+            self.report(operation.get("period", "month"), operation.get("json", False))
+        elif op == "range":
+            self.date_range(str(operation.get("from") or ""), str(operation.get("to") or ""))
+        elif op == "export":
+            self.export(operation.get("format", "json"), operation.get("output"))
+        else:
+            raise InvalidTransactionError(f"unknown operation {op!r}")
+
+
+    #Creating a function to get the purpose and transaction of an add, update or delete operation
+    @staticmethod
+    def get_transaction(operation):
+        for name in ("purpose", "amount", "type", "date"):
+            if operation.get(name) == None:
+                raise InvalidTransactionError(f"missing {name}")
+        return normalize_transaction(operation["purpose"], operation["amount"], operation["type"], operation["date"])
+
+
+    #Creating a function to apply a change record to the transactions in memory (it is saved by flush)
+    def apply(self, change):
+        self.session.store.apply_change(change)
+        self.session.aggregates.apply_change(change)
+        if self.session.date_index != None:
+            self.session.date_index.apply_change(change)
+        self.session.update_rollup(change, False)
+        self.changes.append(change)
+        self.rows = None
+        self.search_index = None
+
+
+    #Creating a function to display the summary of the transactions, or only the totals as JSON
+    #With stats, the spending statistics of the analytics module are displayed (or printed as JSON) instead of the totals
+    def summary(self, as_json = False, stats = False):
+        if stats:
+            self.statistics(as_json)
+        elif as_json:
+            expenses_cents, income_cents = self.session.aggregates.totals()
+            totals = {"expenses": cents_to_amount(expenses_cents), "income": cents_to_amount(income_cents), "balance": cents_to_amount(max(income_cents - expenses_cents, 0))}
+            print(json.dumps(totals), file = self.output)
+        else:
+            transactions_summary(self.session.get_transactions(), self.session.aggregates)
+
+
+    #Creating a function to display the spending statistics of the transactions (per purpose, per month and the largest outliers), or print them as JSON
+    def statistics(self, as_json = False):
+        analytics = load_analytics()
+        store = self.session.get_columns()
+        with instrumentation.measure("statistics") as measurement:
+            measurement.records = len(store)
+            results = analytics.analyze(store)
+        if as_json:
+            print(json.dumps(analytics.get_json_results(results)), file = self.output)
+        else:
+            print(analytics.format_results(results), file = self.output)
+
+
+    #Creating a function to print the transactions matching a search (using the same rules as the GUI) as newline-delimited JSON
+    def search(self, column_name, text):
+        if column_name not in COLUMNS:
+            raise InvalidTransactionError(f"unknown column {column_name!r}")
+        if self.search_index == None:
+            self.rows = get_rows(self.session.get_transactions())
+            self.search_index = SearchIndex(self.rows)
+        for row_id in self.search_index.search(column_name, text.capitalize()):
+            expense, amount, type_, date_ = self.rows[row_id]
+            print(json.dumps({"purpose": expense, "amount": amount, "type": type_, "date": date_}), file = self.output)
+
+
+    #Creating a function to display the monthly or yearly rollup report, or print its rows as newline-delimited JSON
+    def report(self, period = "month", as_json = False):
+        if period not in ("month", "year"):
+            raise InvalidTransactionError(f"unknown report period {period!r}")
+        rollup = self.session.get_rollup()
+        if as_json:
+            for period_key, purpose, type_, cents, count in rollup.get_rows(period):
+                print(json.dumps({period: period_key, "purpose": purpose, "type": type_, "amount": cents_to_amount(cents), "count": count}), file = self.output)
+        else:
+            display_rollup_report(rollup, period)
+
+
+    #Creating a function to print the transactions between two dates (YYYY-MM-DD, YYYY-MM or YYYY, inclusive) in date order as newline-delimited JSON
+    def date_range(self, start_text, end_text):
+        try:
+            start, end = parse_date_range(start_text, end_text)
+        except ValueError as error_msg:
+            raise InvalidTransactionError(str(error_msg))
+        for expense, amount, type_, date_ in self.session.get_date_index().get_range(start, end):
+            print(json.dumps({"purpose": expense, "amount": amount, "type": type_, "date": date_}), file = self.output)
+
+
+    #Creating a function to export the transactions in memory as JSON (in the same layout as the JSON file), newline-delimited JSON or CSV
+    #The transactions are written to the output file if one is given, otherwise they are printed
+    def export(self, export_format = "json", filename = None):
+        transactions = self.session.get_transactions()
+        if export_format == "json" and filename != None:
+            add_to_json(transactions, filename)
+            return
+        if export_format not in ("json", "ndjson", "csv"):
+            raise InvalidTransactionError(f"unknown export format {export_format!r}")
+
+        file = open(filename, "w", newline = "", encoding = "utf-8") if filename != None else self.output
+        try:
+            if export_format == "json":
+                json.dump(transactions, file, indent = 2)
+                file.write("\n")
+            elif export_format == "ndjson":
+                for expense, info in iter_view_entries(transactions):
+                    file.write(json.dumps({"purpose": expense, "amount": info["amount"], "type": info["type"], "date": info["date"]}) + "\n")
+            else:
+                #The headings are the default columns of the import command, so an export can be imported again
+                import csv
+                writer = csv.writer(file)
+                writer.writerow(["purpose", "amount", "type", "date"])
+                for expense, info in iter_view_entries(transactions):
+                    writer.writerow([expense, info["amount"], info["type"], info["date"]])
+        finally:
+            if filename != None:
+                file.close()
+
+
+    #Creating a function to save all changes made by the operations with a single write
+    def flush(self):
+        if self.changes:
+            self.storage.save_changes(self.session.store, self.changes)
+            self.storage.flush(self.session.store)
+
+            #Saving the rollup report with the cells changed by the operations
+            self.session.save_rollup()
+        count = len(self.changes)
+        self.changes = []
+        return count
+
+
+#Creating a function to read operations from newline-delimited JSON (one JSON object per line)
+#op is used as the "op" of any operation which does not have one. Lines which are not valid are yielded as [line number, None, reason]
+def iter_ndjson_operations(file, op = None):
+    for line_num, line in enumerate(file, 1):
+        if line.strip() == "":
+            continue
+        try:
+            operation = json.loads(line)
+        except json.JSONDecodeError as error_msg:
+            yield [line_num, None, f"invalid JSON ({error_msg})"]
+            continue
+        if not isinstance(operation, dict):
+            yield [line_num, None, "each line must be a JSON object"]
+            continue
+        if op != None:
+            operation.setdefault("op", op)
+        yield [line_num, operation, None]
+
+
+#Creating a function to run the batch command mode for a command given on the command line
+#Operations are taken from the command line arguments, or read as newline-delimited JSON from stdin for the batch command
+#(and for add, update and delete when no transaction is given on the command line)
+def batch_command(args):
+    runner = BatchRunner(open_storage(args.file, bulk = True), workers = args.workers)
+    if not runner.is_loaded():
+        return 1
+
+    if args.command == "batch" or (args.command in ("add", "update", "delete") and args.purpose == None):
+        op = None if args.command == "batch" else args.command
+        operations = iter_ndjson_operations(sys.stdin, op)
+    else:
+        #Getting the values of the operation from the command line arguments which were given
+        operation = {"op": args.command}
+        for name, value in vars(args).items():
+            if name not in ("command", "file", "profile", "workers") and value != None:
+                operation[name] = value
+        operations = [[1, operation, None]]
+
+    count = 0
+    for line_num, operation, error_msg in operations:
+        count += 1
+        if operation != None:
+            try:
+                runner.run(operation)
+            except InvalidTransactionError as error:
+                error_msg = str(error)
+        if error_msg != None:
+            runner.failed += 1
+            print(f"Operation {line_num} failed: {error_msg}", file = sys.stderr)
+
+    #Saving every change once, after all operations have been run
+    saved = runner.flush()
+    if args.command == "batch" or count > 1:
+        print(f"Ran {count} operations ({saved} changes saved, {runner.failed} failed).", file = sys.stderr)
+    if runner.failed:
+        return 1
+    return 0
+
+
+#Creating a function to run the range command, printing the transactions between two dates in date order as newline-delimited JSON
+#Only the transactions the storage backend needs for the date range are loaded (eg: the shards which overlap the range, or the transactions in the range from the snapshot)
+def range_command(args):
+    try:
+        start, end = parse_date_range(args.start or "", args.end or "")
+    except ValueError as error_msg:
+        print(error_msg, file = sys.stderr)
+        return 1
+
+    transactions = open_storage(args.file).load_range(start, end)
+    if transactions == None:
+        return 1
+    for expense, amount, type_, date_ in DateIndex(transactions).get_range(start, end):
+        print(json.dumps({"purpose": expense, "amount": amount, "type": type_, "date": date_}))
+    return 0
+
+
+#Names of the columns of a transaction row (used by the search indexes, the GUI and the search command), in the same order as the values in each row
+COLUMNS = ("Transaction", "Amount", "Type", "Date")
+
+
+#Creating a function to get the rows (tuples of the values in each column) of all transactions in a transactions dictionary
+def get_rows(transactions):
+    rows = []
+    for expense, exp_transactions in transactions.items():
+        for info in exp_transactions:
+            rows.append((expense, info["amount"], info["type"], info["date"]))
+    return rows
+
+
+#Creating a class definition for the search indexes used by the GUI
+#Rows are referred to by their row id (their position in the list of all rows). For each column the index keeps a dictionary of
+#each distinct value to the set of row ids with that value, so a search only goes through the distinct values and the matching rows:
+# - Transaction : 3-letter n-grams of every purpose, used to find the purposes containing a search term
+# - Amount : the exact amount strings, plus a sorted list of the distinct amounts in cents for range searches (eg: "100-500")
+# - Type : the distinct transaction types
+# - Date : a sorted list of the distinct dates, used for prefix searches such as "2024-05" and date ranges, and the set of dates which are not in the ISO format
+class SearchIndex:
+
+    #Length of the n-grams used for the purpose index
+    NGRAM_SIZE = 3
+
+    #Pattern of an amount range search (eg: "100-500" or "12.50 - 99")
+    AMOUNT_RANGE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*-\s*(-?\d+(?:\.\d+)?)\s*$")
+
+    #Pattern of a date search which can only match the beginning of an ISO date, as it starts with the 4 digits of a year
+    DATE_PREFIX = re.compile(r"^\d{4}(-|$)")
+
+    #Pattern of an ISO date (YYYY-MM-DD). Dates which are not in this format (eg: "31/05/2024" in a JSON file edited by hand) may contain a year anywhere
+    ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+    #Creating a function to act as the constructor of an object
+    def __init__(self, rows = ()):
+        self.purpose_rows = {}
+        self.purpose_ngrams = {}
+        self.amount_rows = {}
+        self.amount_strings = {}
+        self.amount_cents = []
+        self.type_rows = {}
+        self.date_rows = {}
+        self.dates = []
+        self.other_dates = set()
+
+        #Adding every row to the dictionaries, and sorting the lists of distinct values once at the end
+        for row_id, row in enumerate(rows):
+            if row != None:
+                self.add(row_id, row, False)
+        self.amount_cents.sort()
+        self.dates.sort()
+
+
+    #Creating a function to get the n-grams of a string
+    @classmethod
+    def get_ngrams(cls, text):
+        return {text[position:position + cls.NGRAM_SIZE] for position in range(len(text) - cls.NGRAM_SIZE + 1)}
+
+
+    #Creating a function to add a row id to the set of row ids of a value. True is returned if the value is new
+    @staticmethod
+    def add_to_set(value_rows, value, row_id):
+        if value in value_rows:
+            value_rows[value].add(row_id)
+            return False
+        value_rows[value] = {row_id}
+        return True
+
+
+    #Creating a function to remove a row id from the set of row ids of a value. True is returned if no rows have the value anymore
+    @staticmethod
+    def remove_from_set(value_rows, value, row_id):
+        rows = value_rows[value]
+        rows.discard(row_id)
+        if not rows:
+            del value_rows[value]
+            return True
+        return False
+
+
+    #Creating a function to add a row to the index
+    #"keep_sorted" is False while the index is first built, as the lists of distinct values are sorted once at the end instead
+    def add(self, row_id, row, keep_sorted = True):
+        expense, amount, type_, date_ = row
+
+        if self.add_to_set(self.purpose_rows, expense, row_id):
+            for ngram in self.get_ngrams(expense):
+                self.add_to_set(self.purpose_ngrams, ngram, expense)
+
+        #Several amount strings (eg: "5" and "5.00") can have the same value in cents
+        #Amounts which are not a number (see get_valid_cents) can only be found by searching for the exact amount
+        if self.add_to_set(self.amount_rows, amount, row_id):
+            cents = get_valid_cents(amount)
+            if cents != None and self.add_to_set(self.amount_strings, cents, amount):
+                if keep_sorted:
+                    insort(self.amount_cents, cents)
+                else:
+                    self.amount_cents.append(cents)
+
+        self.add_to_set(self.type_rows, type_, row_id)
+
+        if self.add_to_set(self.date_rows, date_, row_id):
+            if keep_sorted:
+                insort(self.dates, date_)
+            else:
+                self.dates.append(date_)
+            if not self.ISO_DATE.match(date_):
+                self.other_dates.add(date_)
+
+
+    #Creating a function to remove a row from the index
+    def remove(self, row_id, row):
+        expense, amount, type_, date_ = row
+
+        if self.remove_from_set(self.purpose_rows, expense, row_id):
+            for ngram in self.get_ngrams(expense):
+                self.remove_from_set(self.purpose_ngrams, ngram, expense)
+
+        if self.remove_from_set(self.amount_rows, amount, row_id):
+            cents = get_valid_cents(amount)
+            if cents != None and self.remove_from_set(self.amount_strings, cents, amount):
+                del self.amount_cents[bisect_left(self.amount_cents, cents)]
+
+        self.remove_from_set(self.type_rows, type_, row_id)
+
+        if self.remove_from_set(self.date_rows, date_, row_id):
+            del self.dates[bisect_left(self.dates, date_)]
+            self.other_dates.discard(date_)
+
+
+    #Creating a function to get the amount strings with a value in cents between low and high (inclusive)
+    def get_amounts(self, low, high):
+        start = bisect_left(self.amount_cents, low)
+        amounts = []
+        for cents in self.amount_cents[start:]:
+            if cents > high:
+                break
+            amounts.extend(self.amount_strings[cents])
+        return amounts
+
+
+    #Creating a function to get the purposes which contain a search term
+    def find_purposes(self, text):
+        if len(text) < self.NGRAM_SIZE:
+            #Search terms shorter than an n-gram are compared with every distinct purpose
+            return [expense for expense in self.purpose_rows if text in expense]
+
+        #Only the purposes which contain every n-gram of the search term can contain the search term
+        candidates = None
+        for ngram in self.get_ngrams(text):
+            purposes = self.purpose_ngrams.get(ngram)
+            if not purposes:
+                return []
+            if candidates == None:
+                candidates = set(purposes)
+            else:
+                candidates &= purposes
+        return [expense for expense in candidates if text in expense]
+
+
+    #Creating a function to get the dates which contain a search term
+    def find_dates(self, text):
+        if self.DATE_PREFIX.match(text):
+            #A search term starting with a year can only match the beginning of an ISO date, so the sorted dates are searched with bisect
+            start = bisect_left(self.dates, text)
+            dates = []
+            for date_ in self.dates[start:]:
+                if not date_.startswith(text):
+                    break
+                dates.append(date_)
+
+            #Dates which are not in the ISO format (eg: "31/05/2024") can contain the year anywhere, so they are also searched for the term
+            dates.extend(date_ for date_ in self.other_dates if text in date_ and not date_.startswith(text))
+            return dates
+        return [date_ for date_ in self.date_rows if text in date_]
+
+
+    #Creating a function to get the row ids of the rows between two dates (inclusive) in date order, with rows of the same date in ascending order of row id
+    #The first and last distinct dates in the range are found in the sorted list of dates with bisect, so only the matching rows are visited
+    #None can be used for either date to leave that end of the range open
+    def date_range(self, start = None, end = None):
+        first = 0 if start == None else bisect_left(self.dates, start)
+        last = len(self.dates) if end == None else bisect_right(self.dates, end)
+        row_ids = []
+        for date_ in self.dates[first:last]:
+            row_ids.extend(sorted(self.date_rows[date_]))
+        return row_ids
+
+
+    #Creating a function to get the sets of row ids of the values of a column which match a search term
+    #The same rules are used as a search through every row: Transaction, Type and Date match if they contain the search term,
+    #and Amount matches the exact amount or a range of amounts (eg: "100-500")
+    #The sets are the ones kept by the index, so they have to be copied if the index can be changed before they are used
+    def get_row_sets(self, column_name, text):
+        if column_name == "Transaction":
+            value_rows = self.purpose_rows
+            values = self.find_purposes(text)
+        elif column_name == "Amount":
+            value_rows = self.amount_rows
+            amount_range = self.AMOUNT_RANGE.match(text)
+            if text in self.amount_rows:
+                values = [text]
+            elif amount_range:
+                values = self.get_amounts(amount_to_cents(amount_range.group(1)), amount_to_cents(amount_range.group(2)))
+            else:
+                values = []
+        elif column_name == "Type":
+            value_rows = self.type_rows
+            values = [type_ for type_ in self.type_rows if text in type_.capitalize()]
+        elif column_name == "Date":
+            value_rows = self.date_rows
+            values = self.find_dates(text)
+        else:
+            return []
+        return [value_rows[value] for value in values]
+
+
+    #Creating a function to combine sets of row ids into a list of row ids in ascending order
+    #"is_cancelled" can be a function which returns True once the search is no longer needed, in which case None is returned
+    @staticmethod
+    def merge_row_sets(row_sets, is_cancelled = None):
+        row_ids = set()
+        for rows in row_sets:
+            if is_cancelled != None and is_cancelled():
+                return None
+            row_ids.update(rows)
+        return sorted(row_ids)
+
+
+    #Creating a function to search a column for a search term, returning the matching row ids in ascending order
+    #"is_cancelled" can be a function which returns True once the search is no longer needed, in which case None is returned
+    def search(self, column_name, text, is_cancelled = None):
+        return self.merge_row_sets(self.get_row_sets(column_name, text), is_cancelled)
+
+
+#Creating a function to load one of the other Finance Tracker files in the folder of this file as a module, the first time it is needed
+#(the file names contain spaces, so they cannot be imported with a normal import statement)
+def load_module(module_name, file_name):
+    if module_name not in sys.modules:
+        import importlib.util
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name)
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[module_name]
+
+
+#Creating a function to load the GUI module ("Personal Finance Tracker GUI.py") the first time it is needed
+#The GUI is kept in its own file so that tkinter is only imported once the user opens the GUI
+def load_gui():
+    return load_module("finance_tracker_gui", "Personal Finance Tracker GUI.py")
+
+
+#Creating a function to load the optional analytics module ("Personal Finance Tracker Analytics.py"), which calculates the spending statistics
+#shown by the summary command with --stats. It uses NumPy if it is installed, so it is only loaded when the statistics are needed
+def load_analytics():
+    return load_module("finance_tracker_analytics", "Personal Finance Tracker Analytics.py")
+
+
+#Creating a function to open a GUI that allow user to navigate through the transactions in the Finance Tracker and search for specific transactions
+def search_and_sort_transactions(filename):
+    load_gui().search_and_sort_transactions(filename)
+    return
+
+
+#Creating a function to refresh the session store and let the user know if the transactions were changed outside of this session
+def refresh_session(session):
+    if session.refresh():
+        if session.reload_count > 1:
+            print("\nThe transaction records were changed on disk and have been reloaded.\n")
+
+        #Letting the user know about transactions whose amount is not a number (eg: in a JSON file edited by hand), which are left out of the totals
+        if session.aggregates != None and session.aggregates.skipped_count > 0:
+            print("\n" + get_skipped_message(session.aggregates.skipped_count) + "\n")
+    return session.store
+
+
+#Creating a function to display the main menu to the user
+def main_menu():
+    filename = "transactions.json"
+
+    #Opening the storage backend (the JSON file unless the SQLite backend has been chosen)
+    storage = open_storage(filename)
+
+    #Creating a session store so the transactions are loaded once and only reloaded when they are changed on disk
+    session = SessionStore(storage)
+
+    #Creating an infinite loop with functions the Finance Tracker can perform
+    while True:
+        store = refresh_session(session)
+        if store != None:
+            print("\n-----------------------------------------------------------------------------")
+            print("\n Welcome to Your Personal Finance Tracker!!\n")
+            print("1. Add a Transaction")
+            print("2. View All Transactions")
+            print("3. Update a Transaction")
+            print("4. Delete a Transaction")
+            print("5. Display Transactions Summary")
+            print("6. Search for Transactions")
+            print("7. View Transactions in a Date Range")
+            print("8. View Monthly and Yearly Reports")
+            print("9. View Performance Stats")
+            print("10. Exit Finance Tracker")
+
+            #Gettng user input for the function user wants to perform
+            choice = input("\nEnter your choice : ")
+            print("\n")
+
+            #Checking the JSON file again, in case it was changed while the menu was waiting for the user's choice
+            store = refresh_session(session)
+            if store == None:
+                break
+
+            #Verifying if user input is valid and performing the respective function if the input is valid
+            if choice == "1":
+                session.record_change(add_transaction(store, storage))
+            elif choice == "2":
+                view_transactions(session.get_transactions())
+            elif choice == "3":
+                session.record_change(update_transaction(store, storage))
+            elif choice == "4":
+                session.record_change(delete_transaction(store, storage))
+            elif choice == "5":
+                transactions_summary(session.get_transactions(), session.aggregates)
+            elif choice == "6":
+                search_and_sort_transactions(filename)
+            elif choice == "7":
+                view_date_range(store, session.get_date_index())
+            elif choice == "8":
+                view_rollup_report(session.get_rollup())
+            elif choice == "9":
+                view_performance_stats()
+            elif choice == "10":
+                print("\nExiting Finance Tracker.\n")
+                break
+            else:
+                print("\nInvalid choice. Please try again.\n")
+
+        else:
+            break
+        
+    return
+
+
+
+#Creating a function to format the stats of the operations measured in a session as a table
+def format_stats(operations):
+    lines = [f"{'Operation':<12}{'Calls':>7}{'Total ms':>11}{'Mean ms':>10}{'Max ms':>10}{'Records':>10}{'Read KB':>10}{'Written KB':>12}{'Peak KB':>10}"]
+    for operation, stats in operations.items():
+        total_ms = stats["total_s"] * 1000
+        lines.append(f"{operation:<12}{stats['calls']:>7}{total_ms:>11.2f}{total_ms / stats['calls']:>10.2f}{stats['max_s'] * 1000:>10.2f}{stats['records']:>10}"
+                     f"{stats['bytes_read'] / 1024:>10.1f}{stats['bytes_written'] / 1024:>12.1f}{stats['peak_memory'] / 1024:>10.1f}")
+    return "\n".join(lines) + "\n"
+
+
+#Creating a function to display the performance stats of this session and of the last session saved in the stats file
+def view_performance_stats(filename = None):
+    if filename == None:
+        filename = instrumentation.stats_filename
+
+    #Displaying the stats of this session if instrumentation is enabled
+    if instrumentation.enabled:
+        session = instrumentation.get_session()
+        print(f"Performance stats of this session (started {session['started']}) :\n")
+        if session["operations"] != {}:
+            print(format_stats(session["operations"]))
+        else:
+            print("No operations have been measured yet.\n")
+    else:
+        print("Performance stats are not being recorded. Set the FINANCE_TRACKER_PROFILE environment variable to 1 or start the Finance Tracker with --profile to record them.\n")
+
+    #Reading the last session saved in the stats file (a partially written final line is skipped)
+    last_session = None
+    session_count = 0
+    try:
+        with open(filename, "r") as file:
+            for line in file:
+                try:
+                    last_session = json.loads(line)
+                    session_count += 1
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        return
+
+    if last_session != None:
+        print(f"Performance stats of the last saved session ({last_session['started']} to {last_session['finished']}, {session_count} sessions saved in {filename}) :\n")
+        print(format_stats(last_session["operations"]))
+    return
+
+
+#Creating a function to run a command given on the command line (eg: python "Personal Finance Tracker.py" import statement.csv)
+def run_command(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog = "Personal Finance Tracker", description = "Run a Personal Finance Tracker command without the interactive menu.")
+    parser.add_argument("--file", default = "transactions.json", help = "JSON file of the transaction records (default: transactions.json)")
+    parser.add_argument("--profile", action = "store_true", help = f"record performance stats and add them to {STATS_FILENAME} on exit")
+    parser.add_argument("--workers", type = int, help = "number of worker processes used to add up the totals of large ledgers (default: FINANCE_TRACKER_WORKERS or 1, which adds them up in a single process, and 0 for one per CPU)")
+    subparsers = parser.add_subparsers(dest = "command", required = True)
+
+    import_parser = subparsers.add_parser("import", help = "import transactions from CSV files such as bank statements")
+    import_parser.add_argument("csv_files", nargs = "+", help = "CSV files to import")
+    import_parser.add_argument("--purpose-column", default = "purpose", help = "heading (or position with --no-header) of the purpose column")
+    import_parser.add_argument("--amount-column", default = "amount", help = "heading (or position with --no-header) of the amount column")
+    import_parser.add_argument("--type-column", default = "type", help = "heading (or position with --no-header) of the CR/DR column. If it is missing, negative amounts are expenses")
+    import_parser.add_argument("--date-column", default = "date", help = "heading (or position with --no-header) of the date column")
+    import_parser.add_argument("--date-format", default = "%Y-%m-%d", help = "strptime format of the dates (default: %%Y-%%m-%%d)")
+    import_parser.add_argument("--delimiter", default = ",", help = "delimiter of the CSV files (default: ,)")
+    import_parser.add_argument("--no-header", action = "store_true", help = "the CSV files do not have a heading row")
+    import_parser.add_argument("--batch-size", type = int, default = IMPORT_BATCH_SIZE, help = f"number of rows saved with each write (default: {IMPORT_BATCH_SIZE})")
+    import_parser.add_argument("--rejected", help = "CSV file to write the rejected rows to")
+
+    #Adding the batch command mode, which runs operations against the transactions loaded once and saves the changes with a single write
+    for op in ("add", "update", "delete"):
+        op_parser = subparsers.add_parser(op, help = f"{op} a transaction (the transactions are read as newline-delimited JSON from stdin if --purpose is not given)")
+        op_parser.add_argument("--purpose", help = "purpose of the transaction")
+        op_parser.add_argument("--amount", help = "amount of the transaction")
+        op_parser.add_argument("--type", help = "type of the transaction (CR or DR)")
+        op_parser.add_argument("--date", help = "date of the transaction (YYYY-MM-DD)")
+        if op == "update":
+            op_parser.add_argument("--new-purpose", help = "new purpose of the transaction")
+            op_parser.add_argument("--new-amount", help = "new amount of the transaction")
+            op_parser.add_argument("--new-type", help = "new type of the transaction (CR or DR)")
+            op_parser.add_argument("--new-date", help = "new date of the transaction (YYYY-MM-DD)")
+
+    summary_parser = subparsers.add_parser("summary", help = "display the summary of the transactions")
+    summary_parser.add_argument("--json", action = "store_true", default = None, help = "only print the totals (or the statistics) as JSON")
+    summary_parser.add_argument("--stats", action = "store_true", default = None, help = "display the mean, median and percentiles of each purpose, the month-over-month change, "
+                                "the rolling 30 and 90 day averages of the daily expenses and the largest outliers (NumPy is used if it is installed)")
+
+    search_parser = subparsers.add_parser("search", help = "print the transactions matching a search as newline-delimited JSON")
+    search_parser.add_argument("column", choices = COLUMNS, help = "column to search")
+    search_parser.add_argument("text", help = "search term (the same as the searchbar of the GUI)")
+
+    report_parser = subparsers.add_parser("report", help = "display the total and number of transactions of each purpose and type for every month or year")
+    report_parser.add_argument("--period", choices = ("month", "year"), default = "month", help = "period of the report (default: month)")
+    report_parser.add_argument("--json", action = "store_true", default = None, help = "print the rows of the report as newline-delimited JSON")
+
+    range_parser = subparsers.add_parser("range", help = "print the transactions between two dates in date order as newline-delimited JSON")
+    range_parser.add_argument("--from", dest = "start", help = "first date of the range (YYYY-MM-DD, YYYY-MM or YYYY). The range starts at the earliest transaction if it is not given")
+    range_parser.add_argument("--to", dest = "end", help = "last date of the range (YYYY-MM-DD, YYYY-MM or YYYY). The range ends at the latest transaction if it is not given")
+
+    export_parser = subparsers.add_parser("export", help = "export the transactions")
+    export_parser.add_argument("--format", choices = ("json", "ndjson", "csv"), default = "json", help = "format of the export (default: json)")
+    export_parser.add_argument("--output", help = "file to write the export to (default: stdout)")
+
+    subparsers.add_parser("batch", help = "run operations read as newline-delimited JSON from stdin, eg: {\"op\": \"add\", \"purpose\": \"Rent\", \"amount\": \"500\", \"type\": \"DR\", \"date\": \"2024-05-01\"}")
+
+    args = parser.parse_args(argv)
+    if args.profile:
+        instrumentation.enable()
+    if args.command == "import":
+        return import_command(args)
+    if args.command == "range":
+        return range_command(args)
+    return batch_command(args)
+
+
+#---------------------------------------------------------------------------------------------------------------------------------------------------------------------------  Main Code
+
+#Displaying main menu to user as the program executes, or running a command if one is given on the command line
+#The menu can also be started with --profile to record performance stats
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--profile"]:
+        instrumentation.enable()
+    elif len(sys.argv) > 1:
+        sys.exit(run_command(sys.argv[1:]))
+    main_menu()
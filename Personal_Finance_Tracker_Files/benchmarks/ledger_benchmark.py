@@ -0,0 +1,331 @@
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+#Folder of the main Finance Tracker file, which is in the folder above this one
+TRACKER_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#Categories used first by the generator (with the type of most of their transactions), after which numbered expense categories are added
+BASE_CATEGORIES = [("Salary", "Income"), ("Freelance work", "Income"), ("Interest", "Income"), ("Groceries", "Expense"), ("Rent", "Expense"),
+                   ("Utilities", "Expense"), ("Online purchase", "Expense"), ("Transport", "Expense"), ("Dining out", "Expense"),
+                   ("Insurance", "Expense"), ("Entertainment", "Expense"), ("Healthcare", "Expense")]
+
+#Every operation the benchmark can time
+OPERATIONS = ("read_bulk", "write_snapshot", "read_snapshot", "add_to_json", "add", "update", "delete", "view", "summary", "aggregate", "statistics", "gui_index", "gui_search", "gui_sort", "gui_delta")
+
+#Searches run by the GUI search benchmark, as [column, search term] lists (the same as typing in the searchbar)
+GUI_SEARCHES = [["Transaction", "Gro"], ["Transaction", "Category 1"], ["Amount", "100-500"], ["Type", "Income"], ["Date", "2023-0"], ["Date", "-12-"]]
+
+
+#Creating a function to import the main Finance Tracker file, which registers itself as the "finance_tracker" module
+#(its file name contains spaces, so it is imported with importlib rather than an import statement)
+def load_tracker():
+    if "finance_tracker" not in sys.modules:
+        if TRACKER_FOLDER not in sys.path:
+            sys.path.append(TRACKER_FOLDER)
+        importlib.import_module("Personal Finance Tracker")
+    return sys.modules["finance_tracker"]
+
+
+#Creating a function to get the names and types of the categories of a generated ledger
+def get_categories(count):
+    categories = BASE_CATEGORIES[:count]
+    for number in range(len(categories) + 1, count + 1):
+        categories.append((f"Category {number}", "Expense"))
+    return categories
+
+
+#Creating a function to generate a ledger with a seeded random generator and write it to a JSON file in the same layout as add_to_json
+#The number of transactions of each category follows a Zipf distribution (the weight of the nth most common category is 1 / n ** skew),
+#amounts follow a log-normal distribution for each category and dates are spread over "years" years. The records are written as they
+#are generated, so ledgers which are too large to hold in memory can be written
+def generate_ledger(filename, records, categories = 50, skew = 1.1, seed = 0, start_year = 2020, years = 5):
+    rng = random.Random(seed)
+    category_types = get_categories(categories)
+
+    #Choosing the most common categories at random, and counting the transactions of each category in chunks to limit memory use
+    ranks = list(range(len(category_types)))
+    rng.shuffle(ranks)
+    weights = [1 / (rank + 1) ** skew for rank in ranks]
+    counts = [0] * len(category_types)
+    remaining = records
+    while remaining > 0:
+        chunk = min(remaining, 1000000)
+        for position in rng.choices(range(len(category_types)), weights, k = chunk):
+            counts[position] += 1
+        remaining -= chunk
+
+    first_day = date(start_year, 1, 1).toordinal()
+    last_day = date(start_year + years - 1, 12, 31).toordinal()
+    with open(filename, "w") as file:
+        file.write("{\n")
+        written = [position for position, count in enumerate(counts) if count > 0]
+        for key_position, position in enumerate(written):
+            name, type_ = category_types[position]
+            typical_amount = rng.uniform(2, 8)
+            file.write(f'  "{name}": [\n    ')
+            for number in range(counts[position]):
+                #About 1 in 20 transactions of a category is of the other type (eg: a refund)
+                record_type = type_ if rng.random() >= 0.05 else ("Income" if type_ == "Expense" else "Expense")
+                amount = "{:.2f}".format(rng.lognormvariate(typical_amount, 0.6))
+                record_date = date.fromordinal(rng.randint(first_day, last_day)).isoformat()
+                file.write(json.dumps({"amount": amount, "type": record_type, "date": record_date}))
+                file.write(",\n    " if number != counts[position] - 1 else "\n  ")
+            file.write("]\n" if key_position == len(written) - 1 else "],\n")
+        file.write("}")
+    return
+
+
+#Creating a function to time a function, returning the list of elapsed times of every run in seconds
+#"setup" is called before every run (without being timed) and its result is passed to the function
+def time_runs(function, repeat, setup = None):
+    times = []
+    for run in range(repeat):
+        argument = setup() if setup != None else None
+        start = time.perf_counter()
+        if setup != None:
+            function(argument)
+        else:
+            function()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+#Creating a function to make the interactive functions of the tracker read their input from a list of answers rather than the keyboard
+@contextlib.contextmanager
+def scripted_input(tracker, answers):
+    answers = iter(answers)
+    tracker.input = lambda msg = "": next(answers)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        del tracker.input
+
+
+#Creating a function to get the answers to the prompts of create_new_transaction for a transaction
+def get_transaction_answers(purpose, info):
+    year, month, day = info["date"].split("-")
+    return [info["amount"], purpose, "CR" if info["type"] == "Income" else "DR", str(int(day)), str(int(month)), year]
+
+
+#Creating a function to pick transactions at random from a transactions dictionary, as [purpose, copy of the transaction] lists
+def sample_transactions(transactions, count, rng):
+    purposes = [expense for expense in transactions for info in transactions[expense][:1]]
+    samples = []
+    for number in range(count):
+        expense = rng.choice(purposes)
+        samples.append([expense, dict(rng.choice(transactions[expense]))])
+    return samples
+
+
+#Creating a function to create a FinanceTrackerGUI without a Tk window, with only the state used by its model-side sort functions
+def make_headless_gui(gui, tracker, filename, transactions, rows):
+    view = gui.FinanceTrackerGUI.__new__(gui.FinanceTrackerGUI)
+    view.all_rows = rows
+    view.removed_count = 0
+    view.live_ids = None
+    view.columns = tracker.TransactionStore.from_transactions(transactions)
+    view.storage = tracker.JSONBackend(filename)
+    view.loading = False
+    view.filter_ids = None
+    view.sort_column = None
+    view.sort_descending = False
+    view.clear_sort_cache()
+    return view
+
+
+#Creating a function to run the benchmarks of every chosen operation for a ledger of one size
+#A list of result dictionaries is returned
+def benchmark_size(tracker, folder, records, args, operations):
+    filename = os.path.join(folder, f"ledger_{records}.json")
+    start = time.perf_counter()
+    generate_ledger(filename, records, args.categories, args.skew, args.seed)
+    print(f"Generated {records} records in {time.perf_counter() - start:.2f} seconds", file = sys.stderr)
+
+    results = []
+    rng = random.Random(args.seed)
+
+    #Creating a function to add the result of an operation
+    def add_result(operation, times, count = 1, **extra):
+        result = {"records": records, "operation": operation, "runs": len(times), "count": count,
+                  "median_s": statistics.median(times), "min_s": min(times), "max_s": max(times),
+                  "per_operation_us": statistics.median(times) / count * 1000000}
+        result.update(extra)
+        results.append(result)
+        print(f"  {records:>10} records  {operation:<14} {result['median_s'] * 1000:10.2f} ms", file = sys.stderr)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        times = time_runs(lambda: tracker.read_bulk_transactions_from_file(filename), args.repeat)
+        transactions = tracker.read_bulk_transactions_from_file(filename)
+    if "read_bulk" in operations:
+        add_result("read_bulk", times, bytes = os.path.getsize(filename))
+
+    #The snapshot benchmarks write the binary snapshot of the ledger and then load the ledger from it (as the JSON backend does when it is up to date)
+    if "write_snapshot" in operations or "read_snapshot" in operations:
+        stamp = tracker.get_file_stamp(filename)
+        times = time_runs(lambda: tracker.write_snapshot(transactions, filename, stamp), args.repeat)
+        snapshot_size = os.path.getsize(tracker.get_snapshot_filename(filename))
+        if "write_snapshot" in operations:
+            add_result("write_snapshot", times, bytes = snapshot_size)
+        if "read_snapshot" in operations:
+            add_result("read_snapshot", time_runs(lambda: tracker.read_snapshot(filename, stamp), args.repeat), bytes = snapshot_size)
+
+    if "add_to_json" in operations:
+        export_filename = os.path.join(folder, "export.json")
+        add_result("add_to_json", time_runs(lambda: tracker.add_to_json(transactions, export_filename), args.repeat))
+
+    #The add, update and delete benchmarks run the menu functions with scripted answers on a copy of the ledger, saving each change as the menu does
+    for operation in ("add", "update", "delete"):
+        if operation not in operations:
+            continue
+        copy_filename = os.path.join(folder, "copy.json")
+
+        #Creating a function to prepare a fresh copy of the ledger, the session and the answers for one run
+        def setup():
+            shutil.copyfile(filename, copy_filename)
+            if os.path.exists(tracker.get_journal_filename(copy_filename)):
+                os.remove(tracker.get_journal_filename(copy_filename))
+            storage = tracker.JSONBackend(copy_filename)
+            copy = storage.load()
+            answers = []
+            if operation == "add":
+                for expense, info in sample_transactions(copy, args.ops, rng):
+                    answers.extend(get_transaction_answers(expense, info))
+            else:
+                #Picking distinct transactions, so each one can still be found after the earlier changes
+                samples = {}
+                for expense, info in sample_transactions(copy, args.ops * 4, rng):
+                    samples.setdefault((expense, info["amount"], info["type"], info["date"]), [expense, info])
+                for expense, info in list(samples.values())[:args.ops]:
+                    answers.extend(get_transaction_answers(expense, info))
+                    if operation == "update":
+                        answers.extend(["amount", "{:.2f}".format(float(info["amount"]) + 1), "N"])
+            return [storage, tracker.TransactionStore.from_transactions(copy), answers]
+
+        #Creating a function to run the menu function once for every set of answers
+        def run(state):
+            storage, store, answers = state
+            menu_function = {"add": tracker.add_transaction, "update": tracker.update_transaction, "delete": tracker.delete_transaction}[operation]
+            with scripted_input(tracker, answers):
+                while True:
+                    try:
+                        menu_function(store, storage)
+                    except StopIteration:
+                        break
+
+        add_result(operation, time_runs(run, args.repeat, setup), args.ops)
+
+    if "view" in operations or "summary" in operations:
+        aggregates = tracker.RunningAggregates(transactions)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            if "view" in operations:
+                add_result("view", time_runs(lambda: tracker.view_transactions(transactions), args.repeat))
+            if "summary" in operations:
+                add_result("summary", time_runs(lambda: tracker.transactions_summary(transactions, aggregates), args.repeat))
+
+    #Timing the running totals added up in a single process and by one worker process per CPU (when the ledger is large enough to use them)
+    if "aggregate" in operations:
+        for workers in sorted({1, tracker.get_worker_count(0)}):
+            add_result("aggregate", time_runs(lambda: tracker.aggregate_transactions(transactions, workers), args.repeat), workers = workers,
+                       parallel = workers > 1 and records >= tracker.PARALLEL_MIN_RECORDS)
+
+    #Timing the spending statistics of summary --stats with plain Python, and with NumPy if it is installed
+    if "statistics" in operations:
+        analytics = tracker.load_analytics()
+        store = tracker.TransactionStore.from_transactions(transactions)
+        for use_numpy in ([False, True] if analytics.numpy != None else [False]):
+            add_result("statistics", time_runs(lambda: analytics.analyze(store, use_numpy), args.repeat), numpy = use_numpy)
+
+    gui_operations = [operation for operation in operations if operation.startswith("gui_")]
+    if gui_operations:
+        try:
+            gui = tracker.load_gui()
+        except ImportError as error_msg:
+            print(f"  The GUI benchmarks were skipped: {error_msg}", file = sys.stderr)
+            return results
+        rows = tracker.get_rows(transactions)
+
+        index_times = time_runs(lambda: tracker.SearchIndex(rows), args.repeat)
+        if "gui_index" in operations:
+            add_result("gui_index", index_times)
+
+        if "gui_search" in operations:
+            search_index = tracker.SearchIndex(rows)
+            for column_name, text in GUI_SEARCHES:
+                matches = len(search_index.search(column_name, text))
+                add_result("gui_search", time_runs(lambda: search_index.search(column_name, text), args.repeat), column = column_name, text = text, matches = matches)
+
+        if "gui_sort" in operations:
+            view = make_headless_gui(gui, tracker, filename, transactions, rows)
+            for column_name in tracker.COLUMNS:
+                #Timing the first (uncached) ascending sort, and the descending sort which reuses the cached order
+                def sort_column():
+                    view.clear_sort_cache()
+                    view.sort_column = column_name
+                    view.sort_descending = False
+                    view.get_sorted_ids()
+                add_result("gui_sort", time_runs(sort_column, args.repeat), column = column_name)
+                view.sort_descending = True
+                add_result("gui_sort_desc", time_runs(view.get_sorted_ids, args.repeat), column = column_name)
+
+        #Timing the comparison made by the GUI when the transaction records change on disk, with --ops rows changed, removed and added
+        if "gui_delta" in operations:
+            view = make_headless_gui(gui, tracker, filename, transactions, rows)
+            new_rows = list(rows)
+            for num in range(min(args.ops, len(new_rows))):
+                position = rng.randrange(len(new_rows))
+                expense, amount, type_, date_ = new_rows[position]
+                new_rows[position] = (expense, "{:.2f}".format(float(amount) + 1), type_, date_)
+                del new_rows[rng.randrange(len(new_rows))]
+                new_rows.append(new_rows[rng.randrange(len(new_rows))][:1] + ("1.00", "Expense", "2024-01-01"))
+            add_result("gui_delta", time_runs(lambda: view.get_delta(new_rows), args.repeat), args.ops)
+    return results
+
+
+#Creating a function to run the benchmark suite from the command line and write the results as JSON
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Benchmark the Personal Finance Tracker on generated ledgers.")
+    parser.add_argument("--records", type = int, nargs = "+", default = [1000, 10000, 100000], help = "sizes of the ledgers to generate (default: 1000 10000 100000)")
+    parser.add_argument("--categories", type = int, default = 50, help = "number of categories (default: 50)")
+    parser.add_argument("--skew", type = float, default = 1.1, help = "skew of the Zipf distribution of the categories (default: 1.1)")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the random generator (default: 0)")
+    parser.add_argument("--repeat", type = int, default = 3, help = "number of times each operation is timed (default: 3)")
+    parser.add_argument("--ops", type = int, default = 100, help = "number of adds, updates and deletes made in each run (default: 100)")
+    parser.add_argument("--operations", nargs = "+", choices = OPERATIONS, default = list(OPERATIONS), help = "operations to benchmark (default: all)")
+    parser.add_argument("--output", help = "file to write the JSON results to (default: stdout)")
+    args = parser.parse_args(argv)
+
+    tracker = load_tracker()
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {"categories": args.categories, "skew": args.skew, "seed": args.seed, "repeat": args.repeat, "ops": args.ops, "journal_mode": tracker.JOURNAL_MODE},
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as folder:
+        for records in args.records:
+            report["results"].extend(benchmark_size(tracker, folder, records, args, args.operations))
+
+    output = json.dumps(report, indent = 2)
+    if args.output != None:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
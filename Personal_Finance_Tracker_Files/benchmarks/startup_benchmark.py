@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+#Path of the main Finance Tracker file, which is in the folder above this one
+TRACKER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Personal Finance Tracker.py")
+
+#Default budget for the cold start of the CLI in milliseconds (from starting Python to the Finance Tracker exiting from the menu)
+DEFAULT_BUDGET_MS = 150
+
+#Modules which must not be imported when the CLI starts, as they are only imported by the menu actions and commands that need them
+DEFERRED_MODULES = ("tkinter", "sqlite3", "csv", "argparse", "threading", "queue", "numpy")
+
+
+#Creating a function to parse the output of "python -X importtime" into a list of [module, self time, cumulative time, depth] lists (times in microseconds)
+#Only the imports made after the interpreter has started (after the "site" module) are returned
+def parse_importtime(output):
+    imports = []
+    started = False
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            #Skipping the heading line
+            continue
+        module = name.strip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if not started:
+            if module == "site" and depth == 0:
+                started = True
+            continue
+        imports.append([module, int(self_us), int(cumulative_us), depth])
+    return imports
+
+
+#Creating a function to start the CLI once, choose "Exit" from the menu, and measure how long it took
+#A list of the wall time in milliseconds and the imports made by the Finance Tracker is returned
+def run_cold_start(folder):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", TRACKER_PATH], input = "10\n", cwd = folder,
+                            stdout = subprocess.DEVNULL, stderr = subprocess.PIPE, text = True, check = True)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return [elapsed_ms, parse_importtime(result.stderr)]
+
+
+#Creating a function to run the startup benchmark and get its results as a dictionary
+def run_benchmark(runs, budget_ms, top):
+    wall_times = []
+    import_times = []
+    module_times = {}
+    imported = set()
+
+    #Running the CLI in an empty folder with an empty transactions file, so only the cost of starting up is measured
+    with tempfile.TemporaryDirectory() as folder:
+        with open(os.path.join(folder, "transactions.json"), "w") as file:
+            file.write("{}")
+
+        #The first run is not counted, as it writes the bytecode cache of the modules used
+        run_cold_start(folder)
+        for run in range(runs):
+            elapsed_ms, imports = run_cold_start(folder)
+            wall_times.append(elapsed_ms)
+            import_times.append(sum(cumulative_us for module, self_us, cumulative_us, depth in imports if depth == 0) / 1000)
+            for module, self_us, cumulative_us, depth in imports:
+                imported.add(module.split(".")[0])
+                if depth == 0:
+                    module_times.setdefault(module, []).append(cumulative_us / 1000)
+
+    slowest = sorted(([module, statistics.median(times)] for module, times in module_times.items()), key = lambda item: item[1], reverse = True)
+    results = {
+        "runs": runs,
+        "wall_ms": round(statistics.median(wall_times), 2),
+        "wall_ms_min": round(min(wall_times), 2),
+        "imports_ms": round(statistics.median(import_times), 2),
+        "budget_ms": budget_ms,
+        "slowest_imports": [{"module": module, "cumulative_ms": round(ms, 2)} for module, ms in slowest[:top]],
+        "deferred_modules_imported": [module for module in DEFERRED_MODULES if module in imported],
+    }
+    results["passed"] = results["wall_ms"] <= budget_ms and not results["deferred_modules_imported"]
+    return results
+
+
+#Creating a function to display the results of the benchmark
+def print_results(results):
+    print(f"Cold start of the CLI (median of {results['runs']} runs) : {results['wall_ms']:.1f} ms (fastest {results['wall_ms_min']:.1f} ms, budget {results['budget_ms']} ms)")
+    print(f"Time spent importing modules : {results['imports_ms']:.1f} ms")
+    print("Slowest imports (cumulative) :")
+    for item in results["slowest_imports"]:
+        print(f"  {item['cumulative_ms']:8.2f} ms  {item['module']}")
+    if results["deferred_modules_imported"]:
+        print(f"Modules which should only be imported when needed were imported at startup : {', '.join(results['deferred_modules_imported'])}")
+    print("PASSED" if results["passed"] else "FAILED")
+
+
+#Creating a function to run the benchmark from the command line
+#The exit status is 1 if the cold start is over budget or a deferred module was imported at startup
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Measure the cold start time and imports of the Personal Finance Tracker CLI.")
+    parser.add_argument("--runs", type = int, default = 10, help = "number of times the CLI is started (default: 10)")
+    parser.add_argument("--budget-ms", type = float, default = DEFAULT_BUDGET_MS, help = f"budget for the median cold start in milliseconds (default: {DEFAULT_BUDGET_MS})")
+    parser.add_argument("--top", type = int, default = 10, help = "number of slowest imports to display (default: 10)")
+    parser.add_argument("--json", action = "store_true", help = "print the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.runs, args.budget_ms, args.top)
+    if args.json:
+        print(json.dumps(results, indent = 2))
+    else:
+        print_results(results)
+    return 0 if results["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
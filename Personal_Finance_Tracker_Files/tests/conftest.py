@@ -0,0 +1,48 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+#Folder of the Finance Tracker files, which is added to sys.path so the main file can be imported by its file name
+TRACKER_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+#Creating a fixture to import the main Finance Tracker file once for every test, as the "finance_tracker" module
+#(the file name contains spaces, so it is imported with importlib rather than an import statement)
+@pytest.fixture(scope = "session")
+def tracker():
+    if sys.version_info < (3, 12):
+        pytest.skip("The Finance Tracker needs Python 3.12 or later")
+    if "finance_tracker" not in sys.modules:
+        if TRACKER_FOLDER not in sys.path:
+            sys.path.append(TRACKER_FOLDER)
+        importlib.import_module("Personal Finance Tracker")
+    return sys.modules["finance_tracker"]
+
+
+#Creating a fixture to get the name of a JSON file of transaction records in a temporary folder, which starts with an empty dictionary
+#Journal mode and snapshots are set back to their defaults for every test
+@pytest.fixture
+def ledger(tracker, tmp_path, monkeypatch):
+    monkeypatch.setattr(tracker, "JOURNAL_MODE", True)
+    monkeypatch.setattr(tracker, "SNAPSHOT_MODE", True)
+    filename = str(tmp_path / "transactions.json")
+    with open(filename, "w") as file:
+        file.write("{}")
+    return filename
+
+
+#Creating a fixture to make the prompts of the tracker read their answers from a list rather than the keyboard
+#The fixture is a function which is called with the list of answers. EOFError is raised once every answer has been used, in the same way as input() when the input is closed
+@pytest.fixture
+def script_input(tracker, monkeypatch):
+    def set_answers(answers):
+        answers = iter(answers)
+
+        def scripted_input(msg = ""):
+            for answer in answers:
+                return answer
+            raise EOFError
+        monkeypatch.setattr(tracker, "input", scripted_input, raising = False)
+    return set_answers
@@ -0,0 +1,23 @@
+#The totals are added up in a single process unless worker processes are asked for, and never by more workers than there are CPUs
+def test_worker_count(tracker, monkeypatch):
+    monkeypatch.setattr(tracker.os, "cpu_count", lambda: 2)
+    monkeypatch.setattr(tracker, "AGGREGATE_WORKERS", 1)
+    assert tracker.get_worker_count() == 1
+    assert tracker.get_worker_count(0) == 2
+    assert tracker.get_worker_count(8) == 2
+
+
+#The totals added up by worker processes are exactly the same as the totals added up in a single process
+def test_parallel_totals(tracker, monkeypatch):
+    transactions = {}
+    for number in range(400):
+        purpose = f"Category {number % 7}"
+        transactions.setdefault(purpose, []).append({"amount": f"{number}.{number % 100:02d}", "type": "Income" if number % 5 == 0 else "Expense",
+                                                     "date": f"{2020 + number % 4}-{number % 12 + 1:02d}-{number % 28 + 1:02d}"})
+    monkeypatch.setattr(tracker.os, "cpu_count", lambda: 2)
+    monkeypatch.setattr(tracker, "PARALLEL_MIN_RECORDS", 100)
+
+    serial = tracker.aggregate_transactions(transactions, 1)
+    parallel = tracker.aggregate_transactions(transactions, 2)
+    assert vars(parallel) == vars(serial)
+    assert serial.totals() == tracker.RunningAggregates(transactions).totals()
@@ -0,0 +1,56 @@
+import pytest
+
+
+#A small fixed ledger with several purposes, a month without transactions (2024-03), an outlier, an amount which is not a number and a date which is not in the ISO format
+TRANSACTIONS = {"Rent": [{"amount": "500.00", "type": "Expense", "date": "2024-01-01"}, {"amount": "500.00", "type": "Expense", "date": "2024-02-01"},
+                         {"amount": "520.00", "type": "Expense", "date": "2024-04-01"}, {"amount": "ten", "type": "Expense", "date": "2024-04-02"}],
+                "Food": [{"amount": "12.50", "type": "Expense", "date": "2024-01-05"}, {"amount": "8.00", "type": "Expense", "date": "2024-01-20"},
+                         {"amount": "15.25", "type": "Expense", "date": "2024-02-11"}, {"amount": "9.75", "type": "Expense", "date": "2024-04-03"},
+                         {"amount": "240.00", "type": "Expense", "date": "2024-04-04"}],
+                "Salary": [{"amount": "2000.00", "type": "Income", "date": "2024-01-31"}, {"amount": "2000.00", "type": "Income", "date": "29/02/2024"},
+                           {"amount": "2100.00", "type": "Income", "date": "2024-04-30"}]}
+
+
+#Creating a fixture to load the analytics module
+@pytest.fixture
+def analytics(tracker):
+    return tracker.load_analytics()
+
+
+#Creating a fixture to get the TransactionStore of the fixed ledger, with one transaction added and removed again
+@pytest.fixture
+def store(tracker):
+    store = tracker.TransactionStore.from_transactions(TRANSACTIONS)
+    store.add("Food", {"amount": "11.00", "type": "Expense", "date": "2024-04-05"})
+    store.remove(store.find_row("Food", {"amount": "11.00", "type": "Expense", "date": "2024-04-05"}))
+    return store
+
+
+#The statistics calculated with plain Python loops are checked against values worked out by hand
+def test_python_statistics(analytics, store):
+    results = analytics.analyze(store, False)
+
+    assert [[category["purpose"], category["type"], category["count"], category["total"]] for category in results["categories"]] == [
+        ["Rent", "Expense", 3, 152000], ["Food", "Expense", 5, 28550], ["Salary", "Income", 3, 610000]]
+    food = results["categories"][1]
+    assert food["mean"] == 5710.0
+    assert food["percentiles"] == pytest.approx({10: 870.0, 25: 975.0, 50: 1250.0, 75: 1525.0, 90: 15010.0})
+
+    #The salary dated "29/02/2024" is only counted in the statistics per purpose, so February has no income
+    assert [[month["month"], month["expenses"], month["income"]] for month in results["months"]] == [
+        ["2024-01", 52050, 200000], ["2024-02", 51525, 0], ["2024-03", 0, 0], ["2024-04", 76975, 210000]]
+    #The fences of the food amounts are 9.75 - 1.5 * 5.50 and 15.25 + 1.5 * 5.50, so 240.00 is (240.00 - 23.50) / 5.50 interquartile ranges beyond them
+    assert results["outliers"] == [{"purpose": "Food", "amount": "240.00", "type": "Expense", "date": "2024-04-04", "score": pytest.approx(21650 / 550)}]
+
+
+#NumPy gives exactly the same statistics as the plain Python loops
+def test_numpy_matches_python(analytics, store):
+    pytest.importorskip("numpy")
+    assert analytics.analyze(store, True) == analytics.analyze(store, False)
+
+
+#The plain Python loops are used when NumPy is not installed
+def test_without_numpy(analytics, store, monkeypatch):
+    monkeypatch.setattr(analytics, "numpy", None)
+    assert analytics.analyze(store) == analytics.analyze(store, False)
+    assert analytics.analyze(analytics.TransactionStore()) == {"categories": [], "months": [], "outliers": []}
@@ -0,0 +1,50 @@
+import io
+import json
+import sys
+
+
+#Creating a function to run the batch command with operations given as newline-delimited JSON on stdin
+def run_batch(tracker, ledger, monkeypatch, operations):
+    monkeypatch.setattr(sys, "stdin", io.StringIO("".join(json.dumps(operation) + "\n" for operation in operations)))
+    return tracker.run_command(["--file", ledger, "batch"])
+
+
+#Every operation of a batch is applied to the transactions loaded once, and an operation which fails is reported without stopping the others
+def test_batch_operations(tracker, ledger, monkeypatch, capsys):
+    operations = [{"op": "add", "purpose": "rent", "amount": "500", "type": "DR", "date": "2024-05-01"},
+                  {"op": "add", "purpose": "salary", "amount": "2,000.00", "type": "CR", "date": "2024-05-31"},
+                  {"op": "add", "purpose": "food", "amount": "12.5", "type": "DR", "date": "2024-05-02"},
+                  {"op": "update", "purpose": "rent", "amount": "500", "type": "DR", "date": "2024-05-01", "new_amount": "550"},
+                  {"op": "delete", "purpose": "food", "amount": "12.50", "type": "DR", "date": "2024-05-02"},
+                  {"op": "delete", "purpose": "food", "amount": "99", "type": "DR", "date": "2024-05-02"}]
+    assert run_batch(tracker, ledger, monkeypatch, operations) == 1
+    assert capsys.readouterr().err == "Operation 6 failed: the transaction cannot be found\nRan 6 operations (5 changes saved, 1 failed).\n"
+    with open(ledger, "r") as file:
+        assert json.load(file) == {"Rent": [{"amount": "550.00", "type": "Expense", "date": "2024-05-01"}],
+                                   "Salary": [{"amount": "2000.00", "type": "Income", "date": "2024-05-31"}], "Food": []}
+
+    assert tracker.run_command(["--file", ledger, "summary", "--json"]) == 0
+    assert json.loads(capsys.readouterr().out) == {"expenses": "550.00", "income": "2000.00", "balance": "1450.00"}
+    assert tracker.run_command(["--file", ledger, "search", "Transaction", "Sal"]) == 0
+    assert [json.loads(line) for line in capsys.readouterr().out.splitlines()] == [{"purpose": "Salary", "amount": "2000.00", "type": "Income", "date": "2024-05-31"}]
+
+
+#Purposes with backslashes and quotes added or updated by the batch command must not make the JSON file invalid
+def test_batch_escapes_purposes(tracker, ledger, monkeypatch, capsys):
+    operations = [{"op": "add", "purpose": "back\\slash", "amount": "10", "type": "DR", "date": "2024-01-05"},
+                  {"op": "add", "purpose": 'say "hi"', "amount": "20", "type": "CR", "date": "2024-02-05"},
+                  {"op": "update", "purpose": 'say "hi"', "amount": "20", "type": "CR", "date": "2024-02-05", "new_purpose": "c:\\temp\\"}]
+    assert run_batch(tracker, ledger, monkeypatch, operations) == 0
+    assert "3 changes saved, 0 failed" in capsys.readouterr().err
+
+    with open(ledger, "r") as file:
+        data = json.load(file)
+    assert data == {"Back\\slash": [{"amount": "10.00", "type": "Expense", "date": "2024-01-05"}],
+                    'Say "hi"': [],
+                    "C:\\temp\\": [{"amount": "20.00", "type": "Income", "date": "2024-02-05"}]}
+
+    #Running another batch against the saved file finds the transactions by their escaped purposes
+    operations = [{"op": "delete", "purpose": "back\\slash", "amount": "10", "type": "DR", "date": "2024-01-05"}]
+    assert run_batch(tracker, ledger, monkeypatch, operations) == 0
+    with open(ledger, "r") as file:
+        assert json.load(file)["Back\\slash"] == []
@@ -0,0 +1,177 @@
+import json
+import queue
+import threading
+import types
+
+import pytest
+
+
+RENT = {"amount": "500.00", "type": "Expense", "date": "2024-05-01"}
+FOOD = {"amount": "12.50", "type": "Expense", "date": "2024-05-02"}
+SALARY = {"amount": "2000.00", "type": "Income", "date": "2024-05-31"}
+
+
+#Creating a fixture to load the GUI module (which needs tkinter, but does not open a window when it is imported)
+@pytest.fixture
+def gui(tracker):
+    pytest.importorskip("tkinter")
+    return tracker.load_gui()
+
+
+#Creating a function to create a FinanceTrackerGUI without a Tk window, with only the state used to load rows and apply changes to them
+def make_headless_gui(gui, tracker, filename):
+    view = gui.FinanceTrackerGUI.__new__(gui.FinanceTrackerGUI)
+    view.all_rows = []
+    view.removed_count = 0
+    view.skipped_count = 0
+    view.live_ids = None
+    view.transactions = {}
+    view.search_index = tracker.SearchIndex()
+    view.columns = tracker.TransactionStore()
+    view.storage = tracker.JSONBackend(filename)
+    view.load_results = queue.Queue()
+    view.index_lock = threading.Lock()
+    view.filter_ids = None
+    view.view_filter = None
+    view.search_running = False
+    view.sort_column = None
+    view.sort_descending = False
+    view.clear_sort_cache()
+    view.refresh_view = lambda: None
+    return view
+
+
+#Creating a function to run the loading thread of the GUI (on the current thread) and get the items it sent back
+def run_loading(view):
+    view.run_loading()
+    items = []
+    while not view.load_results.empty():
+        items.append(view.load_results.get_nowait())
+    return items
+
+
+#The transactions are sent back from the loading thread in chunks, which are added to the rows, the search indexes and the TransactionStore as they arrive.
+#Changes recorded in the journal are applied once the JSON file has been read, replacing the rows loaded so far
+def test_loaded_rows(gui, tracker, ledger):
+    transactions = {"Rent": [dict(RENT)], "Food": [dict(FOOD)], "Salary": [dict(SALARY)]}
+    tracker.add_to_json(transactions, ledger)
+    view = make_headless_gui(gui, tracker, ledger)
+    view.LOAD_CHUNK_SIZE = 2
+
+    items = run_loading(view)
+    assert [kind for kind, value in items] == ["rows", "rows", "done"]
+    for kind, value in items[:-1]:
+        view.add_loaded_rows(value)
+    assert view.all_rows == [("Rent", "500.00", "Expense", "2024-05-01"), ("Food", "12.50", "Expense", "2024-05-02"), ("Salary", "2000.00", "Income", "2024-05-31")]
+    assert view.search_index.search("Transaction", "Sal") == [2]
+    assert view.columns.get_transaction(1) == ["Food", FOOD]
+    view.sort_column = "Amount"
+    assert list(view.get_sorted_ids()) == [1, 0, 2]
+
+    change = {"op": "delete", "purpose": "Food", "record": dict(FOOD)}
+    tracker.apply_change(transactions, change)
+    view.storage.save_change(transactions, change)
+    view = make_headless_gui(gui, tracker, ledger)
+    items = run_loading(view)
+    assert items[-1] == ["replayed", transactions]
+    view.set_loaded_transactions(items[-1][1])
+    assert view.all_rows == [("Rent", "500.00", "Expense", "2024-05-01"), ("Salary", "2000.00", "Income", "2024-05-31")]
+    assert view.search_index.search("Transaction", "Foo") == []
+    assert len(view.columns) == 2
+
+
+#Only the rows changed on disk are applied: a changed row keeps its row id, a removed row is set to None and an added row gets a new row id
+def test_delta(gui, tracker, ledger):
+    view = make_headless_gui(gui, tracker, ledger)
+    view.watch_results = queue.Queue()
+    view.first_row = 0
+    view.scroll_to = lambda row: None
+    messages = []
+    view.load_label = types.SimpleNamespace(config = lambda text: messages.append(text))
+    view.add_loaded_rows([["Rent", dict(RENT)], ["Food", dict(FOOD)]])
+
+    with open(ledger, "w") as file:
+        json.dump({"Rent": [dict(RENT, amount = "550.00")], "Salary": [dict(SALARY)]}, file)
+    view.run_reload(view.storage.get_stamp())
+    kind, stamp, value = view.watch_results.get_nowait()
+    assert kind == "delta"
+    view.apply_delta(*value)
+
+    assert view.all_rows == [("Rent", "550.00", "Expense", "2024-05-01"), None, ("Salary", "2000.00", "Income", "2024-05-31")]
+    assert list(view.get_all_row_ids()) == [0, 2]
+    assert view.search_index.search("Transaction", "Foo") == []
+    assert view.columns.get_transaction(0) == ["Rent", dict(RENT, amount = "550.00")]
+    assert len(view.columns) == 2
+    assert messages[-1] == "The transaction records were changed on disk (1 added, 1 changed and 1 removed)."
+
+
+#Rows whose amount is not a number are skipped (keeping the row ids of the other rows), and dates which are not in the ISO format are kept as text
+def test_loaded_rows_with_invalid_values(gui, tracker, ledger):
+    view = make_headless_gui(gui, tracker, ledger)
+    view.add_loaded_rows([["Rent", {"amount": "500.00", "type": "Expense", "date": "2024-05-01"}],
+                          ["Food", {"amount": "ten", "type": "Expense", "date": "2024-05-02"}],
+                          ["Salary", {"amount": "2000.00", "type": "Income", "date": "31/05/2024"}]])
+
+    assert view.all_rows == [("Rent", "500.00", "Expense", "2024-05-01"), None, ("Salary", "2000.00", "Income", "31/05/2024")]
+    assert list(view.get_all_row_ids()) == [0, 2]
+    assert view.columns.get_transaction(2) == ["Salary", {"amount": "2000.00", "type": "Income", "date": "31/05/2024"}]
+    assert view.search_index.search("Transaction", "Sal") == [2]
+    view.sort_column = "Date"
+    assert list(view.get_sorted_ids()) == [2, 0]
+    assert view.get_skipped_message() == ("1 transaction could not be displayed, as the amount is not a number. "
+                                          "1 transaction has a date which is not in the YYYY-MM-DD format.")
+
+    view.set_loaded_transactions({"Food": [{"amount": "ten", "type": "Expense", "date": "2024-05-02"}, {"amount": "nan", "type": "Expense", "date": "2024-05-03"}],
+                                  "Rent": [{"amount": "500.00", "type": "Expense", "date": "2024-05-01"}]})
+    assert view.all_rows == [None, None, ("Rent", "500.00", "Expense", "2024-05-01")]
+    assert list(view.get_all_row_ids()) == [2]
+    assert view.get_skipped_message() == "2 transactions could not be displayed, as the amount is not a number."
+
+
+#Rows changed on disk to an amount which is not a number are removed from the view, rather than stopping the changes from being applied
+def test_delta_with_invalid_values(gui, tracker, ledger):
+    view = make_headless_gui(gui, tracker, ledger)
+    view.watch_results = queue.Queue()
+    view.first_row = 0
+    view.scroll_to = lambda row: None
+    messages = []
+    view.load_label = types.SimpleNamespace(config = lambda text: messages.append(text))
+    view.add_loaded_rows([["Rent", {"amount": "500.00", "type": "Expense", "date": "2024-05-01"}],
+                          ["Food", {"amount": "12.50", "type": "Expense", "date": "2024-05-02"}]])
+
+    with open(ledger, "w") as file:
+        json.dump({"Rent": [{"amount": "500.00", "type": "Expense", "date": "2024-05-01"}], "Food": [{"amount": "twelve", "type": "Expense", "date": "2024-05-02"}],
+                   "Salary": [{"amount": "2000.00", "type": "Income", "date": "2024-05-31"}, {"amount": "", "type": "Income", "date": "2024-06-30"}]}, file)
+    view.run_reload(view.storage.get_stamp())
+    kind, stamp, value = view.watch_results.get_nowait()
+    assert kind == "delta"
+    view.apply_delta(*value)
+
+    assert view.all_rows == [("Rent", "500.00", "Expense", "2024-05-01"), None, ("Salary", "2000.00", "Income", "2024-05-31")]
+    assert list(view.get_all_row_ids()) == [0, 2]
+    assert view.search_index.search("Transaction", "Foo") == []
+    assert len(view.columns) == 2
+    assert messages[-1] == ("The transaction records were changed on disk (1 added, 0 changed and 1 removed). "
+                            "2 transactions could not be displayed, as the amount is not a number.")
+
+
+#A search only holds index_lock while it copies the matching row ids, so rows can be loaded while it combines them, without changing its results
+def test_search_outside_lock(gui, tracker, ledger, monkeypatch):
+    view = make_headless_gui(gui, tracker, ledger)
+    view.search_generation = 1
+    view.search_results = queue.Queue()
+    view.add_loaded_rows([["Rent", {"amount": "500.00", "type": "Expense", "date": "2024-05-01"}],
+                          ["Food", {"amount": "12.50", "type": "Expense", "date": "2024-05-02"}],
+                          ["Rent", {"amount": "500.00", "type": "Expense", "date": "2024-06-01"}]])
+
+    merge_row_sets = tracker.SearchIndex.merge_row_sets
+    def load_while_merging(row_sets, is_cancelled = None):
+        assert not view.index_lock.locked()
+        view.add_loaded_rows([["Rent", {"amount": "500.00", "type": "Expense", "date": "2024-07-01"}]])
+        return merge_row_sets(row_sets, is_cancelled)
+    monkeypatch.setattr(tracker.SearchIndex, "merge_row_sets", staticmethod(load_while_merging))
+
+    view.run_search(1, "Transaction", "Rent")
+    assert view.search_results.get_nowait() == [1, [0, 2]]
+    assert view.search_results.get_nowait() == [1, None]
+    assert view.all_rows[3] == ("Rent", "500.00", "Expense", "2024-07-01")
@@ -0,0 +1,52 @@
+import csv
+import json
+import os
+
+
+#Creating a function to write the rows of a CSV file with a heading row
+def write_csv(filename, rows):
+    with open(filename, "w", newline = "", encoding = "utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["purpose", "amount", "type", "date"])
+        writer.writerows(rows)
+
+
+#Purposes with quotes and backslashes (eg: from a bank statement) must not make the JSON file invalid once the journal is compacted
+def test_import_escapes_quotes_and_backslashes(tracker, ledger, tmp_path, capsys):
+    statement = str(tmp_path / "statement.csv")
+    write_csv(statement, [['ACME "Store" ltd', "12.50", "DR", "2024-05-01"], ["Back\\slash", "3", "CR", "2024-05-02"], ["Café", "1,000.00", "DR", "2024-05-03"]])
+
+    assert tracker.run_command(["--file", ledger, "import", statement]) == 0
+    assert "Imported 3 of 3 rows" in capsys.readouterr().out
+
+    #The journal has been compacted into the JSON file, which can be read by the json module and by the Finance Tracker
+    assert not os.path.exists(tracker.get_journal_filename(ledger))
+    with open(ledger, "r") as file:
+        data = json.load(file)
+    assert data == {'Acme "store" ltd': [{"amount": "12.50", "type": "Expense", "date": "2024-05-01"}],
+                    "Back\\slash": [{"amount": "3.00", "type": "Income", "date": "2024-05-02"}],
+                    "Café": [{"amount": "1000.00", "type": "Expense", "date": "2024-05-03"}]}
+    assert tracker.read_bulk_transactions_from_file(ledger) == data
+    assert tracker.run_command(["--file", ledger, "summary", "--json"]) == 0
+    assert json.loads(capsys.readouterr().out) == {"expenses": "1012.50", "income": "3.00", "balance": "0.00"}
+
+
+#Rows which are not valid are rejected with the reason, and written to the rejected rows file, while the other rows are imported
+def test_import_rejects_invalid_rows(tracker, ledger, tmp_path, capsys):
+    statement = str(tmp_path / "statement.csv")
+    rejected_filename = str(tmp_path / "rejected.csv")
+    write_csv(statement, [["Rent", "500", "DR", "2024-05-01"], ["", "10", "DR", "2024-05-01"], ["Food", "ten", "DR", "2024-05-01"],
+                          ["Food", "10", "XX", "2024-05-01"], ["Food", "10", "DR", "01/05/2024"], ["Food", "nan", "DR", "2024-05-01"], ["Salary", "2000", "CR", "2024-05-31"]])
+
+    assert tracker.run_command(["--file", ledger, "import", statement, "--rejected", rejected_filename]) == 0
+    output = capsys.readouterr().out
+    assert "Imported 2 of 7 rows" in output
+    assert "5 rows were rejected" in output
+
+    with open(rejected_filename, "r", newline = "", encoding = "utf-8") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ["file", "line", "reason", "row"]
+    assert [row[1:3] for row in rows[1:]] == [["3", "missing purpose"], ["4", "invalid amount 'ten'"], ["5", "invalid type 'XX'"],
+                                              ["6", "invalid date '01/05/2024'"], ["7", "invalid amount 'nan'"]]
+    assert tracker.read_bulk_transactions_from_file(ledger) == {"Rent": [{"amount": "500.00", "type": "Expense", "date": "2024-05-01"}],
+                                                                "Salary": [{"amount": "2000.00", "type": "Income", "date": "2024-05-31"}]}
@@ -0,0 +1,56 @@
+import atexit
+import json
+import os
+import time
+import tracemalloc
+
+
+#A measured operation records its time (without the time spent paused), records and bytes, and the stats of the session are added to the stats file
+def test_measure(tracker, tmp_path, monkeypatch):
+    monkeypatch.setattr(atexit, "register", lambda function: None)
+    tracing = tracemalloc.is_tracing()
+    stats_filename = str(tmp_path / "stats.jsonl")
+    instrumentation = tracker.Instrumentation(True, stats_filename = stats_filename)
+    try:
+        with instrumentation.measure("add") as measurement:
+            measurement.records = 1
+            instrumentation.bytes_written += 10
+            with instrumentation.pause():
+                time.sleep(0.2)
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    stats = instrumentation.stats["add"]
+    assert [stats["calls"], stats["records"], stats["bytes_read"], stats["bytes_written"]] == [1, 1, 0, 10]
+    assert stats["total_s"] < 0.1
+    instrumentation.write_stats()
+    with open(stats_filename, "r") as file:
+        assert json.loads(file.readline())["operations"]["add"]["calls"] == 1
+
+    #Nothing is measured while instrumentation is disabled
+    disabled = tracker.Instrumentation(stats_filename = stats_filename)
+    with disabled.measure("add") as measurement:
+        measurement.records = 1
+    assert disabled.stats == {}
+
+
+#The bytes read from the JSON file and its journal are counted in bytes rather than characters, including "\r\n" line endings
+def test_bytes_read(tracker, ledger, monkeypatch):
+    with open(ledger, "w", newline = "") as file:
+        file.write('{\r\n  "Café €": [\r\n    {"amount": "5.00", "type": "Expense", "date": "2024-05-01"}\r\n  ]\r\n}')
+    monkeypatch.setattr(tracker.instrumentation, "enabled", True)
+
+    bytes_read = tracker.instrumentation.bytes_read
+    assert list(tracker.iter_transactions_from_file(ledger, 16)) == [["Café €", {"amount": "5.00", "type": "Expense", "date": "2024-05-01"}]]
+    assert tracker.instrumentation.bytes_read - bytes_read == os.path.getsize(ledger)
+
+    #Changes appended to the journal are counted from the size of the journal, and read back with the same count
+    bytes_written = tracker.instrumentation.bytes_written
+    tracker.append_changes_to_journal([{"op": "add", "purpose": "Café €", "record": {"amount": "1.00", "type": "Expense", "date": "2024-05-02"}}], ledger)
+    journal_size = os.path.getsize(tracker.get_journal_filename(ledger))
+    assert tracker.instrumentation.bytes_written - bytes_written == journal_size
+
+    bytes_read = tracker.instrumentation.bytes_read
+    assert tracker.replay_journal({}, ledger) == 1
+    assert tracker.instrumentation.bytes_read - bytes_read == journal_size
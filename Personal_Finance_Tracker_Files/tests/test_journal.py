@@ -0,0 +1,97 @@
+import json
+import os
+
+
+RENT = {"amount": "500.00", "type": "Expense", "date": "2024-05-01"}
+SALARY = {"amount": "2000.00", "type": "Income", "date": "2024-05-31"}
+
+
+#Creating a function to write a JSON file of transaction records with add_to_json, without a journal
+def write_ledger(tracker, ledger, transactions):
+    tracker.add_to_json(transactions, ledger)
+    return tracker.read_bulk_transactions_from_file(ledger)
+
+
+#Changes are appended to the journal without rewriting the JSON file, and replayed on top of it when the transactions are loaded
+def test_journal_replay(tracker, ledger):
+    transactions = write_ledger(tracker, ledger, {"Rent": [dict(RENT)], "Salary": [dict(SALARY)]})
+    with open(ledger, "r") as file:
+        saved_text = file.read()
+
+    changes = [{"op": "add", "purpose": "Food", "record": {"amount": "12.50", "type": "Expense", "date": "2024-05-02"}},
+               {"op": "update", "purpose": "Rent", "record": dict(RENT), "new_purpose": "Rent", "new_record": {"amount": "550.00", "type": "Expense", "date": "2024-05-01"}},
+               {"op": "delete", "purpose": "Salary", "record": dict(SALARY)}]
+    for change in changes:
+        tracker.apply_change(transactions, json.loads(json.dumps(change)))
+    tracker.save_changes(transactions, ledger, changes)
+
+    with open(ledger, "r") as file:
+        assert file.read() == saved_text
+    assert tracker.read_bulk_transactions_from_file(ledger) == transactions == {"Rent": [{"amount": "550.00", "type": "Expense", "date": "2024-05-01"}],
+                                                                                 "Salary": [], "Food": [{"amount": "12.50", "type": "Expense", "date": "2024-05-02"}]}
+
+
+#The first line of the journal is the stamp of the JSON file it was started from, so the journal is ignored once the JSON file has been replaced
+def test_journal_header_stamp(tracker, ledger, capsys):
+    transactions = write_ledger(tracker, ledger, {"Rent": [dict(RENT)]})
+    change = {"op": "add", "purpose": "Salary", "record": dict(SALARY)}
+    tracker.apply_change(transactions, change)
+    tracker.save_changes(transactions, ledger, [change])
+
+    with open(tracker.get_journal_filename(ledger), "r") as file:
+        header = json.loads(file.readline())
+    assert header == {"snapshot": tracker.get_file_stamp(ledger)}
+    assert tracker.read_bulk_transactions_from_file(ledger) == {"Rent": [RENT], "Salary": [SALARY]}
+
+    #A partially written final line (eg: the program stopped while appending to the journal) is skipped
+    with open(tracker.get_journal_filename(ledger), "a") as file:
+        file.write('{"op": "add", "purpose": "Fo')
+    assert tracker.read_bulk_transactions_from_file(ledger) == {"Rent": [RENT], "Salary": [SALARY]}
+
+    #Replacing the JSON file (with a different size) makes the journal out of date
+    with open(ledger, "w") as file:
+        file.write('{"Rent": [\n    {"amount": "500.00", "type": "Expense", "date": "2024-05-01"}\n  ]\n}')
+    assert tracker.read_bulk_transactions_from_file(ledger) == {"Rent": [RENT]}
+    assert "out of date" in capsys.readouterr().out
+
+
+#The journal is folded back into the JSON file and removed once it grows past the compaction size
+def test_journal_compaction(tracker, ledger):
+    transactions = write_ledger(tracker, ledger, {})
+    journal_filename = tracker.get_journal_filename(ledger)
+    compacted = False
+    for day in range(1, 11):
+        change = {"op": "add", "purpose": "Food", "record": {"amount": f"{day}.00", "type": "Expense", "date": f"2024-05-{day:02d}"}}
+        tracker.apply_change(transactions, change)
+        tracker.save_changes(transactions, ledger, [change], 300)
+        if not os.path.exists(journal_filename):
+            compacted = True
+            with open(ledger, "r") as file:
+                assert json.load(file) == transactions
+
+    assert compacted
+    assert tracker.read_bulk_transactions_from_file(ledger) == transactions
+    assert len(transactions["Food"]) == 10
+
+
+#If the JSON file written by the compaction cannot be read back, the JSON file is not replaced and the journal is kept
+def test_failed_compaction_keeps_journal(tracker, ledger, monkeypatch, capsys):
+    transactions = write_ledger(tracker, ledger, {"Rent": [dict(RENT)]})
+    change = {"op": "add", "purpose": "Salary", "record": dict(SALARY)}
+    tracker.apply_change(transactions, change)
+    tracker.save_changes(transactions, ledger, [change])
+    with open(ledger, "r") as file:
+        saved_text = file.read()
+
+    #Reading back the written file as if it were empty
+    read_file = tracker.iter_transactions_from_file
+    monkeypatch.setattr(tracker, "iter_transactions_from_file", lambda filename: iter([]))
+    assert not tracker.compact_journal(transactions, ledger)
+    assert "could not be compacted" in capsys.readouterr().out
+    monkeypatch.setattr(tracker, "iter_transactions_from_file", read_file)
+
+    with open(ledger, "r") as file:
+        assert file.read() == saved_text
+    assert not os.path.exists(ledger + ".tmp")
+    assert os.path.exists(tracker.get_journal_filename(ledger))
+    assert tracker.read_bulk_transactions_from_file(ledger) == {"Rent": [RENT], "Salary": [SALARY]}
@@ -0,0 +1,24 @@
+import os
+
+
+RENT = {"amount": "500.00", "type": "Expense", "date": "2024-05-01"}
+SALARY = {"amount": "2000.00", "type": "Income", "date": "2024-05-31"}
+
+
+#Transactions whose amount is not a number (eg: in a JSON file edited by hand) are left out of the totals and counted, and the menu keeps working
+def test_menu_with_invalid_amounts(tracker, ledger, script_input, monkeypatch, capsys):
+    tracker.add_to_json({"Rent": [dict(RENT), {"amount": "ten", "type": "Expense", "date": "2024-05-02"}],
+                         "Salary": [dict(SALARY), {"amount": "nan", "type": "Income", "date": "2024-06-30"}]}, ledger)
+    monkeypatch.chdir(os.path.dirname(ledger))
+
+    #Viewing the transactions, the summary, the date range of May 2024 and the monthly report, and then exiting
+    script_input(["2", "5", "7", "2024-05", "2024-05", "8", "M", "10"])
+    tracker.main_menu()
+    output = capsys.readouterr().out
+
+    assert "2 transactions could not be added to the totals, as the amount is not a number." in output
+    assert "Transaction amount : ten" in output
+    assert "Total Expenses are : 500.00 \nTotal Income is : 2000.00 \nUsable Balance : 1500.00\n2 transactions could not be added" in output
+    assert "Transactions in this date range : 3\nTotal Expenses are : 500.00 \nTotal Income is : 2000.00\n\n1 transaction could not be added" in output
+    assert "Rent (Expense) : 500.00 from 1 transaction\n" in output
+    assert "Exiting Finance Tracker." in output
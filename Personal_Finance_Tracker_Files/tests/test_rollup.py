@@ -0,0 +1,63 @@
+import os
+
+
+RENT = {"amount": "500.00", "type": "Expense", "date": "2024-05-01"}
+SALARY = {"amount": "2000.00", "type": "Income", "date": "2024-05-31"}
+
+
+#The rollup report adds up the transactions of each month (and year), and a change only refreshes the cells it affects
+def test_rollup_rows(tracker, ledger):
+    tracker.add_to_json({"Rent": [dict(RENT), dict(RENT, date = "2023-12-01")], "Salary": [dict(SALARY)]}, ledger)
+    session = tracker.SessionStore(tracker.open_storage(ledger, "json"))
+    session.refresh()
+    rollup = session.get_rollup()
+    assert rollup.get_rows() == [["2023-12", "Rent", "Expense", 50000, 1], ["2024-05", "Rent", "Expense", 50000, 1], ["2024-05", "Salary", "Income", 200000, 1]]
+    assert rollup.get_rows("year") == [["2023", "Rent", "Expense", 50000, 1], ["2024", "Rent", "Expense", 50000, 1], ["2024", "Salary", "Income", 200000, 1]]
+
+    change = {"op": "update", "purpose": "Rent", "record": dict(RENT, date = "2023-12-01"), "new_purpose": "Rent", "new_record": dict(RENT, amount = "450.50")}
+    columns = session.get_columns()
+    assert columns.apply_change(change)
+    session.storage.save_changes(columns, [change])
+    session.record_change(change)
+    assert rollup.get_rows() == [["2024-05", "Rent", "Expense", 95050, 2], ["2024-05", "Salary", "Income", 200000, 1]]
+    assert rollup.cells == tracker.RollupReport.from_transactions(session.get_transactions()).cells
+
+
+#The saved report is used by a later session while the file is unchanged, and is calculated again once the file has been changed by something else
+def test_rollup_saved(tracker, ledger):
+    tracker.add_to_json({"Rent": [dict(RENT)], "Salary": [dict(SALARY)]}, ledger)
+    session = tracker.SessionStore(tracker.open_storage(ledger, "json"))
+    session.refresh()
+    session.get_rollup()
+
+    session = tracker.SessionStore(tracker.open_storage(ledger, "json"))
+    session.refresh()
+    assert session.load_rollup().cells == session.get_rollup().cells
+
+    tracker.add_to_json({"Rent": [dict(RENT, amount = "10.00")], "Salary": [dict(SALARY)]}, ledger)
+    session = tracker.SessionStore(tracker.open_storage(ledger, "json"))
+    session.refresh()
+    assert session.load_rollup() == None
+    assert session.get_rollup().get_rows() == [["2024-05", "Rent", "Expense", 1000, 1], ["2024-05", "Salary", "Income", 200000, 1]]
+
+
+#Each storage backend keeps its own rollup report file, so the report saved for one backend is not overwritten by another backend
+#opened from the same JSON file (the JSON file, the SQLite database and the folder of shards have the same name without their extension)
+def test_rollup_file_per_backend(tracker, ledger):
+    tracker.add_to_json({"Rent": [{"amount": "500.00", "type": "Expense", "date": "2024-05-01"}]}, ledger)
+    sessions = {}
+    for backend in ("json", "sqlite", "sharded"):
+        session = tracker.SessionStore(tracker.open_storage(ledger, backend))
+        session.refresh()
+        session.get_rollup()
+        sessions[backend] = session
+
+    filenames = {backend: session.get_rollup_filename() for backend, session in sessions.items()}
+    assert filenames["json"] == os.path.splitext(ledger)[0] + ".json.rollup.json"
+    assert len(set(filenames.values())) == 3
+    assert all(os.path.exists(filename) for filename in filenames.values())
+
+    #The saved reports are still up to date with the files of their own backend
+    for session in sessions.values():
+        assert session.load_rollup() != None
+    sessions["sqlite"].storage.connection.close()
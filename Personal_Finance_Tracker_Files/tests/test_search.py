@@ -0,0 +1,32 @@
+ROWS = [("Rent", "500.00", "Expense", "2024-05-01"), ("Salary", "2000.00", "Income", "31/05/2024"), ("Rent", "500.00", "Expense", "2023-05-01"),
+        ("Food", "12.50", "Expense", "2024/06/02"), ("Food", "8.00", "Expense", "12-2024")]
+
+
+#A search for a year finds the ISO dates starting with it, and the dates which are not in the ISO format containing it anywhere
+def test_date_search(tracker):
+    index = tracker.SearchIndex(ROWS)
+    assert index.search("Date", "2024") == [0, 1, 3, 4]
+    assert index.search("Date", "2024-05") == [0]
+    assert index.search("Date", "/05/") == [1]
+
+    index.remove(1, ROWS[1])
+    assert index.search("Date", "2024") == [0, 3, 4]
+    index.add(1, ROWS[1])
+    assert index.search("Date", "2024") == [0, 1, 3, 4]
+
+
+#The SQLite backend finds the same dates as the search index
+def test_sqlite_date_search(tracker, ledger):
+    transactions = {}
+    for expense, amount, type_, date_ in ROWS:
+        transactions.setdefault(expense, []).append({"amount": amount, "type": type_, "date": date_})
+    tracker.add_to_json(transactions, ledger)
+    storage = tracker.open_storage(ledger, "sqlite")
+    try:
+        rows = tracker.get_rows(storage.load())
+        storage.show_rows(len(rows))
+        index = tracker.SearchIndex(rows)
+        for text in ("2024", "2024-05", "2023", "/05/"):
+            assert storage.search("Date", text) == index.search("Date", text)
+    finally:
+        storage.connection.close()
@@ -0,0 +1,39 @@
+import os
+
+
+RENT = {"amount": "500.00", "type": "Expense", "date": "2023-12-01"}
+SALARY = {"amount": "2000.00", "type": "Income", "date": "2024-05-31"}
+
+
+#Creating a function to get the shards listed in the manifest of a sharded backend, as {shard key: number of transactions}
+def get_shard_counts(storage):
+    return {key: shard["count"] for key, shard in storage.read_manifest()["shards"].items()}
+
+
+#An update which moves a transaction to another year rewrites the shards of both years, and removes the shard which has no transactions left
+def test_update_across_years(tracker, ledger):
+    tracker.add_to_json({"Rent": [dict(RENT)], "Salary": [dict(SALARY)]}, ledger)
+    storage = tracker.open_storage(ledger, "sharded")
+    transactions = storage.load()
+    assert get_shard_counts(storage) == {"2023": 1, "2024": 1}
+    old_files = set(os.listdir(storage.filename))
+
+    change = {"op": "update", "purpose": "Rent", "record": dict(RENT), "new_purpose": "Rent", "new_record": dict(RENT, date = "2024-01-01")}
+    assert tracker.apply_change(transactions, change)
+    storage.save_changes(transactions, [change])
+
+    assert get_shard_counts(storage) == {"2024": 2}
+    assert storage.load() == {"Rent": [dict(RENT, date = "2024-01-01")], "Salary": [SALARY]}
+    assert storage.load_range("2023-01-01", "2023-12-31") == {"Rent": [], "Salary": []}
+
+    #The files of the replaced shards are removed, and a new backend reads the same transactions from the manifest
+    files = set(os.listdir(storage.filename))
+    assert "2023.0.json" not in files and not (old_files - {"manifest.json"}) & files
+    assert tracker.open_storage(ledger, "sharded").load() == {"Rent": [dict(RENT, date = "2024-01-01")], "Salary": [SALARY]}
+
+    #Moving the transaction back to the earlier year creates its shard again
+    change = {"op": "update", "purpose": "Rent", "record": dict(RENT, date = "2024-01-01"), "new_purpose": "Rent", "new_record": dict(RENT)}
+    assert tracker.apply_change(transactions, change)
+    storage.save_changes(transactions, [change])
+    assert get_shard_counts(storage) == {"2023": 1, "2024": 1}
+    assert storage.load_range("2023-01-01", "2023-12-31") == {"Rent": [RENT], "Salary": []}
@@ -0,0 +1,89 @@
+import json
+import os
+
+
+#Transactions which cannot all be stored in the arrays of the snapshot (an amount without two decimal places, an extra key, a negative
+#amount and an amount which does not fit in 64 bits), so the snapshot has to give back exactly the same dictionaries
+TRANSACTIONS = {"Rent": [{"amount": "500.00", "type": "Expense", "date": "2024-05-01"}, {"amount": "5", "type": "Expense", "date": "2024-05-02"}],
+                "Café": [{"amount": "-3.20", "type": "Expense", "date": "2024-05-03", "note": "refund"}],
+                "Back\\slash": [{"amount": "123456789012345678901234.00", "type": "Income", "date": "2024-05-04"}]}
+
+
+#Creating a function to save the transactions as the JSON backend does after a bulk change, which compacts the journal and writes the snapshot
+def save_ledger(tracker, ledger, transactions):
+    storage = tracker.JSONBackend(ledger, bulk = True)
+    changes = [{"op": "add", "purpose": expense, "record": info} for expense, exp_transactions in transactions.items() for info in exp_transactions]
+    storage.save_changes(transactions, changes)
+    storage.flush(transactions)
+    return storage
+
+
+#The snapshot written when the journal is compacted gives back exactly the transactions in the JSON file
+def test_snapshot_round_trip(tracker, ledger):
+    transactions = json.loads(json.dumps(TRANSACTIONS))
+    storage = save_ledger(tracker, ledger, transactions)
+    assert not os.path.exists(tracker.get_journal_filename(ledger))
+    assert os.path.exists(tracker.get_snapshot_filename(ledger))
+
+    assert tracker.read_snapshot(ledger, tracker.get_file_stamp(ledger)) == TRANSACTIONS
+    assert storage.load() == TRANSACTIONS
+    assert [list(entry) for entry in storage.iter_transactions()] == [[expense, info] for expense, exp_transactions in TRANSACTIONS.items() for info in exp_transactions]
+
+
+#The transactions are loaded from the snapshot rather than the JSON file while it is up to date
+def test_snapshot_used(tracker, ledger, monkeypatch):
+    storage = save_ledger(tracker, ledger, json.loads(json.dumps(TRANSACTIONS)))
+
+    def read_json_file(filename):
+        raise AssertionError("The JSON file was read")
+    monkeypatch.setattr(tracker, "iter_transactions_from_file", read_json_file)
+    assert storage.load() == TRANSACTIONS
+
+
+#A snapshot which is out of date is ignored, and is written again from the JSON file when the transactions are loaded (before the journal is applied)
+def test_stale_snapshot_rewritten(tracker, ledger, monkeypatch):
+    storage = save_ledger(tracker, ledger, json.loads(json.dumps(TRANSACTIONS)))
+    rent = {"amount": "750.00", "type": "Expense", "date": "2024-06-01"}
+    with open(ledger, "w") as file:
+        file.write('{\n  "Rent": [\n    {"amount": "750.00", "type": "Expense", "date": "2024-06-01"}\n  ]\n}')
+    storage.save_change({"Rent": [rent, rent]}, {"op": "add", "purpose": "Rent", "record": rent})
+    assert tracker.read_snapshot(ledger, tracker.get_file_stamp(ledger)) == None
+
+    assert storage.load() == {"Rent": [rent, rent]}
+    assert tracker.read_snapshot(ledger, tracker.get_file_stamp(ledger)) == {"Rent": [rent]}
+
+    def read_json_file(filename):
+        raise AssertionError("The JSON file was read")
+    monkeypatch.setattr(tracker, "iter_transactions_from_file", read_json_file)
+    assert storage.load() == {"Rent": [rent, rent]}
+
+
+#A date range only reads the transactions in the range (and the transactions kept as JSON text) from the snapshot, unless the journal has changes to apply
+def test_snapshot_date_range(tracker, ledger, monkeypatch):
+    transactions = json.loads(json.dumps(TRANSACTIONS))
+    transactions["Rent"].append({"amount": "450.00", "type": "Expense", "date": "2024-06-01"})
+    storage = save_ledger(tracker, ledger, transactions)
+
+    def read_json_file(filename):
+        raise AssertionError("The JSON file was read")
+    monkeypatch.setattr(tracker, "iter_transactions_from_file", read_json_file)
+    assert storage.load_range("2024-05-02", "2024-05-31") == {"Rent": [TRANSACTIONS["Rent"][1]], "Café": TRANSACTIONS["Café"], "Back\\slash": TRANSACTIONS["Back\\slash"]}
+    assert storage.load_range("2024-06-01") == {"Rent": [TRANSACTIONS["Rent"][1], transactions["Rent"][2]], "Café": TRANSACTIONS["Café"], "Back\\slash": TRANSACTIONS["Back\\slash"]}
+    monkeypatch.undo()
+
+    food = {"amount": "12.50", "type": "Expense", "date": "2024-06-02"}
+    storage.save_change(transactions, {"op": "add", "purpose": "Food", "record": food})
+    assert storage.load_range("2024-06-01")["Food"] == [food]
+
+
+#A damaged snapshot is ignored and the JSON file is read instead
+def test_truncated_snapshot(tracker, ledger):
+    storage = save_ledger(tracker, ledger, json.loads(json.dumps(TRANSACTIONS)))
+    snapshot_filename = tracker.get_snapshot_filename(ledger)
+    with open(snapshot_filename, "rb") as file:
+        snapshot_data = file.read()
+    with open(snapshot_filename, "wb") as file:
+        file.write(snapshot_data[:len(snapshot_data) // 2])
+
+    assert tracker.read_snapshot(ledger, tracker.get_file_stamp(ledger)) == None
+    assert storage.load() == TRANSACTIONS
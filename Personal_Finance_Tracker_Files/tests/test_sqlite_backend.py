@@ -0,0 +1,132 @@
+import pytest
+
+
+RENT = {"amount": "500.00", "type": "Expense", "date": "2024-05-01"}
+SALARY = {"amount": "2000.00", "type": "Income", "date": "2024-05-31"}
+FOOD = {"amount": "12.50", "type": "Expense", "date": "2024-05-02"}
+
+
+#Creating a fixture to open an SQLite backend in a temporary folder, which is closed at the end of the test
+@pytest.fixture
+def database(tracker, tmp_path):
+    storage = tracker.SQLiteBackend(str(tmp_path / "transactions.db"))
+    yield storage
+    storage.connection.close()
+
+
+#Search and sort only return the row ids of the rows displayed, so reading the transactions again (eg: on the GUI reload thread)
+#does not change them until the new rows are displayed with show_rows
+def test_row_ids_swapped_by_show_rows(tracker, database):
+    transactions = {}
+    changes = [{"op": "add", "purpose": "Rent", "record": dict(RENT)}, {"op": "add", "purpose": "Salary", "record": dict(SALARY)}]
+    for change in changes:
+        tracker.apply_change(transactions, change)
+    database.save_changes(transactions, changes)
+
+    assert list(database.iter_transactions()) == [["Rent", RENT], ["Salary", SALARY]]
+    assert database.sort("Amount") == []
+    database.show_rows(1)
+    assert database.sort("Amount") == [0]
+    database.show_rows(2)
+    assert database.sort("Amount") == [0, 1]
+
+    #Adding a transaction which comes first in the order of iter_transactions, and reading the transactions again
+    change = {"op": "add", "purpose": "Rent", "record": dict(FOOD)}
+    tracker.apply_change(transactions, change)
+    database.save_changes(transactions, [change])
+    rows = database.iter_transactions()
+    assert next(rows) == ["Rent", RENT]
+    assert database.sort("Amount") == [0, 1]
+    assert list(rows) == [["Rent", FOOD], ["Salary", SALARY]]
+    assert database.sort("Amount") == [0, 1]
+    assert database.search("Transaction", "Sal") == [1]
+
+    database.show_rows(3)
+    assert database.sort("Amount") == [1, 0, 2]
+    assert database.search("Transaction", "Sal") == [2]
+
+
+#The JSON file is imported when the database is created, and added, updated and deleted transactions are saved in the same order
+#as the main transactions dictionary they were applied to (an update to a new purpose moves the transaction to the end of that purpose)
+def test_crud(tracker, ledger):
+    tracker.add_to_json({"Rent": [dict(RENT), dict(RENT)], "Salary": [dict(SALARY)]}, ledger)
+    storage = tracker.open_storage(ledger, "sqlite")
+    transactions = storage.load()
+    assert transactions == {"Rent": [RENT, RENT], "Salary": [SALARY]}
+    revision = storage.get_source_stamp()
+
+    changes = [{"op": "add", "purpose": "Food", "record": dict(FOOD)},
+               {"op": "update", "purpose": "Rent", "record": dict(RENT), "new_purpose": "Food", "new_record": dict(RENT, amount = "450.00")},
+               {"op": "update", "purpose": "Salary", "record": dict(SALARY), "new_purpose": "Salary", "new_record": dict(SALARY, date = "2024-06-30")},
+               {"op": "delete", "purpose": "Rent", "record": dict(RENT)},
+               {"op": "add", "purpose": "Rent", "record": dict(RENT, date = "2024-06-01")}]
+    for change in changes:
+        assert tracker.apply_change(transactions, change)
+    storage.save_changes(transactions, changes[:2])
+    storage.save_change(transactions, changes[2])
+    storage.save_changes(transactions, changes[3:])
+    assert storage.get_source_stamp() > revision
+    storage.connection.close()
+
+    #Opening the database again (the JSON file is not imported a second time)
+    storage = tracker.open_storage(ledger, "sqlite")
+    assert storage.load() == transactions == {"Rent": [dict(RENT, date = "2024-06-01")], "Salary": [dict(SALARY, date = "2024-06-30")],
+                                              "Food": [FOOD, dict(RENT, amount = "450.00")]}
+    assert storage.find("Rent", RENT) == None
+    assert storage.find("Food", FOOD) != None
+    storage.connection.close()
+
+
+#Searches and sorts are run by SQLite, and return the row ids (positions in the order of iter_transactions) of the rows displayed
+def test_search_and_sort(tracker, ledger):
+    tracker.add_to_json({"Rent": [dict(RENT)], "Salary": [dict(SALARY)], "Food": [dict(FOOD)]}, ledger)
+    storage = tracker.open_storage(ledger, "sqlite")
+    assert storage.sort("Amount") == []
+
+    assert list(storage.iter_transactions()) == [["Rent", RENT], ["Salary", SALARY], ["Food", FOOD]]
+    storage.show_rows(3)
+    assert storage.sort("Amount") == [2, 0, 1]
+    assert storage.sort("Transaction") == [2, 0, 1]
+    assert storage.search("Transaction", "Sal") == [1]
+    assert storage.search("Amount", "500.00") == [0]
+    assert storage.search("Amount", "10-600") == [0, 2]
+    assert storage.search("Type", "Exp") == [0, 2]
+    assert storage.search("Date", "2024-05-0") == [0, 2]
+    storage.connection.close()
+
+
+#Transactions whose amount is not a number are left out when the JSON file is imported, and written to a CSV file next to the database instead
+def test_import_rejects_invalid_amounts(tracker, ledger, capsys):
+    tracker.add_to_json({"Rent": [dict(RENT), dict(RENT, amount = "ten")], "Salary": [dict(SALARY, amount = "nan"), dict(SALARY)]}, ledger)
+    storage = tracker.open_storage(ledger, "sqlite")
+    try:
+        assert storage.load() == {"Rent": [RENT], "Salary": [SALARY]}
+    finally:
+        storage.connection.close()
+
+    rejected_filename = ledger[:-len(".json")] + ".rejected.csv"
+    assert f"2 transactions could not be imported, as the amount is not a number, and have been written to {rejected_filename}." in capsys.readouterr().out
+    with open(rejected_filename, encoding = "utf-8") as file:
+        assert file.read().splitlines() == ["file,line,reason,row", f"{ledger},2,invalid amount 'ten',Rent,ten,Expense,2024-05-01",
+                                            f"{ledger},3,invalid amount 'nan',Salary,nan,Income,2024-05-31"]
+
+
+#Only the SQLite backend runs searches and sorts itself, and a backend which only reads and saves its transactions gets the other functions from StorageBackend
+def test_backend_interface(tracker, database, ledger):
+    assert isinstance(database, tracker.QueryMixin)
+    assert not isinstance(tracker.JSONBackend(ledger), tracker.QueryMixin)
+    with pytest.raises(TypeError):
+        tracker.StorageBackend()
+
+    class ListBackend(tracker.StorageBackend):
+        def get_stamp(self):
+            return None
+
+        def iter_transactions(self):
+            return iter([["Rent", dict(RENT)], ["Salary", dict(SALARY)], ["Rent", dict(FOOD)]])
+
+        def save_changes(self, transactions, changes):
+            pass
+
+    assert ListBackend().load() == {"Rent": [RENT, FOOD], "Salary": [SALARY]}
+    assert ListBackend().load_range("2024-05-01", "2024-05-01") == {"Rent": [RENT, FOOD], "Salary": [SALARY]}
@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+#Importing the main Finance Tracker file does not import the modules which are only needed by some commands (eg: tkinter for the GUI)
+def test_deferred_imports(tracker):
+    code = ("import importlib, sys\n"
+            f"sys.path.append({os.path.dirname(tracker.__file__)!r})\n"
+            "importlib.import_module('Personal Finance Tracker')\n"
+            "print(' '.join(name for name in ('tkinter', 'sqlite3', 'csv', 'argparse', 'threading', 'queue') if name in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output = True, text = True, check = True)
+    assert result.stdout.strip() == ""
+
+
+#The GUI module is loaded the first time it is needed, and shares the Finance Tracker module which is already running rather than loading the file again
+def test_load_gui(tracker):
+    pytest.importorskip("tkinter")
+    gui = tracker.load_gui()
+    assert tracker.load_gui() is gui
+    assert gui.SearchIndex is tracker.SearchIndex
@@ -0,0 +1,136 @@
+import json
+from datetime import date
+
+
+#Creating a function to get the transactions of a TransactionStore as a sorted list of [purpose, transaction dictionary] lists
+def get_store_transactions(store):
+    return sorted((store.get_transaction(row) for row in store.rows()), key = json.dumps)
+
+
+#The store keeps the amounts in cents and the dates as day numbers, and gives back the same transactions it was created from
+def test_from_transactions(tracker):
+    transactions = {"Rent": [{"amount": "500.00", "type": "Expense", "date": "2024-05-01"}, {"amount": "450.50", "type": "Expense", "date": "2024-06-01"}],
+                    "Salary": [{"amount": "2000.00", "type": "Income", "date": "2024-05-31"}]}
+    store = tracker.TransactionStore.from_transactions(transactions)
+
+    assert get_store_transactions(store) == sorted(([expense, info] for expense, exp_transactions in transactions.items() for info in exp_transactions), key = json.dumps)
+    assert list(store.amounts) == [50000, 45050, 200000]
+    assert store.dates[0] == date(2024, 5, 1).toordinal()
+    assert store.totals() == [95050, 200000]
+
+    #Removed rows keep the position of the other rows, and are left out of the totals
+    store.remove(0)
+    assert len(store) == 2
+    assert store.get_transaction(2) == ["Salary", {"amount": "2000.00", "type": "Income", "date": "2024-05-31"}]
+    assert store.totals() == [45050, 200000]
+
+
+#Transaction types beyond the number of type flags (a byte each) are kept, but left out of the totals
+def test_many_types(tracker):
+    store = tracker.TransactionStore()
+    for number in range(300):
+        store.add("Transfer", {"amount": "1.00", "type": f"Type {number}", "date": "2024-05-01"})
+    store.add("Rent", {"amount": "500.00", "type": "Expense", "date": "2024-05-01"})
+
+    assert len(store.type_names) == tracker.TransactionStore.SKIPPED
+    assert store.get_transaction(299) == ["Transfer", {"amount": "1.00", "type": "Type 299", "date": "2024-05-01"}]
+    assert store.skipped_count == 48
+    assert store.totals() == [50000, 25200]
+    store.remove(0)
+    store.remove(299)
+    assert len(store) == 299
+    assert store.skipped_count == 47
+    assert store.totals() == [50000, 25100]
+
+
+#The main transactions dictionary produced by a store is the same as the one it was created from, including the transactions which are
+#not stored in the arrays exactly as they were saved. Only those transactions are kept as dictionaries
+def test_to_transactions(tracker):
+    transactions = {"Rent": [{"amount": "500.00", "type": "Expense", "date": "2024-05-01"}, {"amount": "500", "type": "Expense", "date": "2024-06-01"},
+                             {"amount": "ten", "type": "Expense", "date": "2024-07-01"}, {"amount": 450.5, "type": "Expense", "date": "2024-08-01"}],
+                    "Food": [],
+                    "Salary": [{"amount": "2000.00", "type": "Income", "date": "31/05/2024", "note": "May"}, {"type": "Income", "amount": "2000.00", "date": "2024-06-30"},
+                               {"amount": "2000.00", "type": "Income", "date": "20240731"}, {"amount": "2000.00", "type": "Income", "date": "31/08/2024"}]}
+    store = tracker.TransactionStore.from_transactions(transactions)
+
+    assert store.to_transactions() == transactions
+    assert [list(info) for info in store.to_transactions()["Salary"]] == [list(info) for info in transactions["Salary"]]
+    assert sorted(store.originals) == [1, 2, 3, 4, 5, 6]
+    assert store.skipped_count == 1
+    assert store.totals() == [145050, 800000]
+    assert store.to_transactions(lambda date_: date_.startswith("2024-06")) == {"Rent": [transactions["Rent"][1]], "Food": [], "Salary": [transactions["Salary"][1]]}
+
+    #Transactions are found by their exact values, so an amount saved as "500" is not found as "500.00"
+    assert store.find_row("Rent", {"amount": "500.00", "type": "Expense", "date": "2024-06-01"}) == None
+    assert store.find_row("Rent", {"amount": "500", "type": "Expense", "date": "2024-06-01"}) == 1
+    assert store.find_row("Rent", {"amount": "ten", "type": "Expense", "date": "2024-07-01"}) == 2
+    assert store.find_row("Salary", {"amount": "2000.00", "type": "Income", "date": "31/08/2024"}) == 7
+
+
+#Dates which are not in the ISO format are kept as text rather than stopping the store from being built
+def test_unknown_dates(tracker):
+    transactions = {"Rent": [{"amount": "500.00", "type": "Expense", "date": "01/05/2024"}, {"amount": "450.00", "type": "Expense", "date": "2024-04-01"}]}
+    store = tracker.TransactionStore.from_transactions(transactions)
+    assert store.get_transaction(0) == ["Rent", {"amount": "500.00", "type": "Expense", "date": "01/05/2024"}]
+    assert store.dates[0] == tracker.TransactionStore.UNKNOWN_DATE
+
+    #The statistics per purpose count every transaction, while the month-over-month table only uses the transactions with a date
+    analytics = tracker.load_analytics()
+    for use_numpy in ([False, True] if analytics.numpy != None else [False]):
+        results = analytics.analyze(store, use_numpy)
+        assert results["categories"][0]["count"] == 2
+        assert [month["month"] for month in results["months"]] == ["2024-04"]
+
+    store.replace(1, "Rent", {"amount": "450.00", "type": "Expense", "date": "April"})
+    results = analytics.analyze(store, False)
+    assert results["categories"][0]["total"] == 95000
+    assert results["months"] == []
+
+
+#Change records are applied to the store, so it matches the transactions after the changes without being built again
+def test_apply_change(tracker):
+    transactions = {"Rent": [{"amount": "500.00", "type": "Expense", "date": "2024-05-01"}, {"amount": "500.00", "type": "Expense", "date": "2024-05-01"}],
+                    "Salary": [{"amount": "2000.00", "type": "Income", "date": "2024-05-31"}]}
+    store = tracker.TransactionStore.from_transactions(transactions)
+    changes = [{"op": "add", "purpose": "Food", "record": {"amount": "12.50", "type": "Expense", "date": "2024-05-02"}},
+               {"op": "update", "purpose": "Rent", "record": {"amount": "500.00", "type": "Expense", "date": "2024-05-01"},
+                "new_purpose": "Housing", "new_record": {"amount": "550.00", "type": "Expense", "date": "2024-05-01"}},
+               {"op": "delete", "purpose": "Salary", "record": {"amount": "2000.00", "type": "Income", "date": "2024-05-31"}},
+               {"op": "delete", "purpose": "Food", "record": {"amount": "12.50", "type": "Expense", "date": "2024-05-02"}},
+               {"op": "add", "purpose": "Food", "record": {"amount": "8.00", "type": "Expense", "date": "2024-05-03"}}]
+    for change in changes:
+        assert tracker.apply_change(transactions, json.loads(json.dumps(change)))
+        assert store.apply_change(change)
+        assert get_store_transactions(store) == get_store_transactions(tracker.TransactionStore.from_transactions(transactions))
+
+    assert not store.apply_change({"op": "delete", "purpose": "Salary", "record": {"amount": "2000.00", "type": "Income", "date": "2024-05-31"}})
+    assert len(store) == 3
+
+
+#Updates keep the position of the transaction unless the purpose is changed, in which case it is moved to the end of the transactions of the new purpose
+def test_update(tracker):
+    rent = {"amount": "500.00", "type": "Expense", "date": "2024-05-01"}
+    store = tracker.TransactionStore.from_transactions({"Rent": [dict(rent), dict(rent, amount = "ten")], "Housing": [dict(rent, amount = "450.00")]})
+
+    assert store.update(1, "Rent", dict(rent, amount = "510.00")) == 1
+    assert store.skipped_count == 0 and store.originals == {}
+    assert store.update(0, "Housing", dict(rent, amount = "nan")) == 3
+    assert store.skipped_count == 1
+    assert store.to_transactions() == {"Rent": [dict(rent, amount = "510.00")], "Housing": [dict(rent, amount = "450.00"), dict(rent, amount = "nan")]}
+    assert store.totals() == [96000, 0]
+
+
+#The session keeps its transactions in a TransactionStore, which is changed by the menu functions rather than built again after every change
+def test_session_keeps_columns(tracker, ledger):
+    session = tracker.SessionStore(tracker.JSONBackend(ledger))
+    session.refresh()
+    columns = session.get_columns()
+
+    change = {"op": "add", "purpose": "Rent", "record": {"amount": "500.00", "type": "Expense", "date": "2024-05-01"}}
+    columns.apply_change(change)
+    session.storage.save_changes(columns, [change])
+    session.record_change(change)
+
+    assert session.get_columns() is columns
+    assert session.get_transactions() == {"Rent": [{"amount": "500.00", "type": "Expense", "date": "2024-05-01"}]}
+    assert session.aggregates.totals() == [50000, 0]
@@ -0,0 +1,80 @@
+import pytest
+
+
+RENT = {"amount": "500.00", "type": "Expense", "date": "2024-05-01"}
+
+#Answers to the prompts of update_transaction which find the rent transaction
+FIND_RENT = ["500", "rent", "DR", "1", "5", "2024"]
+
+
+#The store is only changed once every update has been entered, so an update which is stopped part of the way through changes nothing
+def test_stopped_update_changes_nothing(tracker, ledger, script_input, capsys):
+    transactions = {"Rent": [dict(RENT), dict(RENT)]}
+    store = tracker.TransactionStore.from_transactions(transactions)
+    storage = tracker.JSONBackend(ledger)
+
+    script_input(FIND_RENT + ["purpose", "Housing", "Y", "amount", "550"])
+    with pytest.raises(EOFError):
+        tracker.update_transaction(store, storage)
+
+    assert store.to_transactions() == transactions
+    assert store.find_row("Rent", RENT) == 0
+    assert store.find_row("Housing", RENT) == None
+
+
+#An update which moves a transaction to a new purpose moves that transaction, and the next update of an equal transaction finds its duplicate
+def test_update_moves_transaction(tracker, ledger, script_input, capsys):
+    transactions = {"Rent": [dict(RENT), dict(RENT)]}
+    tracker.add_to_json(transactions, ledger)
+    store = tracker.TransactionStore.from_transactions(transactions)
+    storage = tracker.JSONBackend(ledger)
+
+    script_input(FIND_RENT + ["purpose", "Housing", "Y", "amount", "550", "N"])
+    change = tracker.update_transaction(store, storage)
+
+    assert change == {"op": "update", "purpose": "Rent", "record": RENT, "new_purpose": "Housing", "new_record": dict(RENT, amount = "550.00")}
+    assert store.to_transactions() == {"Rent": [RENT], "Housing": [dict(RENT, amount = "550.00")]}
+    assert store.find_row("Rent", RENT) == 1
+    assert store.find_row("Housing", dict(RENT, amount = "550.00")) == 2
+    assert len(store) == 2
+    assert tracker.read_bulk_transactions_from_file(ledger) == {"Rent": [RENT], "Housing": [dict(RENT, amount = "550.00")]}
+
+
+#A deleted transaction is removed from the store
+def test_delete_transaction(tracker, ledger, script_input, capsys):
+    transactions = {"Rent": [dict(RENT)]}
+    tracker.add_to_json(transactions, ledger)
+    store = tracker.TransactionStore.from_transactions(transactions)
+    storage = tracker.JSONBackend(ledger)
+
+    script_input(FIND_RENT)
+    tracker.delete_transaction(store, storage)
+
+    assert store.to_transactions() == {"Rent": []}
+    assert store.find_row("Rent", RENT) == None
+    assert len(store) == 0
+    assert tracker.read_bulk_transactions_from_file(ledger) == {"Rent": []}
+
+
+#The "successfully removed" message is only displayed once the removal has been saved
+def test_delete_message_after_save(tracker, ledger, script_input, monkeypatch, capsys):
+    transactions = {"Rent": [dict(RENT)]}
+    tracker.add_to_json(transactions, ledger)
+    store = tracker.TransactionStore.from_transactions(transactions)
+    storage = tracker.JSONBackend(ledger)
+    failing_storage = tracker.JSONBackend(ledger)
+
+    def failed_save(transactions, change):
+        raise OSError("disk full")
+    monkeypatch.setattr(failing_storage, "save_change", failed_save)
+
+    script_input(FIND_RENT)
+    with pytest.raises(OSError):
+        tracker.delete_transaction(store, failing_storage)
+    assert "successfully removed" not in capsys.readouterr().out
+
+    store = tracker.TransactionStore.from_transactions(transactions)
+    script_input(FIND_RENT)
+    assert tracker.delete_transaction(store, storage) == {"op": "delete", "purpose": "Rent", "record": RENT}
+    assert "successfully removed" in capsys.readouterr().out
+    assert tracker.read_bulk_transactions_from_file(ledger) == {"Rent": []}